@@ -20,6 +20,24 @@ from config import Config
 # FIXED: Import health monitor properly
 from health.monitor import create_health_monitor
 
+# Shared services
+from services.bulk_import import BulkImporter
+from services.database import Database
+from services.message_cleanup import MessageCleanup
+from services.playlist_loader import PlaylistLoader
+from services.prefetcher import TrackPrefetcher
+from services.queue_store import QueueStore
+from services.panel_scheduler import PanelScheduler
+from services.search_race import SearchRace
+from services.session_restorer import SessionRestorer
+from services.track_resolver import TrackResolver
+from services.track_store import TrackStore
+from services.track_suggestions import TrackSuggestions
+from utils.music_queue import HistoryBudget
+from utils.render import EmbedRenderer
+from views.panel_controls import PanelControlsView
+from utils.track_cache import TrackCache
+
 # FIXED: Simple logger setup instead of importing
 def setup_logger(environment):
     """Simple logger setup"""
@@ -102,6 +120,89 @@ class MuzycznyBot(commands.Bot):
             config=config
         )
         
+        # Persistent storage (connected in setup_hook)
+        self.database = Database(config.DATABASE_FILE)
+        self.track_store = TrackStore(
+            self.database,
+            flush_interval=config.TRACK_STORE_FLUSH_INTERVAL,
+            max_rows=config.TRACK_STORE_MAX_ROWS
+        )
+        
+        # Write-behind queue/player state persistence
+        self.queue_store = QueueStore(
+            self.database,
+            flush_interval=config.QUEUE_FLUSH_INTERVAL,
+            state_interval=config.QUEUE_STATE_INTERVAL
+        )
+        self.saved_sessions = {}  # guild_id -> QueueSnapshot loaded at boot
+        
+        # Staggered reconnect of saved sessions after on_ready
+        self.session_restorer = SessionRestorer(
+            self.queue_store,
+            concurrency=config.RESTORE_CONCURRENCY,
+            jitter=config.RESTORE_JITTER,
+            max_age=config.RESTORE_MAX_AGE
+        )
+        
+        # Track resolution cache shared by all music cogs
+        self.track_resolver = TrackResolver(
+            TrackCache(max_size=config.TRACK_CACHE_SIZE, ttl=config.TRACK_CACHE_TTL),
+            store=self.track_store
+        )
+        
+        # Plain-text searches race all configured sources
+        self.search_race = SearchRace(
+            self.track_resolver,
+            sources=config.SEARCH_SOURCES,
+            deadline=config.SEARCH_RACE_DEADLINE
+        )
+        
+        # Multi-query !play and !import resolve in parallel, bounded
+        self.bulk_importer = BulkImporter(
+            self.search_race,
+            concurrency=config.IMPORT_CONCURRENCY,
+            max_entries=config.IMPORT_MAX_ENTRIES
+        )
+        
+        # Next-track validation (stale re-resolve, dead-track drop) before transitions
+        self.track_prefetcher = TrackPrefetcher(
+            self.track_resolver,
+            stale_after=config.PREFETCH_STALE_AFTER,
+            lead=config.PREFETCH_LEAD
+        )
+        
+        # Background playlist ingestion
+        self.playlist_loader = PlaylistLoader(
+            batch_size=config.PLAYLIST_BATCH_SIZE,
+            max_queue_size=config.MAX_QUEUE_SIZE
+        )
+        
+        # Offline /play autocomplete over previously played tracks
+        self.track_suggestions = TrackSuggestions(
+            guild_size=config.SUGGEST_GUILD_SIZE,
+            global_size=config.SUGGEST_GLOBAL_SIZE
+        )
+        
+        # Bounded per-guild playback history (~0.6 KB per remembered track)
+        self.history_budget = HistoryBudget(
+            guild_size=config.HISTORY_SIZE,
+            global_size=config.HISTORY_GLOBAL_SIZE
+        )
+        
+        # Now-playing panels of all guilds refresh from one rate-limited timer
+        self.panel_scheduler = PanelScheduler(
+            interval=config.PANEL_UPDATE_INTERVAL,
+            jitter=config.PANEL_UPDATE_JITTER,
+            edits_per_second=config.PANEL_EDITS_PER_SECOND,
+            debounce=config.PANEL_DEBOUNCE
+        )
+        
+        # Superseded panels are deleted later, in batches per channel
+        self.message_cleanup = MessageCleanup(delay=config.PANEL_CLEANUP_DELAY)
+        
+        # Memoized static embeds and compiled embed templates
+        self.embed_renderer = EmbedRenderer()
+        
         # Lavalink setup flag
         self._lavalink_setup = False
         
@@ -110,9 +211,16 @@ class MuzycznyBot(commands.Bot):
         try:
             self.logger.info("🚀 Setting up bot...")
             
+            # Setup database and warm caches
+            await self.setup_database()
+            
             # Setup Lavalink
             await self.setup_lavalink()
             
+            # One stateless view answers the buttons of every panel, including pre-restart ones
+            self.panel_view = PanelControlsView()
+            self.add_view(self.panel_view)
+            
             # Load cogs
             await self.load_extensions()
             
@@ -126,6 +234,18 @@ class MuzycznyBot(commands.Bot):
             self.logger.error(traceback.format_exc())
             await self.close()
     
+    async def setup_database(self):
+        """Open SQLite database, warm the track cache and load saved queues"""
+        try:
+            await self.database.connect()
+            await self.track_store.setup()
+            await self.track_resolver.warm_from_store(self.config.TRACK_CACHE_WARM_SIZE)
+            await self.queue_store.setup()
+            self.saved_sessions = await self.queue_store.load_all()
+        except Exception as e:
+            # Bot still works without persistence - just with a cold cache
+            self.logger.warning(f"⚠️ Database setup failed, running without persistence: {e}")
+    
     async def setup_lavalink(self):
         """Setup Lavalink connection"""
         try:
@@ -225,6 +345,23 @@ class MuzycznyBot(commands.Bot):
         except Exception as e:
             self.logger.error(f"Stats update error: {e}")
     
+    def get_service_metrics(self) -> dict:
+        """Collect metrics from shared services for the health endpoint"""
+        return {
+            'track_cache': self.track_resolver.get_stats(),
+            'search': self.search_race.get_stats(),
+            'bulk_import': self.bulk_importer.get_stats(),
+            'playlists': self.playlist_loader.get_stats(),
+            'prefetch': self.track_prefetcher.get_stats(),
+            'suggestions': self.track_suggestions.get_stats(),
+            'queue_store': self.queue_store.get_stats(),
+            'session_restore': self.session_restorer.get_stats(),
+            'history': self.history_budget.get_stats(),
+            'panels': self.panel_scheduler.get_stats(),
+            'message_cleanup': self.message_cleanup.get_stats(),
+            'render': self.embed_renderer.get_stats()
+        }
+    
     @update_stats_task.before_loop
     async def before_stats_task(self):
         """Wait for bot to be ready before starting stats task"""
@@ -254,6 +391,9 @@ class MuzycznyBot(commands.Bot):
             # Setup monitoring
             await self.setup_monitoring()
             
+            # Bring back sessions that were playing before the restart (once per process)
+            self.restore_sessions()
+            
             print(f'✅ {self.user} is now online!')
             print(f'📊 Bot ID: {self.user.id if self.user else "Unknown"}')
             print(f'🔗 Invite URL: https://discord.com/api/oauth2/authorize?client_id={self.user.id if self.user else "0"}&permissions=8&scope=bot')
@@ -339,6 +479,14 @@ class MuzycznyBot(commands.Bot):
         except Exception as e:
             self.logger.error(f"Error in on_ready: {e}")
     
+    def restore_sessions(self):
+        """Hand saved sessions to the restorer in the background"""
+        music_cog = self.get_cog('MusicCommands')
+        if not music_cog or not self.saved_sessions:
+            return
+        sessions, self.saved_sessions = self.saved_sessions, {}
+        self.session_restorer.start(sessions, music_cog.restore_session)
+    
     async def setup_monitoring(self):
         """Setup monitoring systems"""
         try:
@@ -374,6 +522,8 @@ class MuzycznyBot(commands.Bot):
     async def on_guild_remove(self, guild):
         """Called when bot leaves a guild"""
         self.logger.info(f"📤 Left guild: {guild.name} (ID: {guild.id})")
+        self.track_suggestions.forget_guild(guild.id)
+        self.history_budget.forget_guild(guild.id)
         
         # Update presence
         activity = discord.Activity(
@@ -436,6 +586,17 @@ class MuzycznyBot(commands.Bot):
                 except Exception as e:
                     self.logger.error(f"Error stopping health monitor: {e}")
             
+            # Flush persistent caches before the loop goes away
+            try:
+                await self.session_restorer.close()
+                await self.panel_scheduler.close()
+                await self.message_cleanup.close()
+                await self.queue_store.close()
+                await self.track_store.close()
+                await self.database.close()
+            except Exception as e:
+                self.logger.error(f"Error closing database: {e}")
+            
             # FIXED: Simple voice client disconnect without problematic method calls
             for voice_client in list(self.voice_clients):
                 try:
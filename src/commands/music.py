@@ -1,21 +1,57 @@
 """Enhanced Music Commands with Beautiful UI"""
 
 import discord
+from discord import app_commands
 from discord.ext import commands
 import wavelink
 import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, Dict, List, Union, Any
+from typing import Optional, Dict, List, Set, Union, Any
 import json
 import logging
+import time
+
+from services.bulk_import import TRACK_LIST_EXTENSIONS, BulkImporter, parse_track_list, split_queries
+from services.message_cleanup import MessageCleanup
+from services.panel_scheduler import PanelScheduler, panel_digest
+from services.playlist_loader import PlaylistLoader
+from services.prefetcher import TrackPrefetcher
+from services.queue_store import QueueSnapshot, QueueStore
+from services.search_race import SearchRace
+from services.track_resolver import TrackResolver
+from services.track_suggestions import MAX_CHOICE_LENGTH, TrackSuggestions
+from utils.music_queue import STREAM_WEIGHT, MusicQueue, PlaybackHistory, shuffle_queue
+from utils.render import PROGRESS_BAR, VOLUME_BAR, BarTable, EmbedRenderer, EmbedTemplate
+from utils.track_codec import TrackDecodeError, playable_from_encoded
+from views.panel_controls import PanelControlsView
+from views.queue_browser import QueueBrowserView
+
+class EnhancedPlayer(wavelink.Player):
+    """wavelink.Player backed by MusicQueue and the guild's history ring"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queue = MusicQueue.for_player(self)
 
 class EnhancedMusicUI:
     """Enhanced Music UI with persistent controls"""
     
+    QUEUE_PAGE_SIZE = 10
+    PROGRESS_ANCHOR_SLACK = 2.0  # seconds a timestamps-mode start may drift before it is re-anchored (seeks)
+    
     def __init__(self, bot):
         self.bot = bot
         self.persistent_panels: Dict[int, dict] = {}  # guild_id -> panel_data
-        self.update_tasks: Dict[int, asyncio.Task] = {}
+        self.scheduler: PanelScheduler = getattr(bot, 'panel_scheduler', None) or PanelScheduler()
+        self.cleanup: MessageCleanup = getattr(bot, 'message_cleanup', None) or MessageCleanup()
+        self.controls_view: PanelControlsView = getattr(bot, 'panel_view', None) or PanelControlsView()
+        self.renderer: EmbedRenderer = getattr(bot, 'embed_renderer', None) or EmbedRenderer()
+        self.queue_pages: Dict[int, tuple] = {}  # guild_id -> ((queue id, version), {page: entries})
+        self.relocations: Dict[int, asyncio.Task] = {}  # guild_id -> running panel move
+        self.relocate_requests: Dict[int, tuple] = {}  # guild_id -> latest (ctx, player) to move below
+        self.progress_anchors: Dict[int, int] = {}  # guild_id -> unix time the playing track started
+        # 'timestamps' panels let Discord clients count progress, so they are only edited on changes
+        self.zero_poll: bool = getattr(getattr(bot, 'config', None), 'PANEL_PROGRESS', 'bar') == 'timestamps'
         self.logger = logging.getLogger('music_ui')
     
     async def create_now_playing_embed(self, player: wavelink.Player, track: Any) -> discord.Embed:
@@ -24,76 +60,63 @@ class EnhancedMusicUI:
         # Calculate progress
         position = player.position or 0
         duration = getattr(track, 'length', 0) or 0
-        progress_bar = self.create_progress_bar(position, duration)
-        
-        # Create main embed
-        embed = discord.Embed(
+        if self.zero_poll:
+            progress = self.create_progress_timestamps(player, track, position, duration)
+        else:
+            progress = f"```{self.create_progress_bar(position, duration)}```"
+        
+        # Playlist ingestion progress
+        extra_fields = []
+        loader = getattr(self.bot, 'playlist_loader', None)
+        job = loader.get_job(player.guild.id) if loader and player.guild else None
+        if job:
+            extra_fields.append(("📥 Loading Playlist", f"`{job.name}` • `{job.processed}/{job.total}`", False))
+        
+        # Thumbnail if available
+        thumbnail = getattr(track, 'artwork_url', None) or getattr(track, 'thumbnail', None)
+        
+        with self.renderer.timer('now_playing'):
+            avatar_url = self.bot.user.avatar.url if self.bot.user and self.bot.user.avatar else None
+            template = self.renderer.template(('now_playing', avatar_url), lambda: self.now_playing_template(avatar_url))
+            # Field values in template order: Artist, Duration, Volume / Progress / Loop, Queue, Status
+            return template.render(
+                [
+                    f"`{getattr(track, 'author', 'Unknown')}`",
+                    f"`{self.format_time(duration)}`",
+                    f"`{player.volume}%`",
+                    progress,
+                    f"`{self.get_loop_mode_display(player)}`",
+                    f"`{len(player.queue)} tracks`",
+                    f"`{'Paused' if player.paused else 'Playing'}`"
+                ],
+                description=f"**[{track.title}]({getattr(track, 'uri', 'https://discord.com')})**",
+                extra_fields=extra_fields,
+                thumbnail=thumbnail,
+                timestamp=datetime.utcnow()
+            )
+    
+    def now_playing_template(self, avatar_url: Optional[str]) -> EmbedTemplate:
+        """Static layout of the now playing embed - Clean 3x2 Layout"""
+        updates = "Updates on changes" if self.zero_poll else f"Auto-updates every {self.scheduler.interval:g}s"
+        return EmbedTemplate(
             title="🎵 Now Playing",
-            description=f"**[{track.title}]({getattr(track, 'uri', 'https://discord.com')})**",
             color=0x1db954,  # Spotify green
-            timestamp=datetime.utcnow()
+            fields=[
+                # First Row - Track Info
+                ("🎤 Artist", True),
+                ("⏱️ Duration", True),
+                ("🔊 Volume", True),
+                # Progress bar - Full Width
+                ("📈 Progress", False),
+                # Second Row - Player Status
+                ("🔁 Loop", True),
+                ("👥 Queue", True),
+                ("🎧 Status", True)
+            ],
+            # Footer with controls hint
+            footer_text=f"Use buttons below to control playback • {updates}",
+            footer_icon=avatar_url
         )
-        
-        # First Row - Track Info
-        embed.add_field(
-            name="🎤 Artist",
-            value=f"`{getattr(track, 'author', 'Unknown')}`",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="⏱️ Duration", 
-            value=f"`{self.format_time(duration)}`",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="🔊 Volume",
-            value=f"`{player.volume}%`",
-            inline=True
-        )
-        
-        # Progress bar - Full Width
-        embed.add_field(
-            name="📈 Progress",
-            value=f"```{progress_bar}```",
-            inline=False
-        )
-        
-        # Second Row - Player Status
-        loop_mode = self.get_loop_mode_display(player)
-        
-        embed.add_field(
-            name="🔁 Loop",
-            value=f"`{loop_mode}`",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="👥 Queue",
-            value=f"`{len(player.queue)} tracks`",
-            inline=True
-        )
-        
-        embed.add_field(
-            name="🎧 Status",
-            value=f"`{'Paused' if player.paused else 'Playing'}`",
-            inline=True
-        )
-        
-        # Add thumbnail if available
-        if hasattr(track, 'artwork_url') and track.artwork_url:
-            embed.set_thumbnail(url=track.artwork_url)
-        elif hasattr(track, 'thumbnail') and track.thumbnail:
-            embed.set_thumbnail(url=track.thumbnail)
-        
-        # Footer with controls hint
-        embed.set_footer(
-            text="Use buttons below to control playback • Auto-updates every 10s",
-            icon_url=self.bot.user.avatar.url if self.bot.user and self.bot.user.avatar else None
-        )
-        
-        return embed
     
     def get_loop_mode_display(self, player: wavelink.Player) -> str:
         """Get human-readable loop mode"""
@@ -123,14 +146,14 @@ class EnhancedMusicUI:
 
     def create_progress_bar(self, position: int, duration: int, length: int = 20) -> str:
         """Create visual progress bar with time info"""
+        bars = PROGRESS_BAR if length == PROGRESS_BAR.length else BarTable(length)
         if duration == 0 or position is None or duration is None:
-            return "▱" * length + " --:-- / --:--"
+            return bars[0] + " --:-- / --:--"
             
         progress = min(position / duration, 1.0)
-        filled = int(progress * length)
         
-        # Create the bar
-        bar = "▰" * filled + "▱" * (length - filled)
+        # Look the bar up instead of building it
+        bar = bars.ratio(progress)
         
         # Format times
         current_time = self.format_time(position)
@@ -141,6 +164,25 @@ class EnhancedMusicUI:
         
         return f"{current_time} {bar} {total_time} ({percentage}%)"
     
+    def create_progress_timestamps(self, player: wavelink.Player, track: Any, position: int, duration: int) -> str:
+        """Progress as Discord relative timestamps - every client counts on its own, no edits needed"""
+        guild_id = player.guild.id if player.guild else None
+        if player.paused:
+            # Resuming starts a new anchor - the paused time is not part of the track
+            self.progress_anchors.pop(guild_id, None)
+            return f"⏸️ Paused at `{self.format_time(position)} / {self.format_time(duration)}`"
+        
+        # Anchor the start once per track (and resume/seek) so re-renders don't jitter by a second
+        measured = time.time() - position / 1000
+        started = self.progress_anchors.get(guild_id)
+        if started is None or abs(started - measured) > self.PROGRESS_ANCHOR_SLACK:
+            started = self.progress_anchors[guild_id] = round(measured)
+        if getattr(track, 'is_stream', False) or not duration:
+            return f"🔴 Live • started <t:{started}:R>"
+        
+        ends = started + round(duration / 1000)
+        return f"Started <t:{started}:R> • ends <t:{ends}:R> at <t:{ends}:T>"
+    
     def format_time(self, milliseconds: Optional[int]) -> str:
         """Format time from milliseconds to MM:SS"""
         if milliseconds is None or milliseconds < 0:
@@ -158,73 +200,8 @@ class EnhancedMusicUI:
         return f"{minutes:02d}:{seconds:02d}"
     
     async def create_music_controls_view(self, player: wavelink.Player) -> discord.ui.View:
-        """Create interactive music controls"""
-        
-        class MusicControlsView(discord.ui.View):
-            def __init__(self, ui_handler, player):
-                super().__init__(timeout=None)  # Persistent view
-                self.ui_handler = ui_handler
-                self.player = player
-            
-            @discord.ui.button(emoji="⏯️", style=discord.ButtonStyle.primary, custom_id="play_pause")
-            async def play_pause(self, interaction: discord.Interaction, button: discord.ui.Button):
-                try:
-                    if self.player.paused:
-                        await self.player.pause(False)  # Resume
-                        await interaction.response.send_message("▶️ Resumed playback", ephemeral=True)
-                    else:
-                        await self.player.pause(True)  # Pause
-                        await interaction.response.send_message("⏸️ Paused playback", ephemeral=True)
-                except Exception as e:
-                    await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
-            
-            @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary, custom_id="skip")
-            async def skip_track(self, interaction: discord.Interaction, button: discord.ui.Button):
-                try:
-                    if not self.player.queue:
-                        await interaction.response.send_message("❌ No tracks in queue to skip to", ephemeral=True)
-                        return
-                    
-                    await self.player.skip()
-                    await interaction.response.send_message("⏭️ Skipped to next track", ephemeral=True)
-                except Exception as e:
-                    await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
-            
-            @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.danger, custom_id="stop")
-            async def stop_playback(self, interaction: discord.Interaction, button: discord.ui.Button):
-                try:
-                    await self.player.stop()
-                    await self.player.disconnect()
-                    await interaction.response.send_message("⏹️ Stopped playback and disconnected", ephemeral=True)
-                except Exception as e:
-                    await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
-            
-            @discord.ui.button(emoji="🔀", style=discord.ButtonStyle.secondary, custom_id="shuffle")
-            async def shuffle_queue(self, interaction: discord.Interaction, button: discord.ui.Button):
-                try:
-                    if len(self.player.queue) < 2:
-                        await interaction.response.send_message("❌ Need at least 2 tracks to shuffle", ephemeral=True)
-                        return
-                    
-                    # Manual shuffle since shuffle() might not exist
-                    import random
-                    queue_list = list(self.player.queue)
-                    random.shuffle(queue_list)
-                    
-                    # Clear and refill queue
-                    self.player.queue.clear()
-                    for track in queue_list:
-                        await self.player.queue.put_wait(track)
-                    
-                    await interaction.response.send_message("🔀 Queue shuffled", ephemeral=True)
-                except Exception as e:
-                    await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
-            
-            @discord.ui.button(emoji="📋", style=discord.ButtonStyle.secondary, custom_id="queue")
-            async def show_queue(self, interaction: discord.Interaction, button: discord.ui.Button):
-                await self.ui_handler.show_queue_embed(interaction, self.player)
-        
-        return MusicControlsView(self, player)
+        """Interactive music controls (one shared stateless view for all panels)"""
+        return self.controls_view
     
     async def show_queue_embed(self, interaction: discord.Interaction, player: wavelink.Player):
         """Show queue in a beautiful embed"""
@@ -238,28 +215,95 @@ class EnhancedMusicUI:
             await interaction.response.send_message(embed=embed, ephemeral=True)
             return
         
-        # Create queue embed
-        embed = discord.Embed(
-            title="📋 Music Queue",
-            color=0x3498db,
-            timestamp=datetime.utcnow()
-        )
-        
-        # Show next 10 tracks
-        queue_list = list(player.queue)[:10]
-        queue_text = ""
+        view = QueueBrowserView(self, player) if self.queue_page_count(player) > 1 else None
+        await interaction.response.send_message(embed=self.render_queue_page(player, 0), view=view or discord.utils.MISSING, ephemeral=True)
+        if view is not None:
+            # Lets on_timeout disable the buttons on the ephemeral message
+            view.message = await interaction.original_response()
+    
+    def queue_eta(self, player: wavelink.Player, index: int) -> Optional[int]:
+        """Milliseconds until queue entry `index` starts, None if unknown (streams, track loop)"""
+        queue = player.queue
+        if not isinstance(queue, MusicQueue) or queue.mode is wavelink.QueueMode.loop:
+            return None
         
-        for i, track in enumerate(queue_list, 1):
-            duration = self.format_time(getattr(track, 'length', 0))
-            queue_text += f"`{i}.` **{track.title}** by `{getattr(track, 'author', 'Unknown')}`  •  `{duration}`\n"
+        remaining = 0
+        current = player.current
+        if current:
+            if current.is_stream:
+                return None
+            remaining = max(0, (current.length or 0) - int(player.position or 0))
         
-        if len(player.queue) > 10:
-            queue_text += f"\n*...and {len(player.queue) - 10} more tracks*"
+        before = queue.starts_in(index)
+        return None if before is None else remaining + before
+    
+    def queue_page_count(self, player: wavelink.Player) -> int:
+        """Number of queue pages (at least one, even when empty)"""
+        return max(1, -(-len(player.queue) // self.QUEUE_PAGE_SIZE))
+    
+    def queue_page_entries(self, player: wavelink.Player, page: int) -> List[tuple]:
+        """(line, length) for every track on a page - sliced and formatted once per queue version"""
+        queue = player.queue
+        guild_id = player.guild.id if player.guild else 0
+        version = getattr(queue, 'version', None)
+        key = (id(queue), version)
+        
+        cached = self.queue_pages.get(guild_id)
+        if version is None or not cached or cached[0] != key:
+            cached = (key, {})
+            if version is not None:
+                self.queue_pages[guild_id] = cached
+        
+        entries = cached[1].get(page)
+        if entries is None:
+            start = page * self.QUEUE_PAGE_SIZE
+            entries = []
+            for i, track in enumerate(queue[start:start + self.QUEUE_PAGE_SIZE], start + 1):
+                length = getattr(track, 'length', 0) or 0
+                duration = "LIVE" if length >= STREAM_WEIGHT else self.format_time(length)
+                entries.append((f"`{i}.` **{track.title}** by `{getattr(track, 'author', 'Unknown')}`  •  `{duration}`", length))
+            cached[1][page] = entries
+        return entries
+    
+    def format_queue_page(self, player: wavelink.Player, page: int = 0) -> str:
+        """Queue lines with each track's length and when it starts - O(page), not O(queue)"""
+        eta = self.queue_eta(player, page * self.QUEUE_PAGE_SIZE)
+        queue_text = ""
         
-        embed.description = queue_text
-        embed.set_footer(text=f"Total: {len(player.queue)} tracks")
+        # Lines are cached, "starts in" moves with playback so it is added per render
+        for line, length in self.queue_page_entries(player, page):
+            starts = f"  •  starts in `{self.format_time(eta)}`" if eta is not None else ""
+            queue_text += f"{line}{starts}\n"
+            if eta is not None:
+                eta = None if length >= STREAM_WEIGHT else eta + length
         
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        return queue_text
+    
+    def render_queue_page(self, player: wavelink.Player, page: int = 0) -> discord.Embed:
+        """Queue embed for one page of the browser"""
+        with self.renderer.timer('queue_page'):
+            embed = discord.Embed(
+                title="📋 Music Queue",
+                description=self.format_queue_page(player, page) or "*No tracks on this page*",
+                color=0x3498db,
+                timestamp=datetime.utcnow()
+            )
+            total = self.format_queue_total(player)
+            fair = " • Fair mode: requesters take turns" if getattr(player.queue, 'fair', False) else ""
+            embed.set_footer(
+                text=f"Page {page + 1}/{self.queue_page_count(player)} • Total: {len(player.queue)} tracks{total}{fair}"
+            )
+        return embed
+    
+    def format_queue_total(self, player: wavelink.Player) -> str:
+        """Footer suffix with the queue's total runtime (kept up to date by MusicQueue)"""
+        queue = player.queue
+        if not isinstance(queue, MusicQueue):
+            return ""
+        total = f" • {self.format_time(queue.total_duration)}"
+        if queue.stream_count:
+            total += f" + {queue.stream_count} live"
+        return total
     
     async def create_persistent_panel(self, ctx, player: wavelink.Player, track: Any, force_new: bool = False):
         """Create or update persistent music control panel"""
@@ -275,10 +319,8 @@ class EnhancedMusicUI:
             if existing_panel and not force_new:
                 # Update existing panel
                 try:
-                    message = existing_panel['message']
-                    await message.edit(embed=embed, view=view)
-                    existing_panel['last_update'] = datetime.utcnow()
-                    self.logger.info(f"Updated existing panel for guild {guild_id}")
+                    if await self.edit_panel(existing_panel, embed, view):
+                        self.logger.info(f"Updated existing panel for guild {guild_id}")
                     return
                 except discord.NotFound:
                     # Message was deleted, create new one
@@ -289,21 +331,19 @@ class EnhancedMusicUI:
             # Create new panel
             message = await ctx.send(embed=embed, view=view)
             
-            # Store panel data
+            # Store panel data (ctx may be a bare text channel when restoring sessions)
             self.persistent_panels[guild_id] = {
                 'message': message,
-                'channel': ctx.channel,
+                'channel': getattr(ctx, 'channel', ctx),
                 'player': player,
-                'last_update': datetime.utcnow()
+                'last_update': datetime.utcnow(),
+                'embed_digest': self.embed_digest(embed),
+                'view_digest': panel_digest(view.to_components())
             }
             
-            # Start update task
-            if guild_id in self.update_tasks:
-                self.update_tasks[guild_id].cancel()
-            
-            self.update_tasks[guild_id] = asyncio.create_task(
-                self.update_panel_loop(guild_id)
-            )
+            # Periodic progress updates go through the shared scheduler
+            if not self.zero_poll:
+                self.scheduler.add(guild_id, lambda: self.update_panel(guild_id))
             
             self.logger.info(f"Created new persistent panel for guild {guild_id}")
             
@@ -317,67 +357,162 @@ class EnhancedMusicUI:
             )
             await ctx.send(embed=embed)
     
-    async def update_panel_loop(self, guild_id: int):
-        """Update panel periodically"""
+    async def update_panel(self, guild_id: int) -> bool:
+        """Scheduled update - returns False once the panel should stop updating"""
         
-        while guild_id in self.persistent_panels:
-            try:
-                await asyncio.sleep(10)  # Update every 10 seconds
-                
-                panel_data = self.persistent_panels.get(guild_id)
-                if not panel_data:
-                    break
-                
-                player = panel_data['player']
-                message = panel_data['message']
-                
-                # Check if player is still active
-                if not player.connected or not player.current:
-                    break
-                
-                # Update embed
-                embed = await self.create_now_playing_embed(player, player.current)
-                await message.edit(embed=embed)
-                
-                panel_data['last_update'] = datetime.utcnow()
-                
-            except discord.NotFound:
-                # Message was deleted
-                break
-            except Exception as e:
-                self.logger.error(f"Panel update error: {e}")
-                break
+        panel_data = self.persistent_panels.get(guild_id)
+        if not panel_data:
+            return False
+        
+        player = panel_data['player']
         
-        # Cleanup
-        if guild_id in self.persistent_panels:
-            del self.persistent_panels[guild_id]
-        if guild_id in self.update_tasks:
-            del self.update_tasks[guild_id]
+        # Check if player is still active
+        if not player.connected or not player.current:
+            self.persistent_panels.pop(guild_id, None)
+            return False
+        
+        try:
+            # Timer refreshes skip the render unless the bar moved a cell (or anything else changed);
+            # the MM:SS text ticking on its own is not worth an edit
+            state = self.panel_state(player)
+            dirty = panel_data.pop('dirty', False)
+            view = None
+            if panel_data.pop('dirty_view', False):
+                view = await self.create_music_controls_view(player)
+            if dirty or view is not None or state != panel_data.get('state'):
+                embed = await self.create_now_playing_embed(player, player.current)
+                await self.edit_panel(panel_data, embed, view)
+                panel_data['state'] = state
+            else:
+                self.scheduler.record_edit(sent=False)
+            # Zero-poll panels only come back when something marks them dirty
+            return not self.zero_poll
+        except discord.NotFound:
+            # Message was deleted
+            self.persistent_panels.pop(guild_id, None)
+            return False
     
-    async def refresh_panel_position(self, ctx, player: wavelink.Player):
-        """Refresh panel position by creating new one at bottom"""
+    def panel_state(self, player: wavelink.Player) -> tuple:
+        """What the panel shows, with progress quantized to bar cells"""
+        track = player.current
+        duration = getattr(track, 'length', 0) or 0
+        cell = None
+        if not self.zero_poll and duration:
+            cell = int(min((player.position or 0) / duration, 1.0) * PROGRESS_BAR.length)
+        queue = player.queue
+        loader = getattr(self.bot, 'playlist_loader', None)
+        job = loader.get_job(player.guild.id) if loader and player.guild else None
+        return (
+            getattr(track, 'encoded', None), cell, player.paused, player.volume,
+            self.get_loop_mode_display(player), id(queue), getattr(queue, 'version', len(queue)),
+            job.processed if job else None
+        )
+    
+    @staticmethod
+    def embed_digest(embed: discord.Embed) -> str:
+        """Digest of what the embed shows (the render timestamp alone is not a change)"""
+        payload = embed.to_dict()
+        payload.pop('timestamp', None)
+        return panel_digest(payload)
+    
+    async def edit_panel(self, panel_data: dict, embed: discord.Embed, view: Optional[discord.ui.View] = None) -> bool:
+        """Edit the panel message with only the parts that changed since the last edit
+        
+        Returns False (and skips the REST call) when the render is identical
+        to what the panel already shows.
+        """
+        changes = {}
+        embed_digest = self.embed_digest(embed)
+        if embed_digest != panel_data.get('embed_digest'):
+            changes['embed'] = embed
+        view_digest = None
+        if view is not None:
+            view_digest = panel_digest(view.to_components())
+            if view_digest != panel_data.get('view_digest'):
+                changes['view'] = view
+        
+        if not changes:
+            self.scheduler.record_edit(sent=False)
+            return False
+        
+        await panel_data['message'].edit(**changes)
+        self.scheduler.record_edit(sent=True)
+        panel_data['embed_digest'] = embed_digest
+        if view_digest is not None:
+            panel_data['view_digest'] = view_digest
+        panel_data['last_update'] = datetime.utcnow()
+        return True
+    
+    def forget_panel(self, guild_id: int):
+        """Drop the panel reference, its scheduled updates and cached queue pages"""
+        self.persistent_panels.pop(guild_id, None)
+        self.queue_pages.pop(guild_id, None)
+        self.progress_anchors.pop(guild_id, None)
+        self.scheduler.remove(guild_id)
+    
+    def mark_dirty(self, player: wavelink.Player, view: bool = False) -> bool:
+        """Flag the panel for re-rendering; a burst of changes becomes one edit after the debounce window"""
         
-        if not player or not player.current:
-            return
-            
-        guild_id = ctx.guild.id
+        if not player.guild:
+            return False
         
-        # Cancel old panel update task
-        if guild_id in self.update_tasks:
-            self.update_tasks[guild_id].cancel()
+        guild_id = player.guild.id
+        panel_data = self.persistent_panels.get(guild_id)
+        if not panel_data:
+            return False
+        
+        panel_data['dirty'] = True
+        if view:
+            panel_data['dirty_view'] = True
+        return self.scheduler.expedite(guild_id, lambda: self.update_panel(guild_id))
+    
+    async def refresh_panel(self, player: wavelink.Player):
+        """Re-render existing panel embed in place (debounced)"""
+        self.mark_dirty(player)
+    
+    async def shuffle(self, player: wavelink.Player, fair: bool = False) -> int:
+        """Shuffle queue in place and re-render the panel once"""
+        count = shuffle_queue(player.queue, fair=fair)
+        await self.refresh_panel(player)
+        return count
+    
+    def refresh_panel_position(self, ctx, player: wavelink.Player):
+        """Move the panel below the latest message in the background
         
-        # Delete old panel reference (don't delete message to avoid spam)
-        if guild_id in self.persistent_panels:
-            old_panel = self.persistent_panels[guild_id]
-            # Optionally delete old message after delay
-            try:
-                await asyncio.sleep(2)
-                await old_panel['message'].delete()
-            except:
-                pass
+        Requests arriving while a move is running are folded into one more
+        move at the end; the old panel messages are deleted in batches.
+        """
         
-        # Create fresh panel at current position
-        await self.create_persistent_panel(ctx, player, player.current, force_new=True)
+        if not player or not player.current or not ctx.guild:
+            return
+        
+        guild_id = ctx.guild.id
+        self.relocate_requests[guild_id] = (ctx, player)
+        task = self.relocations.get(guild_id)
+        if not task or task.done():
+            self.relocations[guild_id] = asyncio.create_task(self._relocate_panel(guild_id))
+    
+    async def _relocate_panel(self, guild_id: int):
+        """Background job behind refresh_panel_position"""
+        try:
+            while guild_id in self.relocate_requests:
+                ctx, player = self.relocate_requests.pop(guild_id)
+                if not player.current:
+                    continue
+                
+                # The scheduler entry stays: it refreshes whichever panel the guild has, so
+                # the old one keeps updating if the new message can't be sent
+                old_panel = self.persistent_panels.get(guild_id)
+                
+                # Create fresh panel at current position
+                await self.create_persistent_panel(ctx, player, player.current, force_new=True)
+                
+                if old_panel and self.persistent_panels.get(guild_id) is not old_panel:
+                    self.cleanup.discard(old_panel['message'])
+        except Exception as e:
+            self.logger.warning(f"Failed to move panel in guild {guild_id}: {e}")
+        finally:
+            self.relocations.pop(guild_id, None)
 
 class MusicCommands(commands.Cog):
     """Enhanced Music Commands with Beautiful UI"""
@@ -385,8 +520,78 @@ class MusicCommands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.ui_handler = EnhancedMusicUI(bot)
+        self.resolver: TrackResolver = getattr(bot, 'track_resolver', None) or TrackResolver()
+        self.playlist_loader: PlaylistLoader = getattr(bot, 'playlist_loader', None) or PlaylistLoader()
+        self.search_race: SearchRace = getattr(bot, 'search_race', None) or SearchRace(self.resolver)
+        self.prefetcher: TrackPrefetcher = getattr(bot, 'track_prefetcher', None) or TrackPrefetcher(self.resolver)
+        self.bulk_importer: BulkImporter = getattr(bot, 'bulk_importer', None) or BulkImporter(self.search_race)
+        self.suggestions: TrackSuggestions = getattr(bot, 'track_suggestions', None) or TrackSuggestions()
+        self.queue_store: Optional[QueueStore] = getattr(bot, 'queue_store', None)
+        self.fair_guilds: Set[int] = set()  # guilds whose queue takes turns between requesters
+        self.duplicate_policy: str = getattr(getattr(bot, 'config', None), 'DUPLICATE_POLICY', 'flag')
+        self.max_queue_size: int = getattr(getattr(bot, 'config', None), 'MAX_QUEUE_SIZE', 50)
         self.logger = logging.getLogger('music_commands')
     
+    def save_player_state(self, player: wavelink.Player):
+        """Persist current track/position/volume (no-op for players that aren't mirrored)"""
+        if self.queue_store:
+            self.queue_store.save_state(player)
+    
+    async def restore_session(self, snapshot: QueueSnapshot) -> bool:
+        """Reconnect a session saved before the last restart (called by SessionRestorer)"""
+        
+        guild = self.bot.get_guild(snapshot.guild_id)
+        if guild and guild.voice_client:
+            # Somebody already started a new session since boot
+            return False
+        
+        channel = guild.get_channel(snapshot.voice_channel_id) if guild and snapshot.voice_channel_id else None
+        listeners = [m for m in getattr(channel, 'members', []) if not m.bot]
+        
+        records = snapshot.build_records(guild.get_member) if guild else []
+        current = None
+        if snapshot.current_encoded:
+            try:
+                current = playable_from_encoded(snapshot.current_encoded)
+            except TrackDecodeError as e:
+                self.logger.warning(f"Saved current track in guild {snapshot.guild_id} is unreadable: {e}")
+        
+        if not isinstance(channel, discord.VoiceChannel) or not listeners or not (current or records):
+            # Guild/channel gone, nobody listening or nothing to play - drop the session
+            if self.queue_store:
+                self.queue_store.forget(snapshot.guild_id)
+            return False
+        
+        player = await channel.connect(cls=EnhancedPlayer)
+        try:
+            player.autoplay = wavelink.AutoPlayMode.partial
+            player.queue.fair = guild.id in self.fair_guilds
+            player.queue.put(records)
+            if self.queue_store:
+                self.queue_store.attach(player, snapshot.text_channel_id)
+            
+            start = 0
+            if current:
+                if snapshot.current_requester_id:
+                    setattr(current, 'requester', guild.get_member(snapshot.current_requester_id))
+                if not current.is_stream:
+                    start = max(0, snapshot.position or 0)
+            else:
+                current = player.queue.get()
+            
+            await player.play(current, start=start, volume=snapshot.volume, paused=bool(snapshot.paused))
+        except Exception:
+            await player.disconnect()
+            raise
+        
+        text_channel = guild.get_channel(snapshot.text_channel_id) if snapshot.text_channel_id else None
+        if isinstance(text_channel, discord.TextChannel):
+            await self.ui_handler.create_persistent_panel(text_channel, player, current)
+        
+        self.logger.info(f"Restored session in guild {guild.id}: {current.title} "
+                         f"at {self.ui_handler.format_time(start)}, {len(records)} queued")
+        return True
+    
     def get_player(self, ctx) -> Optional[wavelink.Player]:
         """Get player for guild"""
         try:
@@ -394,33 +599,50 @@ class MusicCommands(commands.Cog):
         except:
             return None
     
-    @commands.hybrid_command(name="play", description="Play music with enhanced UI")
+    async def join_player(self, ctx) -> Optional[wavelink.Player]:
+        """Voice check plus get-or-create of the guild's player (None if the author isn't in voice)"""
+        
+        # Check if user is in voice channel
+        if not ctx.author.voice:
+            embed = discord.Embed(
+                title="❌ Voice Channel Required",
+                description="You need to be in a voice channel to use this command!",
+                color=0xff6b6b
+            )
+            await ctx.send(embed=embed)
+            return None
+        
+        # Get or create player
+        player = self.get_player(ctx)
+        if not player:
+            player = await ctx.author.voice.channel.connect(cls=EnhancedPlayer)
+            player.queue.fair = ctx.guild.id in self.fair_guilds
+        
+        # Mirror the queue to SQLite so it survives restarts
+        if self.queue_store:
+            self.queue_store.attach(player, ctx.channel.id)
+        
+        # wavelink advances the queue (loop modes included) with queue.get(); recommendations
+        # stay off - they would read the shared history ring as a wavelink Queue
+        player.autoplay = wavelink.AutoPlayMode.partial
+        return player
+    
+    @commands.hybrid_command(name="play", description="Play music with enhanced UI (separate songs with |)")
     async def enhanced_play(self, ctx, *, query: str):
         """Enhanced play command with beautiful UI"""
         
         try:
-            # Check if user is in voice channel
-            if not ctx.author.voice:
-                embed = discord.Embed(
-                    title="❌ Voice Channel Required",
-                    description="You need to be in a voice channel to use this command!",
-                    color=0xff6b6b
-                )
-                return await ctx.send(embed=embed)
-            
-            # Get or create player
-            player = self.get_player(ctx)
+            player = await self.join_player(ctx)
             if not player:
-                player = await ctx.author.voice.channel.connect(cls=wavelink.Player)
+                return
             
-            # Set up autoplay
-            player.autoplay = wavelink.AutoPlayMode.enabled
+            # `!play a | b | c` - resolve everything at once, one summary message
+            queries = split_queries(query)
+            if len(queries) > 1:
+                return await self.play_many(ctx, player, queries)
 
-            # Search for tracks
-            if query.startswith(("http://", "https://")):
-                tracks = await wavelink.Pool.fetch_tracks(query)
-            else:
-                tracks = await wavelink.Pool.fetch_tracks(f"ytsearch:{query}")
+            # Search for tracks - text is raced across sources, URLs pass through unchanged
+            tracks = await self.search_race.search(query)
             
             if not tracks:
                 embed = discord.Embed(
@@ -430,19 +652,49 @@ class MusicCommands(commands.Cog):
                 )
                 return await ctx.send(embed=embed)
             
+            # Playlists are streamed into the queue in the background
+            if isinstance(tracks, wavelink.Playlist):
+                return await self.play_playlist(ctx, player, tracks)
+            
             track = tracks[0]
+            setattr(track, 'requester', ctx.author)
             
             # Add to queue or play
             if player.current:
-                await player.queue.put_wait(track)
+                # Identifier index makes this O(1) no matter how long the queue is
+                queued = player.queue.count_identifier(track.identifier) if isinstance(player.queue, MusicQueue) else 0
+                playing = player.current.identifier == track.identifier
+                if (queued or playing) and self.duplicate_policy == 'reject':
+                    embed = discord.Embed(
+                        title="🔁 Already Queued",
+                        description=f"**{track.title}** is already {'playing' if playing else 'in the queue'}",
+                        color=0xff6b6b
+                    )
+                    return await ctx.send(embed=embed)
+                
+                if isinstance(player.queue, MusicQueue):
+                    index = player.queue.enqueue(track)
+                else:
+                    await player.queue.put_wait(track)
+                    index = len(player.queue) - 1
+                if index == 0:
+                    # New queue head - get it ready before the current track ends
+                    self.prefetcher.schedule(player)
                 embed = discord.Embed(
                     title="📋 Added to Queue",
                     description=f"**[{track.title}]({getattr(track, 'uri', 'https://discord.com')})**\nby `{getattr(track, 'author', 'Unknown')}`",
                     color=0x00ff00
                 )
-                embed.add_field(name="Position", value=f"`#{len(player.queue)}`", inline=True)
+                embed.add_field(name="Position", value=f"`#{index + 1}`", inline=True)
                 embed.add_field(name="Duration", value=f"`{self.ui_handler.format_time(getattr(track, 'length', 0))}`", inline=True)
+                eta = self.ui_handler.queue_eta(player, index)
+                if eta is not None:
+                    embed.add_field(name="Starts In", value=f"`{self.ui_handler.format_time(eta)}`", inline=True)
+                if (queued or playing) and self.duplicate_policy == 'flag':
+                    note = "Currently playing" if playing else f"Already queued {queued}×"
+                    embed.add_field(name="⚠️ Duplicate", value=f"{note} - `!dedupe` cleans it up", inline=False)
                 await ctx.send(embed=embed)
+                await self.ui_handler.refresh_panel(player)
             else:
                 await player.play(track)
                 # Create persistent panel
@@ -457,6 +709,174 @@ class MusicCommands(commands.Cog):
             )
             await ctx.send(embed=embed)
     
+    async def play_many(self, ctx, player: wavelink.Player, queries: List[str], source: Optional[str] = None):
+        """Resolve many queries concurrently, queue them in their original order and post one summary"""
+        
+        async with ctx.typing():
+            result = await self.bulk_importer.resolve(queries)
+        
+        tracks = result.tracks
+        for track in tracks:
+            setattr(track, 'requester', ctx.author)
+        
+        # Same duplicate policy as a single !play - against the queue, the current track and the batch itself
+        duplicates, repeated = 0, set()
+        if self.duplicate_policy in ('reject', 'flag') and isinstance(player.queue, MusicQueue):
+            seen = {player.current.identifier} if player.current else set()
+            kept = []
+            for track in tracks:
+                if track.identifier in seen or player.queue.count_identifier(track.identifier):
+                    duplicates += 1
+                    if self.duplicate_policy == 'reject':
+                        continue
+                    repeated.add(id(track))
+                seen.add(track.identifier)
+                kept.append(track)
+            tracks = kept
+        
+        started = None
+        if not player.current and tracks:
+            started = tracks.pop(0)
+            await player.play(started)
+        
+        room = max(0, self.max_queue_size - len(player.queue))
+        queued, overflow = tracks[:room], len(tracks) - min(room, len(tracks))
+        if queued:
+            player.queue.put(queued)
+            self.prefetcher.schedule(player)
+        
+        if started:
+            await self.ui_handler.create_persistent_panel(ctx, player, started)
+        else:
+            await self.ui_handler.refresh_panel(player)
+        
+        added = len(queued) + (1 if started else 0)
+        embed = discord.Embed(
+            title="📥 Tracks Imported",
+            description=f"Added `{added}` tracks from `{len(result.queries)}` entries" + (f" in **{source}**" if source else ""),
+            color=0x00ff00 if added else 0xff6b6b
+        )
+        if started:
+            embed.add_field(name="Now Playing", value=f"**{started.title}**", inline=False)
+        if result.failed:
+            shown = "\n".join(f"• `{query[:80]}`" for query in result.failed[:10])
+            if len(result.failed) > 10:
+                shown += f"\n*...and {len(result.failed) - 10} more*"
+            embed.add_field(name=f"❌ Not Found ({len(result.failed)})", value=shown, inline=False)
+        
+        notes = []
+        if len(queries) > len(result.queries):
+            notes.append(f"only the first {len(result.queries)} entries are imported")
+        if overflow:
+            notes.append(f"{overflow} skipped - queue is full ({self.max_queue_size})")
+        if duplicates and self.duplicate_policy == 'reject':
+            notes.append(f"{duplicates} duplicates skipped")
+        if notes:
+            embed.add_field(name="⚠️ Notes", value="\n".join(notes), inline=False)
+        
+        flagged = [track for track in ([started] if started else []) + queued if id(track) in repeated]
+        if flagged:
+            shown = "\n".join(f"• `{track.title[:80]}`" for track in flagged[:10])
+            if len(flagged) > 10:
+                shown += f"\n*...and {len(flagged) - 10} more*"
+            embed.add_field(name=f"⚠️ Duplicates ({len(flagged)})", value=f"{shown}\n`!dedupe` cleans them up", inline=False)
+        
+        embed.set_footer(text=f"Queue: {len(player.queue)} tracks{self.ui_handler.format_queue_total(player)}")
+        await ctx.send(embed=embed)
+    
+    @commands.hybrid_command(name="import", description="Queue every song from an attached .txt or .m3u list")
+    @app_commands.describe(file="Text file with one song per line, or an M3U playlist")
+    async def import_enhanced(self, ctx, file: Optional[discord.Attachment] = None):
+        """Bulk-queue a track list file"""
+        
+        attachment = file or (ctx.message.attachments[0] if ctx.message and ctx.message.attachments else None)
+        if not attachment or not attachment.filename.lower().endswith(TRACK_LIST_EXTENSIONS):
+            embed = discord.Embed(
+                title="❌ No Track List",
+                description="Attach a `.txt` (one song per line) or `.m3u` file to `!import`",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+        
+        if attachment.size > 256 * 1024:
+            embed = discord.Embed(
+                title="❌ File Too Large",
+                description="Track lists can be at most 256 KB",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+        
+        queries = parse_track_list((await attachment.read()).decode('utf-8', errors='replace'))
+        if not queries:
+            embed = discord.Embed(
+                title="❌ Empty Track List",
+                description=f"No songs found in `{attachment.filename}`",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+        
+        player = await self.join_player(ctx)
+        if player:
+            await self.play_many(ctx, player, queries, source=attachment.filename)
+    
+    async def play_playlist(self, ctx, player: wavelink.Player, playlist: wavelink.Playlist):
+        """Start playback on the first track and append the rest in background batches"""
+        
+        tracks = list(playlist.tracks)
+        selected = playlist.selected if 0 < playlist.selected < len(tracks) else 0
+        if selected:
+            # Link pointed at a specific video inside the playlist - start there, the ones before it come last
+            tracks = tracks[selected:] + tracks[:selected]
+        
+        started_now = not player.current
+        if started_now:
+            first = tracks.pop(0)
+            setattr(first, 'requester', ctx.author)
+            await player.play(first)
+            await self.ui_handler.create_persistent_panel(ctx, player, first)
+        
+        # The loader stops at the queue limit - report what will actually be queued
+        room = max(0, self.playlist_loader.max_queue_size - len(player.queue))
+        queued = min(len(tracks), room) + (1 if started_now else 0)
+        
+        job = None
+        if tracks:
+            job = self.playlist_loader.start(
+                player,
+                playlist.name,
+                tracks,
+                requester=ctx.author,
+                on_progress=lambda _: self.ui_handler.refresh_panel(player)
+            )
+        
+        count = f"`{queued}` tracks"
+        if queued < len(playlist.tracks):
+            count = f"`{queued}` of `{len(playlist.tracks)}` tracks - queue is full ({self.playlist_loader.max_queue_size})"
+        embed = discord.Embed(
+            title="📥 Playlist Added",
+            description=f"**{playlist.name}**\n{count}",
+            color=0x00ff00
+        )
+        if selected:
+            embed.add_field(name="Starting At", value=f"`#{selected + 1}` - earlier tracks are queued at the end", inline=False)
+        if started_now:
+            embed.add_field(name="Now Playing", value=f"**{player.current.title}**", inline=False)
+        if job:
+            embed.set_footer(text="Remaining tracks are being added in the background")
+        await ctx.send(embed=embed)
+
+    @enhanced_play.autocomplete('query')
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
+        """Suggest previously played tracks - answered from memory, no Lavalink search"""
+        if not interaction.guild_id:
+            return []
+
+        entries = self.suggestions.suggest(interaction.guild_id, current)
+        return [
+            app_commands.Choice(name=entry.label[:MAX_CHOICE_LENGTH], value=entry.value)
+            for entry in entries
+        ]
+
     @commands.hybrid_command(name="volume", description="Set volume with visual feedback")
     async def volume_enhanced(self, ctx, volume: Optional[int] = None):
         """Enhanced volume control"""
@@ -479,7 +899,7 @@ class MusicCommands(commands.Cog):
             )
             
             # Add volume bar
-            vol_bar = "▰" * (player.volume // 10) + "▱" * (10 - player.volume // 10)
+            vol_bar = VOLUME_BAR[player.volume // 10]
             embed.add_field(
                 name="Volume Bar",
                 value=f"```{vol_bar} {player.volume}%```",
@@ -500,6 +920,7 @@ class MusicCommands(commands.Cog):
             return await ctx.send(embed=embed)
         
         await player.set_volume(volume)
+        self.save_player_state(player)
         
         # Visual feedback
         embed = discord.Embed(
@@ -508,7 +929,7 @@ class MusicCommands(commands.Cog):
             color=0x00ff00
         )
         
-        vol_bar = "▰" * (volume // 10) + "▱" * (10 - volume // 10)
+        vol_bar = VOLUME_BAR[volume // 10]
         embed.add_field(
             name="Volume Bar",
             value=f"```{vol_bar} {volume}%```",
@@ -542,29 +963,16 @@ class MusicCommands(commands.Cog):
             await self.send_with_panel_refresh(ctx, embed)
             return
         
-        # Create queue embed
-        embed = discord.Embed(
-            title="📋 Music Queue",
-            color=0x3498db,
-            timestamp=datetime.utcnow()
-        )
-        
-        # Show next 10 tracks
-        queue_list = list(player.queue)[:10]
-        queue_text = ""
-        
-        for i, track in enumerate(queue_list, 1):
-            duration = self.ui_handler.format_time(getattr(track, 'length', 0))
-            queue_text += f"`{i}.` **{track.title}** by `{getattr(track, 'author', 'Unknown')}`  •  `{duration}`\n"
-        
-        if len(player.queue) > 10:
-            queue_text += f"\n*...and {len(player.queue) - 10} more tracks*"
-        
-        embed.description = queue_text
-        embed.set_footer(text=f"Total: {len(player.queue)} tracks")
+        # First page, with buttons to browse the rest
+        embed = self.ui_handler.render_queue_page(player, 0)
+        view = None
+        if self.ui_handler.queue_page_count(player) > 1:
+            view = QueueBrowserView(self.ui_handler, player)
         
         # Send and refresh panel
-        await self.send_with_panel_refresh(ctx, embed)
+        message = await self.send_with_panel_refresh(ctx, embed, view)
+        if view:
+            view.message = message
     
     @commands.hybrid_command(name="nowplaying", aliases=["np"], description="Show enhanced now playing")
     async def now_playing_enhanced(self, ctx):
@@ -604,6 +1012,8 @@ class MusicCommands(commands.Cog):
             return await ctx.send(embed=embed)
         
         await player.pause(True)
+        self.save_player_state(player)
+        await self.ui_handler.refresh_panel(player)
         embed = discord.Embed(
             title="⏸️ Paused",
             description=f"Paused: **{player.current.title}**",
@@ -633,6 +1043,8 @@ class MusicCommands(commands.Cog):
             return await ctx.send(embed=embed)
         
         await player.pause(False)  # Resume
+        self.save_player_state(player)
+        await self.ui_handler.refresh_panel(player)
         embed = discord.Embed(
             title="▶️ Resumed",
             description=f"Resumed: **{player.current.title}**",
@@ -670,7 +1082,162 @@ class MusicCommands(commands.Cog):
             )
         
         await ctx.send(embed=embed)
-    
+
+    @commands.hybrid_command(name="shuffle", description="Shuffle the queue (use 'fair' to alternate requesters)")
+    @app_commands.describe(mode="'fair' gives every requester a turn before anyone plays twice")
+    async def shuffle_enhanced(self, ctx, mode: Optional[str] = None):
+        """Shuffle queue in place, optionally fair by requester"""
+
+        player = self.get_player(ctx)
+        if not player or len(player.queue) < 2:
+            embed = discord.Embed(
+                title="❌ Not Enough Tracks",
+                description="Need at least 2 tracks in queue to shuffle",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+
+        fair = (mode or '').lower() == 'fair'
+        count = await self.ui_handler.shuffle(player, fair=fair)
+
+        embed = discord.Embed(
+            title="🔀 Queue Shuffled",
+            description=f"Shuffled `{count}` tracks" + (" • requesters take turns" if fair else ""),
+            color=0x00ff00
+        )
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="fair", description="Let requesters take turns in the queue")
+    @app_commands.describe(mode="'on' or 'off' - toggles when omitted")
+    async def fair_enhanced(self, ctx, mode: Optional[str] = None):
+        """Toggle requester-fair round-robin scheduling for this server"""
+
+        mode = (mode or '').lower()
+        if mode not in ('', 'on', 'off'):
+            embed = discord.Embed(
+                title="❌ Invalid Mode",
+                description="Use `on`, `off` or no argument to toggle",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+
+        enabled = mode == 'on' if mode else ctx.guild.id not in self.fair_guilds
+        if enabled:
+            self.fair_guilds.add(ctx.guild.id)
+        else:
+            self.fair_guilds.discard(ctx.guild.id)
+
+        player = self.get_player(ctx)
+        if player and isinstance(player.queue, MusicQueue):
+            # Turning it on re-orders the current queue into turns straight away
+            player.queue.fair = enabled
+            self.prefetcher.schedule(player)
+            await self.ui_handler.refresh_panel(player)
+
+        if enabled:
+            description = "Requesters now take turns - one track each before anyone plays twice"
+        else:
+            description = "Tracks play in the order they were added"
+        embed = discord.Embed(
+            title="⚖️ Fair Mode " + ("On" if enabled else "Off"),
+            description=description,
+            color=0x00ff00
+        )
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="dedupe", description="Remove duplicate tracks from the queue")
+    async def dedupe_enhanced(self, ctx):
+        """Keep the first copy of every queued track and drop copies of the current one"""
+
+        player = self.get_player(ctx)
+        if not player or not isinstance(player.queue, MusicQueue) or not player.queue:
+            embed = discord.Embed(
+                title="❌ Queue is Empty",
+                description="There is nothing to clean up",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+
+        removed = player.queue.dedupe(drop=player.current.identifier if player.current else None)
+        if removed:
+            self.prefetcher.schedule(player)
+            await self.ui_handler.refresh_panel(player)
+
+        embed = discord.Embed(
+            title="🧹 Queue Deduplicated",
+            description=f"Removed `{removed}` duplicate tracks" if removed else "No duplicates found",
+            color=0x00ff00
+        )
+        embed.set_footer(text=f"{len(player.queue)} tracks left in queue")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="previous", aliases=["back"], description="Play the previous track again")
+    async def previous_enhanced(self, ctx):
+        """Go back one track - the current one is queued up next"""
+
+        player = self.get_player(ctx)
+        history = player.queue.history if player else None
+        needed = 2 if player and player.current else 1  # the current track is the newest entry
+        if not isinstance(history, PlaybackHistory) or len(history) < needed:
+            embed = discord.Embed(
+                title="❌ No Previous Track",
+                description="Nothing has been played before this track",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+
+        current = player.current
+        if current:
+            history.pop()
+            player.queue.put_at(0, current)
+        previous = history[-1].to_playable()
+        # Still the newest history entry - don't record it twice
+        await player.play(previous, add_history=False)
+
+        embed = discord.Embed(
+            title="⏮️ Previous Track",
+            description=f"**{previous.title}** by `{previous.author}`",
+            color=0x00ff00
+        )
+        if current:
+            embed.set_footer(text=f"Up next: {current.title}")
+        await ctx.send(embed=embed)
+
+    @commands.hybrid_command(name="history", description="Show recently played tracks")
+    @app_commands.describe(page="Page number (newest tracks first)")
+    async def history_enhanced(self, ctx, page: int = 1):
+        """Recently played tracks of this server, newest first"""
+
+        budget = getattr(self.bot, 'history_budget', None)
+        player = self.get_player(ctx)
+        history = player.queue.history if player else (budget.get(ctx.guild.id) if budget else None)
+        if not isinstance(history, PlaybackHistory) or not history:
+            embed = discord.Embed(
+                title="📜 No History",
+                description="Nothing has been played yet. Start with `!play`!",
+                color=0xff6b6b
+            )
+            return await ctx.send(embed=embed)
+
+        per_page = 10
+        pages = (len(history) + per_page - 1) // per_page
+        page = max(1, min(page, pages))
+        start = (page - 1) * per_page
+
+        lines = []
+        for i, record in enumerate(history.recent(start, per_page), start + 1):
+            requester = getattr(record.requester, 'mention', None)
+            by = f" • {requester}" if requester else ""
+            lines.append(f"`{i}.` **{record.title}** by `{record.author or 'Unknown'}`{by}")
+
+        embed = discord.Embed(
+            title="📜 Recently Played",
+            description="\n".join(lines),
+            color=0x3498db
+        )
+        embed.set_footer(text=f"Page {page}/{pages} • last {len(history)} of max {history.capacity} tracks")
+        await ctx.send(embed=embed)
+
     @commands.hybrid_command(name="stop", description="Stop playback and disconnect")
     async def stop_enhanced(self, ctx):
         """Stop playback and disconnect"""
@@ -684,15 +1251,7 @@ class MusicCommands(commands.Cog):
             )
             return await ctx.send(embed=embed)
         
-        await player.stop()
-        await player.disconnect()
-        
-        # Cleanup UI
-        if ctx.guild.id in self.ui_handler.persistent_panels:
-            del self.ui_handler.persistent_panels[ctx.guild.id]
-        if ctx.guild.id in self.ui_handler.update_tasks:
-            self.ui_handler.update_tasks[ctx.guild.id].cancel()
-            del self.ui_handler.update_tasks[ctx.guild.id]
+        await self.stop_player(player)
         
         embed = discord.Embed(
             title="⏹️ Stopped",
@@ -701,15 +1260,33 @@ class MusicCommands(commands.Cog):
         )
         await ctx.send(embed=embed)
 
-    async def send_with_panel_refresh(self, ctx, embed: discord.Embed):
+    async def stop_player(self, player: wavelink.Player):
+        """Stop playback, disconnect and drop every per-guild job (!stop and the panel's stop button)"""
+        guild_id = player.guild.id if player.guild else None
+        if guild_id is not None:
+            self.playlist_loader.cancel(guild_id)
+            self.prefetcher.forget(guild_id)
+            if self.queue_store:
+                self.queue_store.forget(guild_id)
+        # Stopping ends the track - autoplay must not start the next one
+        player.autoplay = wavelink.AutoPlayMode.disabled
+        await player.stop()
+        await player.disconnect()
+        
+        # Cleanup UI
+        if guild_id is not None:
+            self.ui_handler.forget_panel(guild_id)
+
+    async def send_with_panel_refresh(self, ctx, embed: discord.Embed, view: Optional[discord.ui.View] = None) -> discord.Message:
         """Send embed and refresh panel position"""
         
-        await ctx.send(embed=embed)
+        message = await ctx.send(embed=embed, view=view)
         
-        # Refresh panel position if music is playing
+        # Move the panel below the reply in the background if music is playing
         player = self.get_player(ctx)
         if player and player.current:
-            await self.ui_handler.refresh_panel_position(ctx, player)
+            self.ui_handler.refresh_panel_position(ctx, player)
+        return message
     
     @commands.hybrid_command(name="panel", aliases=["controls"], description="Show music control panel")
     async def refresh_panel(self, ctx):
@@ -744,31 +1321,30 @@ class MusicCommands(commands.Cog):
         if not player:
             return
             
+        # Track was replaced by an explicit play() - nothing to advance
+        if payload.reason == "replaced":
+            return
+        
+        # wavelink's autoplay task (AutoPlayMode.partial) is created right after this listener
+        # and pops the next track as soon as it runs - decide before it does
+        finished = player.queue.is_empty and player.queue.mode is wavelink.QueueMode.normal
+        
         # Log the track end
         guild_id = player.guild.id if player.guild else "Unknown"
         self.logger.info(f"Track ended in guild {guild_id}: {payload.track.title if payload.track else 'Unknown'}")
         
-        # Check if there are tracks in queue
-        if not player.queue.is_empty:
-            try:
-                # Get next track
-                next_track = await player.queue.get_wait()
-                
-                # Play next track
-                await player.play(next_track)
-                
-                self.logger.info(f"Auto-playing next track: {next_track.title}")
-                
-                # Update any existing panels
-                await self.update_panels_for_new_track(player, next_track)
-                
-            except Exception as e:
-                self.logger.error(f"Error auto-playing next track: {e}")
+        if not finished:
+            # wavelink plays the (prefetched) queue head, track_start updates the panels
+            if player.guild:
+                self.prefetcher.mark_track_end(player.guild.id)
         else:
             # Queue is empty, clean up panels
             guild_id = player.guild.id if player.guild else "Unknown"
             self.logger.info(f"Queue empty in guild {guild_id}, playback finished")
             if player.guild:
+                self.prefetcher.forget(player.guild.id)
+                if self.queue_store:
+                    self.queue_store.forget(player.guild.id)
                 await self.cleanup_panels_for_guild(player.guild.id)
     
     @commands.Cog.listener()
@@ -784,6 +1360,16 @@ class MusicCommands(commands.Cog):
         guild_id = player.guild.id if player.guild else "Unknown"
         self.logger.info(f"Track started in guild {guild_id}: {track.title}")
         
+        if player.guild:
+            # Record track-to-track gap and get the following track ready
+            self.prefetcher.mark_track_start(player.guild.id, track)
+            self.prefetcher.schedule(player)
+            # Make it available to /play autocomplete
+            self.suggestions.record(player.guild.id, track)
+            self.save_player_state(player)
+            # New track - the next panel render anchors its start time
+            self.ui_handler.progress_anchors.pop(player.guild.id, None)
+        
         # Update panels for new track
         await self.update_panels_for_new_track(player, track)
     
@@ -797,31 +1383,15 @@ class MusicCommands(commands.Cog):
         panel_data = self.ui_handler.persistent_panels.get(guild_id)
         
         if panel_data:
-            try:
-                # Update the embed with new track info
-                embed = await self.ui_handler.create_now_playing_embed(player, track)
-                view = await self.ui_handler.create_music_controls_view(player)
-                
-                message = panel_data['message']
-                await message.edit(embed=embed, view=view)
-                
-                panel_data['last_update'] = datetime.utcnow()
-                
-                self.logger.info(f"Updated panel for new track in guild {guild_id}")
-                
-            except discord.NotFound:
-                # Panel message was deleted
-                del self.ui_handler.persistent_panels[guild_id]
-            except Exception as e:
-                self.logger.error(f"Error updating panel for new track: {e}")
+            # track_end and track_start both land here for one change - the debounce folds them
+            if self.ui_handler.mark_dirty(player, view=True):
+                self.logger.info(f"Scheduled panel update for new track in guild {guild_id}")
     
     async def cleanup_panels_for_guild(self, guild_id: int):
         """Clean up panels when playback ends"""
         
-        # Cancel update tasks
-        if guild_id in self.ui_handler.update_tasks:
-            self.ui_handler.update_tasks[guild_id].cancel()
-            del self.ui_handler.update_tasks[guild_id]
+        # Stop scheduled updates
+        self.ui_handler.scheduler.remove(guild_id)
         
         # Remove panel reference
         if guild_id in self.ui_handler.persistent_panels:
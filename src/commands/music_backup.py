@@ -6,10 +6,13 @@ import wavelink
 import asyncio
 import logging
 import re
-import random
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union, Any
 
+from config import Config
+from services.track_resolver import TrackResolver
+from utils.music_queue import MusicQueue, shuffle_queue
+
 # Import formatters z utils
 from utils.formatters import (
     format_duration, 
@@ -48,7 +51,7 @@ class MusicPlayer(wavelink.Player):
         super().__init__(*args, **kwargs)
         
         # Enhanced properties
-        self.queue = wavelink.Queue()
+        self.queue = MusicQueue.for_player(self)
         self.loop_mode = "off"
         self.last_activity = datetime.now(timezone.utc)
         self.current_message: Optional[discord.Message] = None
@@ -60,7 +63,7 @@ class MusicPlayer(wavelink.Player):
         self.persistent_panel: Optional[discord.Message] = None
         
         # Queue limits
-        self.max_queue_size = 50
+        self.max_queue_size = Config.MAX_QUEUE_SIZE
         self.max_track_duration = 1800
         
         self.logger = logger
@@ -249,10 +252,6 @@ class MusicPlayer(wavelink.Player):
         setattr(track, 'requester', requester)
         await self.queue.put_wait(track)
         
-        if not hasattr(self, '_original_queue'):
-            self._original_queue = []
-        self._original_queue.append(track)
-        
         self.update_activity()
         return True
 
@@ -262,6 +261,7 @@ class MusicCommands(commands.Cog):
     
     def __init__(self, bot):
         self.bot = bot
+        self.resolver: TrackResolver = getattr(bot, 'track_resolver', None) or TrackResolver()
         self.url_regex = re.compile(
             r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
         )
@@ -296,7 +296,8 @@ class MusicCommands(commands.Cog):
                     player = ctx.guild.voice_client
             
                 # STEP 3: Wyszukaj utwór
-                tracks = await wavelink.Playable.search(search)
+                # Playable.search defaults to YouTube Music for plain text
+                tracks = await self.resolver.search(search, source='ytmsearch')
                 if not tracks:
                     return await ctx.send("❌ Nie znaleziono utworów!")
                 
@@ -406,8 +407,6 @@ class MusicCommands(commands.Cog):
             return await ctx.send("❌ Not connected to voice!", )
         
         player.queue.clear()
-        if hasattr(player, '_original_queue'):
-            player._original_queue.clear()
         
         await player.stop()
         player.update_activity()
@@ -495,7 +494,7 @@ class MusicCommands(commands.Cog):
         embed = create_music_embed("📋 Queue")
         
         queue_list = []
-        for i, track in enumerate(list(player.queue)[:10], 1):
+        for i, track in enumerate(player.queue[:10], 1):
             queue_list.append(f"{i}. {track.title}")
         
         embed.description = "\n".join(queue_list)
@@ -539,8 +538,8 @@ class MusicCommands(commands.Cog):
 
     @commands.command(name='shuffle')
     @commands.cooldown(1, 5, commands.BucketType.guild)
-    async def shuffle(self, ctx):
-        """Shuffle the current queue"""
+    async def shuffle(self, ctx, mode: Optional[str] = None):
+        """Shuffle the current queue (!shuffle fair - alternate requesters)"""
         player = ctx.guild.voice_client
         if not player:
             return await ctx.send("❌ Not connected to voice!", )
@@ -549,16 +548,11 @@ class MusicCommands(commands.Cog):
         if queue_count < 2:
             return await ctx.send("❌ Need at least 2 tracks to shuffle!", )
         
-        tracks_list = list(player.queue)
-        random.shuffle(tracks_list)
-        
-        player.queue.clear()
-        for track in tracks_list:
-            await player.queue.put_wait(track)
-        
+        count = shuffle_queue(player.queue, fair=(mode or '').lower() == 'fair')
         player.update_activity()
+        await player.update_persistent_panel()
         
-        embed = create_music_embed("🔀 Queue Shuffled", f"Shuffled {len(tracks_list)} tracks")
+        embed = create_music_embed("🔀 Queue Shuffled", f"Shuffled {count} tracks")
         await ctx.send(embed=embed, )
 
     @commands.command(name='clear')
@@ -576,10 +570,6 @@ class MusicCommands(commands.Cog):
         # Clear the queue
         player.queue.clear()
         
-        # Also clear original queue if exists
-        if hasattr(player, '_original_queue'):
-            player._original_queue.clear()
-        
         # Reset loop mode
         if hasattr(player, 'loop_mode'):
             player.loop_mode = "off"
@@ -43,7 +43,8 @@ class OwnerCommands(commands.Cog):
             value="`!admin test` - Test admin functionality\n"
                   "`!admin status` - Bot status\n"
                   "`!admin docker` - Docker info\n"
-                  "`!admin logs` - Recent logs",
+                  "`!admin logs` - Recent logs\n"
+                  "`!admin cache [flush]` - Track cache stats",
             inline=False
         )
         
@@ -261,6 +262,59 @@ class OwnerCommands(commands.Cog):
         except Exception as e:
             await ctx.send(f"❌ Error getting logs: {e}")
 
+    @admin.command(name="cache")
+    async def admin_cache(self, ctx, action: Optional[str] = None):
+        """🗃️ Inspect or flush the track resolution cache"""
+        resolver = getattr(self.bot, 'track_resolver', None)
+        if not resolver:
+            return await ctx.send("❌ Track resolver not available")
+        
+        if action and action.lower() == 'flush':
+            removed = resolver.flush()
+            return await ctx.send(f"🗑️ Flushed **{removed}** cached searches")
+        
+        stats = resolver.get_stats()
+        embed = discord.Embed(
+            title="🗃️ Track Cache",
+            color=0x3498db,
+            timestamp=datetime.utcnow()
+        )
+        
+        embed.add_field(name="📦 Entries", value=f"`{stats['size']}/{stats['max_size']}`", inline=True)
+        embed.add_field(name="⏱️ TTL", value=f"`{stats['ttl_seconds']}s`", inline=True)
+        embed.add_field(name="🎯 Hit Rate", value=f"`{stats['hit_rate'] * 100:.1f}%`", inline=True)
+        embed.add_field(
+            name="📊 Counters",
+            value=f"Hits: `{stats['hits']}`\n"
+                  f"Misses: `{stats['misses']}`\n"
+                  f"Evictions: `{stats['evictions']}`\n"
+                  f"Expired: `{stats['expirations']}`",
+            inline=True
+        )
+        embed.add_field(name="🌐 Lavalink Requests", value=f"`{stats['lavalink_requests']}`", inline=True)
+        
+        coalescing = stats.get('coalescing', {})
+        embed.add_field(
+            name="🧲 Coalesced",
+            value=f"Waiters: `{coalescing.get('coalesced', 0)}`\n"
+                  f"In flight: `{coalescing.get('in_flight', 0)}`\n"
+                  f"Max burst: `{coalescing.get('max_waiters', 0)}`",
+            inline=True
+        )
+
+        search_race = getattr(self.bot, 'search_race', None)
+        if search_race:
+            race_stats = search_race.get_stats()
+            lines = [
+                f"`{source}`: {s['wins']}/{s['launched']} wins • p50 `{s['latency']['p50_ms'] or 0}ms`"
+                for source, s in race_stats['sources'].items()
+            ]
+            lines.append(f"Races: `{race_stats['races']}` • Late: `{race_stats['late']}`")
+            embed.add_field(name="🏁 Search Sources", value="\n".join(lines), inline=False)
+        embed.set_footer(text="Use !admin cache flush to clear")
+        
+        await ctx.send(embed=embed)
+
     @admin.command(name="update")
     async def admin_update(self, ctx, force: Optional[str] = None):
         """🔄 Update bot from GitHub - Enhanced with Real-Time Updates"""
@@ -11,16 +11,29 @@ import asyncio
 import subprocess
 import re
 
+from utils.render import EmbedRenderer
+
 
 class UtilityCommands(commands.Cog):
     """Basic utility commands"""
     
     def __init__(self, bot):
         self.bot = bot
+        self.renderer: EmbedRenderer = getattr(bot, 'embed_renderer', None) or EmbedRenderer()
+    
+    def avatar_url(self):
+        """Bot avatar URL (None before login or without avatar)"""
+        return self.bot.user.avatar.url if self.bot.user and self.bot.user.avatar else None
         
     @commands.command(name='help', aliases=['h'])
     async def help_command(self, ctx):
         """Show all available commands"""
+        with self.renderer.timer('help'):
+            embed = self.renderer.static(('help', self.bot.command_prefix, self.avatar_url()), self.build_help_embed)
+        await ctx.send(embed=embed)
+    
+    def build_help_embed(self) -> discord.Embed:
+        """Help embed - only depends on the prefix and avatar, so it is built once"""
         embed = discord.Embed(
             title="🎵 Muzyczny Bot - Komendy",
             description="Lista wszystkich dostępnych komend",
@@ -35,10 +48,16 @@ class UtilityCommands(commands.Cog):
             "`!pause` - Zatrzymaj odtwarzanie",
             "`!resume` - Wznów odtwarzanie",
             "`!stop` - Zatrzymaj i wyczyść kolejkę",
+            "`!play a | b | c` - Dodaj kilka utworów naraz",
+            "`!import` + plik .txt/.m3u - Dodaj utwory z listy",
             "`!skip` - Pomiń aktualny utwór",
-            "`!queue` - Pokaż kolejkę utworów",
+            "`!previous` - Odtwórz poprzedni utwór",
+            "`!history [strona]` - Ostatnio odtwarzane utwory",
+            "`!queue` - Pokaż kolejkę utworów (strony: ◀️ ▶️ 🔢)",
             "`!volume <1-100>` - Zmień głośność",
-            "`!shuffle` - Przetasuj kolejkę",
+            "`!shuffle [fair]` - Przetasuj kolejkę (fair = po równo dla każdego)",
+            "`!fair [on/off]` - Kolejka na zmianę między zamawiającymi",
+            "`!dedupe` - Usuń duplikaty z kolejki",
             "`!loop` - Zmień tryb powtarzania",
             "`!nowplaying` - Aktualnie grany utwór",
             "`!clear` - Wyczyść kolejkę"
@@ -66,10 +85,10 @@ class UtilityCommands(commands.Cog):
         
         embed.set_footer(
             text=f"Prefix: {self.bot.command_prefix} | Bot by KreciDev",
-            icon_url=self.bot.user.avatar.url if self.bot.user.avatar else None
+            icon_url=self.avatar_url()
         )
         
-        await ctx.send(embed=embed)
+        return embed
     
     @commands.command(name='ping')
     async def ping(self, ctx):
@@ -250,11 +269,22 @@ class UtilityCommands(commands.Cog):
     @commands.command(name='info', aliases=['about'])
     async def info(self, ctx):
         """Show comprehensive bot information"""
+        with self.renderer.timer('info'):
+            # Everything but the timestamp and uptime is static
+            embed = self.renderer.static(('info', self.bot.command_prefix, self.avatar_url()), self.build_info_embed).copy()
+            embed.timestamp = datetime.now(timezone.utc)
+            embed.set_footer(
+                text=f"Made with ❤️ by KreciDev | Uptime: {str(datetime.now(timezone.utc) - self.bot.start_time.replace(tzinfo=timezone.utc)).split('.')[0]}"
+            )
+        
+        await ctx.send(embed=embed)
+    
+    def build_info_embed(self) -> discord.Embed:
+        """Static part of the info embed (config values don't change at runtime)"""
         embed = discord.Embed(
             title="ℹ️ Informacje o Bocie",
             description="**KreciDJ** - Zaawansowany bot muzyczny dla Discord",
-            color=0x9b59b6,
-            timestamp=datetime.now(timezone.utc)
+            color=0x9b59b6
         )
         
         # Basic info
@@ -305,12 +335,9 @@ class UtilityCommands(commands.Cog):
             inline=True
         )
         
-        embed.set_thumbnail(url=self.bot.user.avatar.url if self.bot.user.avatar else None)
-        embed.set_footer(
-            text=f"Made with ❤️ by KreciDev | Uptime: {str(datetime.now(timezone.utc) - self.bot.start_time.replace(tzinfo=timezone.utc)).split('.')[0]}"
-        )
+        embed.set_thumbnail(url=self.avatar_url())
         
-        await ctx.send(embed=embed)
+        return embed
 
 
 async def setup(bot):
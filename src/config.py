@@ -36,6 +36,27 @@ class Config:
     MAX_QUEUE_SIZE = int(os.getenv('MAX_QUEUE_SIZE', '50'))
     MAX_TRACK_DURATION = int(os.getenv('MAX_TRACK_DURATION', '1800'))  # 30 minutes
     AUTO_DISCONNECT_TIMEOUT = int(os.getenv('AUTO_DISCONNECT_TIMEOUT', '300'))  # 5 minutes
+    PLAYLIST_BATCH_SIZE = int(os.getenv('PLAYLIST_BATCH_SIZE', '25'))  # tracks queued per background batch
+    PREFETCH_STALE_AFTER = int(os.getenv('PREFETCH_STALE_AFTER', '3600'))  # re-resolve older tracks before play
+    PREFETCH_LEAD = float(os.getenv('PREFETCH_LEAD', '15'))  # seconds before a track ends to re-check the next one
+    QUEUE_FLUSH_INTERVAL = float(os.getenv('QUEUE_FLUSH_INTERVAL', '2'))  # seconds between batched queue writes
+    QUEUE_STATE_INTERVAL = float(os.getenv('QUEUE_STATE_INTERVAL', '10'))  # seconds between playback position snapshots
+    HISTORY_SIZE = int(os.getenv('HISTORY_SIZE', '100'))  # played tracks remembered per guild (!history, !previous)
+    HISTORY_GLOBAL_SIZE = int(os.getenv('HISTORY_GLOBAL_SIZE', '20000'))  # cap across all guilds, oldest dropped first
+    RESTORE_CONCURRENCY = int(os.getenv('RESTORE_CONCURRENCY', '3'))  # saved sessions reconnected at once after boot
+    RESTORE_JITTER = float(os.getenv('RESTORE_JITTER', '2'))  # random delay (seconds) before each reconnect
+    RESTORE_MAX_AGE = int(os.getenv('RESTORE_MAX_AGE', '21600'))  # older saved sessions are dropped, not resumed
+    DUPLICATE_POLICY = os.getenv('DUPLICATE_POLICY', 'flag').lower()  # allow | flag | reject tracks already queued
+    IMPORT_CONCURRENCY = int(os.getenv('IMPORT_CONCURRENCY', '4'))  # parallel lookups for !play a | b and !import
+    IMPORT_MAX_ENTRIES = int(os.getenv('IMPORT_MAX_ENTRIES', '100'))  # songs read from one multi-query or file
+    PANEL_UPDATE_INTERVAL = float(os.getenv('PANEL_UPDATE_INTERVAL', '10'))  # seconds between now-playing panel refreshes
+    PANEL_UPDATE_JITTER = float(os.getenv('PANEL_UPDATE_JITTER', '2'))  # random +/- seconds so panels don't edit in lockstep
+    PANEL_EDITS_PER_SECOND = float(os.getenv('PANEL_EDITS_PER_SECOND', '5'))  # scheduled panel edits across all guilds
+    PANEL_DEBOUNCE = float(os.getenv('PANEL_DEBOUNCE', '0.5'))  # seconds a panel waits so a burst of changes is one edit
+    PANEL_CLEANUP_DELAY = float(os.getenv('PANEL_CLEANUP_DELAY', '2'))  # old panels are deleted in per-channel batches after this
+    PANEL_PROGRESS = os.getenv('PANEL_PROGRESS', 'bar').lower()  # bar (re-edited on a timer) | timestamps (clients count, edits only on changes)
+    SEARCH_SOURCES = [s.strip() for s in os.getenv('SEARCH_SOURCES', 'ytsearch,ytmsearch,scsearch').split(',') if s.strip()]  # best first
+    SEARCH_RACE_DEADLINE = float(os.getenv('SEARCH_RACE_DEADLINE', '2.5'))  # seconds to wait for a better-ranked source
     
     # Lavalink Configuration - UPDATED dla publicznego serwera
     LAVALINK_HOST = os.getenv('LAVALINK_HOST', 'lava-v4.ajieblogs.eu.org')
@@ -59,6 +80,15 @@ class Config:
         }
     ]
     
+    # Track Resolution Cache
+    TRACK_CACHE_SIZE = int(os.getenv('TRACK_CACHE_SIZE', '512'))
+    TRACK_CACHE_TTL = int(os.getenv('TRACK_CACHE_TTL', '3600'))  # 1 hour
+    TRACK_CACHE_WARM_SIZE = int(os.getenv('TRACK_CACHE_WARM_SIZE', '200'))  # entries preloaded from DB
+    SUGGEST_GUILD_SIZE = int(os.getenv('SUGGEST_GUILD_SIZE', '200'))  # /play autocomplete entries per guild
+    SUGGEST_GLOBAL_SIZE = int(os.getenv('SUGGEST_GLOBAL_SIZE', '2000'))  # /play autocomplete entries shared by all guilds
+    TRACK_STORE_MAX_ROWS = int(os.getenv('TRACK_STORE_MAX_ROWS', '5000'))
+    TRACK_STORE_FLUSH_INTERVAL = int(os.getenv('TRACK_STORE_FLUSH_INTERVAL', '30'))  # seconds
+    
     # Database Configuration
     DATABASE_FILE = os.getenv('DATABASE_FILE', 'data/bot.db')
     BACKUP_ENABLED = os.getenv('BACKUP_ENABLED', 'true').lower() == 'true'
@@ -156,8 +186,8 @@ class Config:
                 raise ValueError("ENVIRONMENT must be 'development' or 'production'")
             
             # Validate numeric values
-            if cls.MAX_QUEUE_SIZE <= 0 or cls.MAX_QUEUE_SIZE > 100:
-                raise ValueError("MAX_QUEUE_SIZE must be between 1-100")
+            if cls.MAX_QUEUE_SIZE <= 0 or cls.MAX_QUEUE_SIZE > 20000:
+                raise ValueError("MAX_QUEUE_SIZE must be between 1-20000")
             
             if cls.COMMAND_COOLDOWN < 0 or cls.COMMAND_COOLDOWN > 60:
                 raise ValueError("COMMAND_COOLDOWN must be between 0-60 seconds")
@@ -165,6 +195,12 @@ class Config:
             if cls.MAX_TRACK_DURATION <= 0 or cls.MAX_TRACK_DURATION > 7200:
                 raise ValueError("MAX_TRACK_DURATION must be between 1-7200 seconds (2 hours)")
             
+            if cls.DUPLICATE_POLICY not in ('allow', 'flag', 'reject'):
+                raise ValueError("DUPLICATE_POLICY must be 'allow', 'flag' or 'reject'")
+            
+            if cls.PANEL_PROGRESS not in ('bar', 'timestamps'):
+                raise ValueError("PANEL_PROGRESS must be 'bar' or 'timestamps'")
+            
             if cls.AUTO_DISCONNECT_TIMEOUT < 60 or cls.AUTO_DISCONNECT_TIMEOUT > 3600:
                 raise ValueError("AUTO_DISCONNECT_TIMEOUT must be between 60-3600 seconds")
             
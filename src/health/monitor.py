@@ -141,6 +141,9 @@ class HealthHandler(BaseHTTPRequestHandler):
                         "commands_executed": getattr(bot_instance, 'commands_executed', 0),
                         "uptime_seconds": uptime_seconds
                     }
+                    
+                    if hasattr(bot_instance, 'get_service_metrics'):
+                        bot_info["services"] = bot_instance.get_service_metrics()
                 except Exception as e:
                     bot_info = {"status": "error", "error": str(e)}
             
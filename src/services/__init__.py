@@ -0,0 +1 @@
+"""Long-lived bot services shared between cogs"""
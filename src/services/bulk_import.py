@@ -0,0 +1,125 @@
+"""Resolve many queries at once for multi-query !play and !import"""
+
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Optional, Sequence
+
+import wavelink
+
+from services.search_race import SearchRace
+from services.track_resolver import URL_PREFIXES
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger('discord_bot')
+
+QUERY_SEPARATOR = '|'
+TRACK_LIST_EXTENSIONS = ('.txt', '.m3u', '.m3u8')
+
+
+def split_queries(query: str) -> List[str]:
+    """Split `a | b | c` into separate queries (a single query stays a list of one)"""
+    stripped = query.strip()
+    if stripped.startswith(URL_PREFIXES) and not any(char.isspace() for char in stripped):
+        # A lone URL may legitimately contain '|'
+        return [stripped]
+    return [part.strip() for part in query.split(QUERY_SEPARATOR) if part.strip()]
+
+
+def parse_track_list(text: str) -> List[str]:
+    """Queries from a plain list (one per line) or an M3U playlist
+
+    M3U entries pointing at local files are searched by their #EXTINF
+    title (or file name), URLs are used as they are.
+    """
+    queries = []
+    title = None
+    for line in text.splitlines():
+        line = line.strip().lstrip('\ufeff')
+        if not line:
+            continue
+        if line.startswith('#'):
+            if line.upper().startswith('#EXTINF:') and ',' in line:
+                title = line.split(',', 1)[1].strip() or None
+            continue
+
+        if line.startswith(URL_PREFIXES):
+            queries.append(line)
+        elif title:
+            queries.append(title)
+        elif '/' in line or '\\' in line or line.lower().endswith(('.mp3', '.flac', '.m4a', '.ogg', '.wav', '.opus')):
+            # Local file without #EXTINF - the file name is the best guess
+            queries.append(os.path.splitext(line.replace('\\', '/').rsplit('/', 1)[-1])[0])
+        else:
+            queries.append(line)
+        title = None
+    return queries
+
+
+class BulkImportResult:
+    """Outcome of one bulk import, in the original query order"""
+
+    def __init__(self, queries: Sequence[str]):
+        self.queries = list(queries)
+        self.tracks: List[wavelink.Playable] = []
+        self.failed: List[str] = []
+
+
+class BulkImporter:
+    """Resolves a list of queries concurrently (bounded) while keeping their order"""
+
+    def __init__(self, search_race: SearchRace, concurrency: int = 4, max_entries: int = 100):
+        self.search_race = search_race
+        self.concurrency = max(1, concurrency)
+        self.max_entries = max_entries
+
+        # Statistics
+        self.imports = 0
+        self.entries = 0
+        self.failed = 0
+        self.latency = LatencyStats()
+
+    async def _resolve_one(self, semaphore: asyncio.Semaphore, query: str) -> Optional[List[wavelink.Playable]]:
+        async with semaphore:
+            try:
+                result = await self.search_race.search(query)
+            except Exception as e:
+                logger.debug(f"Bulk import lookup failed for '{query}': {e}")
+                return None
+
+        if not result:
+            return None
+        if isinstance(result, wavelink.Playlist):
+            return list(result.tracks)
+        return [result[0]]
+
+    async def resolve(self, queries: Sequence[str]) -> BulkImportResult:
+        """Resolve up to max_entries queries, at most `concurrency` lookups in flight"""
+        queries = list(queries)[:self.max_entries]
+        outcome = BulkImportResult(queries)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        with self.latency.timer():
+            # gather() keeps the input order regardless of which lookup finishes first
+            results = await asyncio.gather(*(self._resolve_one(semaphore, query) for query in queries))
+
+        for query, tracks in zip(queries, results):
+            if tracks:
+                outcome.tracks.extend(tracks)
+            else:
+                outcome.failed.append(query)
+
+        self.imports += 1
+        self.entries += len(queries)
+        self.failed += len(outcome.failed)
+        return outcome
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get import statistics"""
+        return {
+            'imports': self.imports,
+            'entries': self.entries,
+            'failed': self.failed,
+            'concurrency': self.concurrency,
+            'latency': self.latency.get_stats()
+        }
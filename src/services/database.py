@@ -0,0 +1,52 @@
+"""Shared SQLite connection for persistent bot state"""
+
+import logging
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+logger = logging.getLogger('discord_bot')
+
+
+class Database:
+    """Single aiosqlite connection shared by all stores (WAL mode)"""
+    
+    def __init__(self, path: str):
+        self.path = path
+        self.connection: Optional[aiosqlite.Connection] = None
+    
+    @property
+    def is_connected(self) -> bool:
+        return self.connection is not None
+    
+    async def connect(self):
+        """Open database and enable WAL journaling"""
+        if self.connection:
+            return
+        
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.connection = await aiosqlite.connect(self.path)
+        
+        # WAL keeps small incremental writes cheap and readers unblocked
+        await self.connection.execute("PRAGMA journal_mode=WAL")
+        await self.connection.execute("PRAGMA synchronous=NORMAL")
+        await self.connection.commit()
+        
+        logger.info(f"🗄️ Database opened: {self.path}")
+    
+    async def ensure_schema(self, schema: str):
+        """Create tables/indexes for a store if they don't exist"""
+        if not self.connection:
+            raise RuntimeError("Database is not connected")
+        await self.connection.executescript(schema)
+        await self.connection.commit()
+    
+    async def close(self):
+        """Close database connection"""
+        if self.connection:
+            try:
+                await self.connection.close()
+                logger.info("✅ Database closed")
+            finally:
+                self.connection = None
@@ -0,0 +1,123 @@
+"""Batched background deletion of superseded bot messages (old panels)"""
+
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Any, Dict, List, Optional
+
+import discord
+
+logger = logging.getLogger('discord_bot')
+
+# Discord refuses bulk deletes of messages older than two weeks
+BULK_DELETE_MAX_AGE = timedelta(days=14)
+BULK_DELETE_MAX_COUNT = 100
+
+
+class MessageCleanup:
+    """Deletes messages a little later, grouped per channel
+
+    discard() only records the message. After `delay` seconds the whole
+    channel's batch goes out as one bulk delete when the bot may manage
+    messages there (and the messages are recent enough), otherwise one
+    delete per message. Callers never wait on any of it.
+    """
+
+    def __init__(self, delay: float = 2.0):
+        self.delay = max(0.0, delay)
+
+        self._pending: Dict[int, List[discord.Message]] = {}  # channel_id -> messages
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+        # Statistics
+        self.queued = 0
+        self.deleted = 0
+        self.bulk_calls = 0
+        self.single_calls = 0
+        self.failed = 0
+
+    def discard(self, message: Optional[discord.Message]):
+        """Delete the message in the background with the rest of its channel's batch"""
+        if message is None:
+            return
+        channel_id = message.channel.id
+        self._pending.setdefault(channel_id, []).append(message)
+        self.queued += 1
+
+        task = self._tasks.get(channel_id)
+        if not task or task.done():
+            self._tasks[channel_id] = asyncio.create_task(self._flush_later(channel_id))
+
+    async def _flush_later(self, channel_id: int):
+        try:
+            await asyncio.sleep(self.delay)
+            await self.flush(channel_id)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._tasks.pop(channel_id, None)
+
+    @staticmethod
+    def _can_bulk_delete(channel: Any) -> bool:
+        guild = getattr(channel, 'guild', None)
+        if not guild or not hasattr(channel, 'delete_messages'):
+            return False
+        return channel.permissions_for(guild.me).manage_messages
+
+    async def flush(self, channel_id: int) -> int:
+        """Delete everything pending for one channel now"""
+        messages = self._pending.pop(channel_id, [])
+        if not messages:
+            return 0
+
+        channel = messages[0].channel
+        single = messages
+        if len(messages) > 1 and self._can_bulk_delete(channel):
+            cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+            recent = [m for m in messages if m.created_at > cutoff]
+            single = [m for m in messages if m.created_at <= cutoff]
+            for start in range(0, len(recent), BULK_DELETE_MAX_COUNT):
+                chunk = recent[start:start + BULK_DELETE_MAX_COUNT]
+                if len(chunk) == 1:
+                    single.append(chunk[0])
+                    continue
+                try:
+                    await channel.delete_messages(chunk)
+                    self.bulk_calls += 1
+                    self.deleted += len(chunk)
+                except discord.HTTPException as e:
+                    # Fall back to one by one (e.g. a message was already gone)
+                    logger.debug(f"Bulk delete failed in channel {channel_id}: {e}")
+                    single.extend(chunk)
+
+        deleted = 0
+        for message in single:
+            try:
+                await message.delete()
+                self.single_calls += 1
+                deleted += 1
+            except discord.NotFound:
+                pass
+            except discord.HTTPException as e:
+                self.failed += 1
+                logger.debug(f"Failed to delete message {message.id}: {e}")
+        self.deleted += deleted
+        return len(messages)
+
+    async def close(self):
+        """Delete whatever is still pending (shutdown)"""
+        for task in list(self._tasks.values()):
+            task.cancel()
+        for channel_id in list(self._pending):
+            await self.flush(channel_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cleanup statistics"""
+        return {
+            'pending': sum(len(messages) for messages in self._pending.values()),
+            'queued': self.queued,
+            'deleted': self.deleted,
+            'bulk_calls': self.bulk_calls,
+            'single_calls': self.single_calls,
+            'failed': self.failed
+        }
@@ -0,0 +1,219 @@
+"""One timer for every now-playing panel instead of a task per guild"""
+
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import json
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger('discord_bot')
+
+# Returns False when the panel is gone and should not be scheduled again
+RefreshCallback = Callable[[], Awaitable[bool]]
+
+# Set while a scheduled refresh holds the budget token it was dispatched with
+_charged: contextvars.ContextVar[bool] = contextvars.ContextVar('panel_refresh_charged', default=False)
+
+
+def panel_digest(payload: Any) -> str:
+    """Stable digest of a rendered embed/view payload (dict key order doesn't matter)"""
+    encoded = json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+class PanelScheduler:
+    """Spreads panel edits over time under a global edits-per-second budget
+
+    Every registered panel has a deadline in a heap; a single background
+    task wakes up for the earliest one, takes a token from the shared
+    budget and runs its refresh. The next deadline is `interval` seconds
+    later plus random jitter, so panels created together drift apart
+    instead of editing in lockstep. State changes call expedite(), which
+    pulls the deadline in to a short debounce window - any further change
+    inside that window rides along with the same edit.
+    """
+
+    def __init__(self, interval: float = 10.0, jitter: float = 2.0, edits_per_second: float = 5.0,
+                 debounce: float = 0.5):
+        self.interval = max(1.0, interval)
+        self.jitter = max(0.0, min(jitter, self.interval / 2))
+        self.edits_per_second = max(0.1, edits_per_second)
+        self.debounce = max(0.0, debounce)
+
+        self._heap: List[Tuple[float, int, int]] = []  # (deadline, token, key)
+        self._entries: Dict[int, Tuple[int, RefreshCallback]] = {}  # key -> (token, refresh)
+        self._deadlines: Dict[int, float] = {}  # key -> pending deadline (absent while refreshing)
+        self._tokens = 0
+        self._budget = self.edits_per_second  # a full second's worth may go out at once
+        self._budget_at = time.monotonic()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._in_flight = 0
+
+        # Statistics
+        self.refreshes = 0
+        self.sent = 0  # panel edits that reached Discord
+        self.skipped = 0  # renders identical to what the panel already shows
+        self.coalesced = 0  # state changes folded into an already pending edit
+        self.failed = 0
+        self.throttled = 0
+        self.lag = LatencyStats()
+
+    def add(self, key: int, refresh: RefreshCallback, delay: Optional[float] = None):
+        """Register (or reschedule) a panel; the first refresh is spread over one interval"""
+        self._tokens += 1
+        token = self._tokens
+        self._entries[key] = (token, refresh)
+        if delay is None:
+            delay = random.uniform(0, self.interval)
+        deadline = self._deadlines[key] = time.monotonic() + delay
+        heapq.heappush(self._heap, (deadline, token, key))
+
+        if not self._task or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        self._wakeup.set()
+
+    def expedite(self, key: int, refresh: RefreshCallback) -> bool:
+        """Refresh within the debounce window; returns False if an edit that soon is already pending"""
+        deadline = self._deadlines.get(key)
+        if key in self._entries and deadline is not None and deadline <= time.monotonic() + self.debounce:
+            self.coalesced += 1
+            return False
+        self.add(key, refresh, delay=self.debounce)
+        return True
+
+    def remove(self, key: int):
+        """Stop refreshing a panel (its heap entry is skipped when it comes up)"""
+        self._entries.pop(key, None)
+        self._deadlines.pop(key, None)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._entries
+
+    def record_edit(self, sent: bool):
+        """Count a panel render; a scheduled one skipped as unchanged gives its edit back to the budget
+
+        Only refreshes dispatched by the scheduler took a token - explicit
+        edits outside it have nothing to refund.
+        """
+        if sent:
+            self.sent += 1
+        else:
+            self.skipped += 1
+            if _charged.get():
+                _charged.set(False)
+                self._budget = min(self.edits_per_second, self._budget + 1)
+
+    def _next_deadline(self) -> float:
+        return time.monotonic() + self.interval + random.uniform(-self.jitter, self.jitter)
+
+    def _budget_wait(self, now: float) -> float:
+        """Take one edit from the token bucket, or return how long until one is available"""
+        self._budget = min(self.edits_per_second, self._budget + (now - self._budget_at) * self.edits_per_second)
+        self._budget_at = now
+        if self._budget >= 1:
+            self._budget -= 1
+            return 0.0
+        return (1 - self._budget) / self.edits_per_second
+
+    async def _sleep(self, seconds: float):
+        """Sleep, but wake early when a panel with an earlier deadline is added"""
+        self._wakeup.clear()
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=seconds)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self):
+        """Dispatch due panels in deadline order"""
+        try:
+            while True:
+                if not self._heap:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                deadline, token, key = self._heap[0]
+                entry = self._entries.get(key)
+                if entry is None or entry[0] != token:
+                    # Removed or rescheduled since this entry was pushed
+                    heapq.heappop(self._heap)
+                    continue
+
+                now = time.monotonic()
+                if deadline > now:
+                    await self._sleep(deadline - now)
+                    continue
+
+                wait = self._budget_wait(now)
+                if wait:
+                    self.throttled += 1
+                    await asyncio.sleep(wait)
+                    continue
+
+                heapq.heappop(self._heap)
+                # Changes from now on need a fresh render, not this one
+                self._deadlines.pop(key, None)
+                self.lag.record(now - deadline)
+                asyncio.create_task(self._refresh(key, token, entry[1]))
+        except asyncio.CancelledError:
+            pass
+
+    async def _refresh(self, key: int, token: int, refresh: RefreshCallback):
+        """Run one refresh and schedule the next one unless the panel went away"""
+        self._in_flight += 1
+        _charged.set(True)  # this task's own context - the token from _budget_wait
+        try:
+            keep = await refresh()
+            self.refreshes += 1
+        except Exception as e:
+            keep = False
+            self.failed += 1
+            logger.warning(f"Panel refresh failed for {key}: {e}")
+        finally:
+            self._in_flight -= 1
+
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != token:
+            return
+        if keep:
+            deadline = self._deadlines[key] = self._next_deadline()
+            heapq.heappush(self._heap, (deadline, token, key))
+            self._wakeup.set()
+        else:
+            del self._entries[key]
+
+    async def close(self):
+        """Stop refreshing all panels"""
+        self._entries.clear()
+        self._deadlines.clear()
+        self._heap.clear()
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduler statistics"""
+        now = time.monotonic()
+        due = sum(
+            1 for deadline, token, key in self._heap
+            if deadline <= now and self._entries.get(key, (None,))[0] == token
+        )
+        return {
+            'panels': len(self._entries),
+            'queue_depth': due,
+            'in_flight': self._in_flight,
+            'refreshes': self.refreshes,
+            'sent': self.sent,
+            'skipped': self.skipped,
+            'coalesced': self.coalesced,
+            'failed': self.failed,
+            'throttled': self.throttled,
+            'edits_per_second': self.edits_per_second,
+            'lag': self.lag.get_stats()
+        }
@@ -0,0 +1,126 @@
+"""Background playlist ingestion - playback starts before the whole playlist is queued"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import wavelink
+
+logger = logging.getLogger('discord_bot')
+
+ProgressCallback = Callable[['PlaylistJob'], Awaitable[None]]
+
+
+class PlaylistJob:
+    """Progress of a single playlist ingestion"""
+
+    def __init__(self, guild_id: int, name: str, total: int):
+        self.guild_id = guild_id
+        self.name = name
+        self.total = total
+        self.added = 0
+        self.skipped = 0
+        self.done = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def processed(self) -> int:
+        return self.added + self.skipped
+
+
+class PlaylistLoader:
+    """Appends playlist tracks to a player's queue in small background batches"""
+
+    def __init__(self, batch_size: int = 25, max_queue_size: int = 50, progress_interval: float = 2.0):
+        self.batch_size = max(1, batch_size)
+        self.max_queue_size = max_queue_size
+        self.progress_interval = progress_interval  # min seconds between progress reports
+        self.jobs: Dict[int, PlaylistJob] = {}  # guild_id -> running job
+
+        # Statistics
+        self.playlists_loaded = 0
+        self.tracks_loaded = 0
+
+    def start(self, player: wavelink.Player, name: str, tracks: List[wavelink.Playable],
+              requester: Any = None, on_progress: Optional[ProgressCallback] = None) -> PlaylistJob:
+        """Start ingesting tracks for player's guild, replacing any running job"""
+        guild_id = player.guild.id
+        self.cancel(guild_id)
+
+        job = PlaylistJob(guild_id, name, len(tracks))
+        job.task = asyncio.create_task(self._ingest(job, player, tracks, requester, on_progress))
+        self.jobs[guild_id] = job
+        return job
+
+    def cancel(self, guild_id: int) -> bool:
+        """Stop a running ingestion (e.g. on !stop)"""
+        job = self.jobs.pop(guild_id, None)
+        if job and job.task and not job.task.done():
+            job.task.cancel()
+            return True
+        return False
+
+    def get_job(self, guild_id: int) -> Optional[PlaylistJob]:
+        """Get running job for guild, if any"""
+        job = self.jobs.get(guild_id)
+        return job if job and not job.done else None
+
+    async def _ingest(self, job: PlaylistJob, player: wavelink.Player, tracks: List[wavelink.Playable],
+                      requester: Any, on_progress: Optional[ProgressCallback]):
+        """Queue tracks batch by batch, yielding to the event loop in between"""
+        last_report = time.monotonic()
+        try:
+            for start in range(0, len(tracks), self.batch_size):
+                if not player.connected:
+                    break
+
+                for track in tracks[start:start + self.batch_size]:
+                    if len(player.queue) >= self.max_queue_size:
+                        job.skipped += 1
+                        continue
+                    if requester is not None:
+                        setattr(track, 'requester', requester)
+                    player.queue.put(track)
+                    job.added += 1
+
+                # Throttled progress so a long playlist doesn't turn into an edit storm
+                if job.processed < job.total and time.monotonic() - last_report >= self.progress_interval:
+                    await self._report(job, on_progress)
+                    last_report = time.monotonic()
+
+                # Let playback, commands and gateway events run between batches
+                await asyncio.sleep(0)
+
+            job.done = True
+            self.playlists_loaded += 1
+            self.tracks_loaded += job.added
+            logger.info(f"📥 Playlist '{job.name}' loaded in guild {job.guild_id}: "
+                        f"{job.added} queued, {job.skipped} skipped")
+            await self._report(job, on_progress)
+
+        except asyncio.CancelledError:
+            job.done = True
+        except Exception as e:
+            job.done = True
+            logger.error(f"Playlist ingestion error in guild {job.guild_id}: {e}")
+        finally:
+            if self.jobs.get(job.guild_id) is job:
+                del self.jobs[job.guild_id]
+
+    @staticmethod
+    async def _report(job: PlaylistJob, on_progress: Optional[ProgressCallback]):
+        if not on_progress:
+            return
+        try:
+            await on_progress(job)
+        except Exception as e:
+            logger.debug(f"Playlist progress callback failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get loader statistics"""
+        return {
+            'active_jobs': len(self.jobs),
+            'playlists_loaded': self.playlists_loaded,
+            'tracks_loaded': self.tracks_loaded
+        }
@@ -0,0 +1,175 @@
+"""Next-track validation so transitions don't trip over stale or dead queue entries"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import wavelink
+
+from services.track_resolver import TrackResolver
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger('discord_bot')
+
+
+class TrackPrefetcher:
+    """Checks the next queued track while the current one plays
+
+    The head is validated when a track starts and again `lead` seconds
+    before it ends (the queue may have changed in between): stale entries
+    are re-resolved and dead ones dropped then, so the transition itself
+    never waits on a REST refresh or fails on a dead track. Lavalink can't
+    buffer the next track's audio, so that part of the gap remains.
+    """
+
+    def __init__(self, resolver: TrackResolver, stale_after: float = 3600, lead: float = 15):
+        self.resolver = resolver
+        self.stale_after = stale_after
+        self.lead = max(0.0, lead)
+
+        self._prepared: Dict[int, Any] = {}  # guild_id -> ready queue head entry
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._transition_started: Dict[int, float] = {}
+
+        # Statistics
+        self.prepared = 0
+        self.refreshed = 0
+        self.dropped = 0
+        self.hits = 0
+        self.misses = 0
+        self.gap = LatencyStats()
+
+    def schedule(self, player: wavelink.Player):
+        """Prepare the next track now and again shortly before the current one ends"""
+        if not player.guild:
+            return
+        guild_id = player.guild.id
+
+        task = self._tasks.get(guild_id)
+        if task and not task.done():
+            task.cancel()
+        self._tasks[guild_id] = asyncio.create_task(self._watch(player))
+
+    async def _watch(self, player: wavelink.Player):
+        """Prepare the head, then check it again `lead` seconds before the current track ends"""
+        try:
+            await self._prepare(player)
+            track = player.current
+            if track is None or getattr(track, 'is_stream', False):
+                return
+            while player.current is track:
+                # Re-measured after every sleep - pauses and seeks move the end
+                remaining = ((track.length or 0) - (player.position or 0)) / 1000 - self.lead
+                if remaining <= 0:
+                    await self._prepare(player)
+                    return
+                await asyncio.sleep(remaining)
+        except asyncio.CancelledError:
+            pass  # replaced by a newer schedule() or forget()
+
+    async def _prepare(self, player: wavelink.Player):
+        """Validate queue head, re-resolving it if its stream info went stale"""
+        guild_id = player.guild.id
+        try:
+            while not player.queue.is_empty:
+                track = player.queue.peek(0)
+
+                if track is self._prepared.get(guild_id) and not self.is_stale(track):
+                    return  # still the head that was checked
+                if not self.is_stale(track):
+                    self._prepared[guild_id] = track
+                    self.prepared += 1
+                    return
+
+                fresh = await self._refresh(track)
+
+                # Queue may have changed while we were waiting on Lavalink
+                if player.queue.is_empty or player.queue.peek(0) is not track:
+                    return
+
+                if fresh is track:
+                    # Refresh failed - play the old data, nothing was re-resolved
+                    self._prepared[guild_id] = track
+                    self.prepared += 1
+                    return
+
+                if fresh is None:
+                    # Track disappeared upstream - drop it instead of failing at play time
+                    player.queue.delete(0)
+                    self.dropped += 1
+                    logger.warning(f"Dropped unavailable track in guild {guild_id}: {track.title}")
+                    continue
+
+                player.queue[0] = fresh
+                self._prepared[guild_id] = player.queue.peek(0)
+                self.refreshed += 1
+                self.prepared += 1
+                return
+
+        except Exception as e:
+            logger.error(f"Prefetch error in guild {guild_id}: {e}")
+
+    def is_stale(self, track: Any) -> bool:
+        """Tracks resolved too long ago get re-resolved
+
+        Entries without a resolve time (restored sessions) count as fresh -
+        refreshing every one of them would cost a REST call per transition.
+        """
+        resolved_at = getattr(track, 'resolved_at', 0)
+        if not resolved_at or not getattr(track, 'uri', None):
+            return False
+        return time.time() - resolved_at > self.stale_after
+
+    async def _refresh(self, track: wavelink.Playable) -> Optional[wavelink.Playable]:
+        """Re-resolve track by URI, keeping per-request attributes"""
+        try:
+            result = await self.resolver.refresh(track.uri)
+        except Exception as e:
+            logger.warning(f"Failed to refresh '{track.title}': {e}")
+            return track  # Lavalink hiccup - better to try the old data than drop it
+
+        if not result:
+            return None
+
+        fresh = result.tracks[0] if isinstance(result, wavelink.Playlist) else result[0]
+        requester = getattr(track, 'requester', None)
+        if requester is not None:
+            setattr(fresh, 'requester', requester)
+        return fresh
+
+    def mark_track_end(self, guild_id: int):
+        """Transition started - previous track finished"""
+        self._transition_started[guild_id] = time.perf_counter()
+
+    def mark_track_start(self, guild_id: int, track: Any = None):
+        """Transition finished - record the gap and whether the prepared head is what started"""
+        started = self._transition_started.pop(guild_id, None)
+        prepared = self._prepared.pop(guild_id, None)
+        if started is None:
+            return
+        self.gap.record(time.perf_counter() - started)
+        # The queue hands out a new Playable, so compare the encoded track
+        if prepared is not None and getattr(prepared, 'encoded', None) == getattr(track, 'encoded', False):
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def forget(self, guild_id: int):
+        """Drop state for a guild (stop/disconnect)"""
+        task = self._tasks.pop(guild_id, None)
+        if task and not task.done():
+            task.cancel()
+        self._prepared.pop(guild_id, None)
+        self._transition_started.pop(guild_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get prefetch statistics"""
+        return {
+            'prepared': self.prepared,
+            'refreshed': self.refreshed,
+            'dropped': self.dropped,
+            'hits': self.hits,
+            'misses': self.misses,
+            'track_gap': self.gap.get_stats()
+        }
@@ -0,0 +1,319 @@
+"""Write-behind persistence of guild queues and player state"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import wavelink
+
+from services.database import Database
+from utils.music_queue import MusicQueue, QueueJournal, TrackRecord
+from utils.track_codec import TrackDecodeError, decode_track
+
+logger = logging.getLogger('discord_bot')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_entries (
+    guild_id INTEGER NOT NULL,
+    seq REAL NOT NULL,
+    encoded TEXT NOT NULL,
+    requester_id INTEGER,
+    PRIMARY KEY (guild_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS player_state (
+    guild_id INTEGER PRIMARY KEY,
+    voice_channel_id INTEGER,
+    text_channel_id INTEGER,
+    current_encoded TEXT,
+    current_requester_id INTEGER,
+    position INTEGER NOT NULL DEFAULT 0,
+    paused INTEGER NOT NULL DEFAULT 0,
+    volume INTEGER NOT NULL DEFAULT 100,
+    updated_at REAL NOT NULL
+);
+"""
+
+STATE_UPSERT_SQL = """
+INSERT OR REPLACE INTO player_state (
+    guild_id, voice_channel_id, text_channel_id, current_encoded, current_requester_id,
+    position, paused, volume, updated_at
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _requester_id(requester: Any) -> Optional[int]:
+    return getattr(requester, 'id', None)
+
+
+class QueueSnapshot:
+    """Persisted queue and player state of one guild"""
+
+    def __init__(self, guild_id: int, state: Optional[tuple], entries: List[Tuple[str, Optional[int]]]):
+        self.guild_id = guild_id
+        (self.voice_channel_id, self.text_channel_id, self.current_encoded, self.current_requester_id,
+         self.position, self.paused, self.volume, self.updated_at) = state or (None, None, None, None, 0, 0, 100, 0.0)
+        self.entries = entries  # (encoded, requester_id) in queue order
+
+    def build_records(self, resolve_requester=None) -> List[TrackRecord]:
+        """Decode stored entries locally - no Lavalink round-trip"""
+        records = []
+        for encoded, requester_id in self.entries:
+            try:
+                info = decode_track(encoded)
+            except TrackDecodeError as e:
+                logger.warning(f"Skipping undecodable queued track in guild {self.guild_id}: {e}")
+                continue
+            requester = resolve_requester(requester_id) if resolve_requester and requester_id else None
+            records.append(TrackRecord(encoded, info['title'], info['author'], info['length'], requester=requester))
+        return records
+
+
+class _PendingGuild:
+    """Buffered changes for one guild, applied as: wipe (if reset) -> deletes -> upserts"""
+
+    __slots__ = ('reset', 'adds', 'removes')
+
+    def __init__(self):
+        self.reset = False
+        self.adds: Dict[float, Tuple[str, Optional[int]]] = {}
+        self.removes: Set[float] = set()
+
+    def merge_newer(self, newer: '_PendingGuild') -> '_PendingGuild':
+        """Combine with changes recorded after this batch (used when a flush fails)"""
+        if newer.reset:
+            return newer
+        for seq in newer.removes:
+            self.adds.pop(seq, None)
+            self.removes.add(seq)
+        self.adds.update(newer.adds)
+        return self
+
+
+class _GuildJournal(QueueJournal):
+    """Forwards MusicQueue changes of one guild to the store"""
+
+    def __init__(self, store: 'QueueStore', guild_id: int):
+        self.store = store
+        self.guild_id = guild_id
+
+    def added(self, record: TrackRecord):
+        pending = self.store._pending_for(self.guild_id)
+        pending.adds[record.seq] = (record.encoded, _requester_id(record.requester))
+
+    def removed(self, record: TrackRecord):
+        pending = self.store._pending_for(self.guild_id)
+        pending.adds.pop(record.seq, None)
+        pending.removes.add(record.seq)
+
+    def reset(self, records: List[TrackRecord]):
+        pending = self.store._pending_for(self.guild_id)
+        pending.reset = True
+        pending.removes.clear()
+        pending.adds = {record.seq: (record.encoded, _requester_id(record.requester)) for record in records}
+
+
+class QueueStore:
+    """Mirrors every attached player's queue into SQLite with small batched writes
+
+    Queue changes only touch in-memory buffers; a background task writes
+    them every flush_interval seconds in a single transaction (WAL mode),
+    and snapshots playback position every state_interval seconds.
+    """
+
+    def __init__(self, database: Database, flush_interval: float = 2.0, state_interval: float = 10.0):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.state_interval = state_interval
+
+        self._pending: Dict[int, _PendingGuild] = {}
+        self._states: Dict[int, Optional[tuple]] = {}  # guild_id -> state row (None = delete)
+        self._players: Dict[int, Tuple[wavelink.Player, Optional[int]]] = {}  # guild_id -> (player, text channel)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._last_snapshot = 0.0
+
+        # Statistics
+        self.flushes = 0
+        self.rows_written = 0
+        self.flush_errors = 0
+        self.restored_guilds = 0
+
+    async def setup(self):
+        """Create schema and start background flushing"""
+        await self.database.ensure_schema(SCHEMA)
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+
+    @property
+    def active(self) -> bool:
+        """Whether setup() succeeded - without it nothing buffered would ever be written"""
+        return self._flush_task is not None and self.database.is_connected
+
+    def _pending_for(self, guild_id: int) -> _PendingGuild:
+        pending = self._pending.get(guild_id)
+        if pending is None:
+            pending = self._pending[guild_id] = _PendingGuild()
+        return pending
+
+    def attach(self, player: wavelink.Player, text_channel_id: Optional[int] = None):
+        """Start mirroring a player's queue (no-op if already attached or running without a database)"""
+        if not self.active or not player.guild or not isinstance(player.queue, MusicQueue):
+            return
+        guild_id = player.guild.id
+
+        attached = self._players.get(guild_id)
+        if attached and attached[0] is player:
+            if text_channel_id:
+                self._players[guild_id] = (player, text_channel_id)
+            return
+
+        self._players[guild_id] = (player, text_channel_id)
+        journal = _GuildJournal(self, guild_id)
+        player.queue.journal = journal
+        journal.reset(list(player.queue))
+        self.save_state(player)
+
+    def save_state(self, player: wavelink.Player):
+        """Buffer current track, position and channel of an attached player"""
+        if not player.guild or player.guild.id not in self._players:
+            return
+        guild_id = player.guild.id
+        _, text_channel_id = self._players[guild_id]
+        current = player.current
+
+        self._states[guild_id] = (
+            guild_id,
+            player.channel.id if player.channel else None,
+            text_channel_id,
+            current.encoded if current else None,
+            _requester_id(getattr(current, 'requester', None)),
+            int(player.position or 0),
+            int(player.paused),
+            player.volume,
+            time.time()
+        )
+
+    def forget(self, guild_id: int):
+        """Stop mirroring and delete the guild's saved session (stop/leave)"""
+        attached = self._players.pop(guild_id, None)
+        if attached and isinstance(attached[0].queue, MusicQueue):
+            attached[0].queue.journal = QueueJournal()
+        if not self.active:
+            return
+        pending = self._pending_for(guild_id)
+        pending.reset = True
+        pending.adds.clear()
+        pending.removes.clear()
+        self._states[guild_id] = None
+
+    async def load_all(self) -> Dict[int, QueueSnapshot]:
+        """Read every saved session (used at boot)"""
+        if not self.database.connection:
+            return {}
+
+        async with self.database.connection.execute(
+            "SELECT guild_id, voice_channel_id, text_channel_id, current_encoded, current_requester_id, "
+            "position, paused, volume, updated_at FROM player_state"
+        ) as cursor:
+            states = {row[0]: row[1:] for row in await cursor.fetchall()}
+
+        entries: Dict[int, List[Tuple[str, Optional[int]]]] = {}
+        async with self.database.connection.execute(
+            "SELECT guild_id, encoded, requester_id FROM queue_entries ORDER BY guild_id, seq"
+        ) as cursor:
+            async for guild_id, encoded, requester_id in cursor:
+                entries.setdefault(guild_id, []).append((encoded, requester_id))
+
+        snapshots = {
+            guild_id: QueueSnapshot(guild_id, states.get(guild_id), entries.get(guild_id, []))
+            for guild_id in set(states) | set(entries)
+        }
+        self.restored_guilds = len(snapshots)
+        logger.info(f"💾 Loaded {len(snapshots)} saved queue sessions "
+                    f"({sum(len(s.entries) for s in snapshots.values())} tracks)")
+        return snapshots
+
+    def _snapshot_positions(self):
+        """Refresh state rows of attached players that are playing"""
+        for player, _ in list(self._players.values()):
+            if player.connected and player.current and not player.paused:
+                self.save_state(player)
+
+    async def flush(self) -> int:
+        """Write buffered changes in one transaction"""
+        if (not self._pending and not self._states) or not self.database.connection:
+            return 0
+
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            states, self._states = self._states, {}
+
+            wipes = [(guild_id,) for guild_id, changes in pending.items() if changes.reset]
+            deletes = [(guild_id, seq) for guild_id, changes in pending.items() for seq in changes.removes]
+            upserts = [
+                (guild_id, seq, encoded, requester_id)
+                for guild_id, changes in pending.items()
+                for seq, (encoded, requester_id) in changes.adds.items()
+            ]
+            state_rows = [row for row in states.values() if row is not None]
+            state_deletes = [(guild_id,) for guild_id, row in states.items() if row is None]
+
+            connection = self.database.connection
+            try:
+                await connection.executemany("DELETE FROM queue_entries WHERE guild_id = ?", wipes)
+                await connection.executemany("DELETE FROM queue_entries WHERE guild_id = ? AND seq = ?", deletes)
+                await connection.executemany(
+                    "INSERT OR REPLACE INTO queue_entries (guild_id, seq, encoded, requester_id) VALUES (?, ?, ?, ?)",
+                    upserts
+                )
+                await connection.executemany(STATE_UPSERT_SQL, state_rows)
+                await connection.executemany("DELETE FROM player_state WHERE guild_id = ?", state_deletes)
+                await connection.commit()
+            except Exception as e:
+                # Re-queue the batch underneath anything recorded meanwhile
+                self.flush_errors += 1
+                for guild_id, changes in pending.items():
+                    newer = self._pending.get(guild_id)
+                    self._pending[guild_id] = changes.merge_newer(newer) if newer else changes
+                for guild_id, row in states.items():
+                    self._states.setdefault(guild_id, row)
+                logger.error(f"Queue store flush failed: {e}")
+                return 0
+
+            written = len(wipes) + len(deletes) + len(upserts) + len(state_rows) + len(state_deletes)
+            self.flushes += 1
+            self.rows_written += written
+            return written
+
+    async def _flush_loop(self):
+        """Periodically snapshot positions and flush buffered changes"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                if time.monotonic() - self._last_snapshot >= self.state_interval:
+                    self._snapshot_positions()
+                    self._last_snapshot = time.monotonic()
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+
+    async def close(self):
+        """Stop background task and persist final positions"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._snapshot_positions()
+        await self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            'attached_players': len(self._players),
+            'pending_guilds': len(self._pending),
+            'pending_states': len(self._states),
+            'flushes': self.flushes,
+            'rows_written': self.rows_written,
+            'flush_errors': self.flush_errors,
+            'restored_guilds': self.restored_guilds
+        }
@@ -0,0 +1,151 @@
+"""Concurrent multi-source search so one slow source doesn't stall !play"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Sequence
+
+import wavelink
+
+from services.track_resolver import URL_PREFIXES, TrackResolver
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger('discord_bot')
+
+DEFAULT_SOURCES = ('ytsearch', 'ytmsearch', 'scsearch')
+
+
+class SourceStats:
+    """Latency and outcome counters for one search source"""
+
+    def __init__(self):
+        self.latency = LatencyStats()
+        self.launched = 0
+        self.wins = 0
+        self.empty = 0
+        self.errors = 0
+        self.cancelled = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'launched': self.launched,
+            'wins': self.wins,
+            'win_rate': round(self.wins / self.launched, 3) if self.launched else 0.0,
+            'empty': self.empty,
+            'errors': self.errors,
+            'cancelled': self.cancelled,
+            'latency': self.latency.get_stats()
+        }
+
+
+class SearchRace:
+    """Searches all sources at once and keeps the best-ranked result that arrives before the deadline
+
+    Sources are ranked by their order. A result is returned as soon as no
+    better-ranked source is still running; at the deadline the best result so
+    far wins. If nothing arrived in time, the first non-empty late result is
+    used. Remaining lookups are cancelled.
+    """
+
+    def __init__(self, resolver: TrackResolver, sources: Sequence[str] = DEFAULT_SOURCES, deadline: float = 2.5):
+        self.resolver = resolver
+        self.sources = tuple(sources) or DEFAULT_SOURCES
+        self.deadline = deadline
+        self.source_stats: Dict[str, SourceStats] = {source: SourceStats() for source in self.sources}
+
+        # Statistics
+        self.races = 0
+        self.cache_hits = 0
+        self.late = 0
+        self.no_results = 0
+
+    async def search(self, query: str) -> wavelink.Search:
+        """Resolve query - URLs go straight to the resolver, text is raced across sources"""
+        if query.strip().startswith(URL_PREFIXES) or len(self.sources) == 1:
+            return await self.resolver.search(query, source=self.sources[0])
+
+        # Some source already answered this recently - no need to race
+        for source in self.sources:
+            identifier = self.resolver.build_identifier(query, source)
+            if self.resolver.is_cached(identifier):
+                self.cache_hits += 1
+                return await self.resolver.resolve(identifier)
+
+        return await self._race(query)
+
+    async def _race(self, query: str) -> wavelink.Search:
+        self.races += 1
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.deadline
+
+        ranks = {
+            asyncio.create_task(self._search_source(source, query)): rank
+            for rank, source in enumerate(self.sources)
+        }
+        pending = set(ranks)
+        results: Dict[int, Any] = {}  # rank -> non-empty result
+        late = False
+
+        try:
+            while pending:
+                # Nothing still running can beat what we already have
+                if results and min(results) < min(ranks[task] for task in pending):
+                    break
+
+                timeout: Optional[float] = deadline - loop.time()
+                if timeout <= 0:
+                    if results:
+                        break
+                    if not late:
+                        late = True
+                        self.late += 1
+                    timeout = None  # take whatever non-empty result comes first
+
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result:
+                        results[ranks[task]] = result
+        finally:
+            for task in pending:
+                task.cancel()
+                self.source_stats[self.sources[ranks[task]]].cancelled += 1
+
+        if not results:
+            self.no_results += 1
+            return []
+
+        best = min(results)
+        self.source_stats[self.sources[best]].wins += 1
+        return results[best]
+
+    async def _search_source(self, source: str, query: str) -> wavelink.Search:
+        """Single source lookup - errors count as an empty result"""
+        stats = self.source_stats[source]
+        stats.launched += 1
+        started = time.perf_counter()
+
+        try:
+            result = await self.resolver.search(query, source=source)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            stats.errors += 1
+            logger.debug(f"Search source {source} failed for '{query}': {e}")
+            return []
+
+        stats.latency.record(time.perf_counter() - started)
+        if not result:
+            stats.empty += 1
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get race statistics"""
+        return {
+            'deadline_seconds': self.deadline,
+            'races': self.races,
+            'cache_hits': self.cache_hits,
+            'late': self.late,
+            'no_results': self.no_results,
+            'sources': {source: stats.get_stats() for source, stats in self.source_stats.items()}
+        }
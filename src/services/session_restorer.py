@@ -0,0 +1,138 @@
+"""Boot-time restore of saved music sessions"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import wavelink
+
+from services.queue_store import QueueSnapshot, QueueStore
+from utils.metrics import LatencyStats
+
+logger = logging.getLogger('discord_bot')
+
+RestoreCallback = Callable[[QueueSnapshot], Awaitable[bool]]
+
+
+class SessionRestorer:
+    """Reconnects saved sessions after a restart without a thundering herd
+
+    Sessions are restored most recently active first, at most `concurrency`
+    at a time, and every slot waits a random 0..jitter seconds before it
+    touches the gateway and Lavalink, so hundreds of guilds come back as a
+    steady trickle rather than a burst.
+    """
+
+    def __init__(self, store: Optional[QueueStore] = None, concurrency: int = 3, jitter: float = 2.0,
+                 max_age: float = 6 * 3600, node_timeout: float = 60.0):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.jitter = max(0.0, jitter)
+        self.max_age = max_age
+        self.node_timeout = node_timeout
+
+        self._task: Optional[asyncio.Task] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._in_flight = 0
+
+        # Statistics
+        self.scheduled = 0
+        self.restored = 0
+        self.skipped = 0
+        self.expired = 0
+        self.failed = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.latency = LatencyStats()
+
+    def start(self, snapshots: Dict[int, QueueSnapshot], restore: RestoreCallback) -> bool:
+        """Restore sessions in the background (only once per process)"""
+        if self._task or not snapshots:
+            return False
+        self._task = asyncio.create_task(self._run(list(snapshots.values()), restore))
+        return True
+
+    async def _wait_for_node(self) -> bool:
+        """Lavalink connects in the background - wait until a node can take players"""
+        deadline = time.monotonic() + self.node_timeout
+        while time.monotonic() < deadline:
+            if any(node.status is wavelink.NodeStatus.CONNECTED for node in wavelink.Pool.nodes.values()):
+                return True
+            await asyncio.sleep(1)
+        return False
+
+    async def _run(self, snapshots, restore: RestoreCallback):
+        """Restore every snapshot with bounded concurrency"""
+        try:
+            if not await self._wait_for_node():
+                logger.warning(f"⚠️ No Lavalink node after {self.node_timeout:.0f}s, "
+                               f"skipping restore of {len(snapshots)} sessions")
+                return
+
+            now = time.time()
+            fresh = []
+            for snapshot in snapshots:
+                if self.max_age and now - (snapshot.updated_at or 0) > self.max_age:
+                    # Nobody expects a session from hours ago to resume - drop it
+                    self.expired += 1
+                    if self.store:
+                        self.store.forget(snapshot.guild_id)
+                else:
+                    fresh.append(snapshot)
+            fresh.sort(key=lambda s: s.updated_at or 0, reverse=True)
+
+            self.scheduled = len(fresh)
+            self.started_at = time.monotonic()
+            logger.info(f"♻️ Restoring {len(fresh)} music sessions "
+                        f"({self.concurrency} at a time, {self.expired} expired)")
+
+            await asyncio.gather(*(self._restore_one(snapshot, restore) for snapshot in fresh))
+
+            self.finished_at = time.monotonic()
+            logger.info(f"♻️ Session restore finished in {self.finished_at - self.started_at:.1f}s: "
+                        f"{self.restored} restored, {self.skipped} skipped, {self.failed} failed")
+        except asyncio.CancelledError:
+            pass
+
+    async def _restore_one(self, snapshot: QueueSnapshot, restore: RestoreCallback):
+        """Restore a single guild inside a concurrency slot"""
+        async with self._semaphore:
+            if self.jitter:
+                await asyncio.sleep(random.uniform(0, self.jitter))
+
+            self._in_flight += 1
+            try:
+                with self.latency.timer():
+                    restored = await restore(snapshot)
+                if restored:
+                    self.restored += 1
+                else:
+                    self.skipped += 1
+            except Exception as e:
+                self.failed += 1
+                logger.warning(f"Session restore failed for guild {snapshot.guild_id}: {e}")
+            finally:
+                self._in_flight -= 1
+
+    async def close(self):
+        """Stop restoring (shutdown during boot)"""
+        if self._task and not self._task.done():
+            self._task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get restore statistics"""
+        duration = None
+        if self.started_at is not None:
+            duration = round((self.finished_at or time.monotonic()) - self.started_at, 2)
+        return {
+            'scheduled': self.scheduled,
+            'restored': self.restored,
+            'skipped': self.skipped,
+            'expired': self.expired,
+            'failed': self.failed,
+            'in_flight': self._in_flight,
+            'duration_s': duration,
+            'latency': self.latency.get_stats()
+        }
@@ -0,0 +1,170 @@
+"""Track resolution layer between the music cogs and the Lavalink pool"""
+
+import copy
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import wavelink
+
+from services.track_store import TrackStore
+from utils.single_flight import SingleFlight
+from utils.track_cache import TrackCache
+
+logger = logging.getLogger('discord_bot')
+
+URL_PREFIXES = ("http://", "https://")
+
+YOUTUBE_HOSTS = {'youtube.com', 'www.youtube.com', 'm.youtube.com', 'music.youtube.com', 'youtu.be'}
+
+# Query parameters that never change what Lavalink resolves
+TRACKING_PARAMS = {'si', 'feature', 'pp', 'ab_channel', 'fbclid', 'gclid'}
+
+
+def normalize_query(identifier: str) -> str:
+    """Normalize a search identifier or URL into a cache key"""
+    identifier = identifier.strip()
+
+    if not identifier.startswith(URL_PREFIXES):
+        # "ytsearch:Some  Song" -> "ytsearch:some song"
+        return re.sub(r'\s+', ' ', identifier).lower()
+
+    parts = urlsplit(identifier)
+    host = parts.netloc.lower()
+    params = [(k, v) for k, v in parse_qsl(parts.query) if k not in TRACKING_PARAMS and not k.startswith('utm_')]
+
+    if host in YOUTUBE_HOSTS:
+        # youtu.be/<id>, music.youtube.com/watch?v=<id> -> youtube.com/watch?v=<id>
+        video_id = parts.path.lstrip('/') if host == 'youtu.be' else dict(params).get('v')
+        playlist_id = dict(params).get('list')
+        if video_id or playlist_id:
+            canonical = [(k, v) for k, v in (('v', video_id), ('list', playlist_id)) if v]
+            return f"https://youtube.com/watch?{urlencode(canonical)}"
+
+    return urlunsplit(('https', host, parts.path.rstrip('/'), urlencode(sorted(params)), ''))
+
+
+class TrackResolver:
+    """Resolves queries to tracks through an in-process LRU/TTL cache backed by SQLite"""
+
+    def __init__(self, cache: Optional[TrackCache] = None, store: Optional[TrackStore] = None):
+        self.cache = cache or TrackCache()
+        self.store = store
+        self.flights = SingleFlight()
+        self.lavalink_requests = 0
+        self.warmed_entries = 0
+
+    @staticmethod
+    def build_identifier(query: str, source: str = 'ytsearch') -> str:
+        """Build Lavalink identifier - URLs are passed through, text gets a search prefix"""
+        query = query.strip()
+        if query.startswith(URL_PREFIXES):
+            return query
+        return f"{source}:{query}"
+
+    async def search(self, query: str, *, source: str = 'ytsearch') -> wavelink.Search:
+        """Search for tracks, using the cache when possible"""
+        return await self.resolve(self.build_identifier(query, source))
+
+    async def resolve(self, identifier: str) -> wavelink.Search:
+        """Resolve a Lavalink identifier, using the cache when possible"""
+        key = normalize_query(identifier)
+
+        cached = self.cache.get(key)
+        if cached is not None:
+            self._persist(key, cached)
+            return self._clone(cached)
+
+        # Identical concurrent lookups share a single Lavalink request
+        result = await self.flights.do(key, lambda: self._fetch(key, identifier))
+        return self._clone(result) if result else result
+
+    def is_cached(self, identifier: str) -> bool:
+        """Check for a live cache entry without touching hit/miss counters"""
+        return normalize_query(identifier) in self.cache
+    
+    async def refresh(self, identifier: str) -> wavelink.Search:
+        """Resolve identifier again, bypassing and replacing the cached entry"""
+        self.cache.invalidate(normalize_query(identifier))
+        return await self.resolve(identifier)
+
+    async def _fetch(self, key: str, identifier: str) -> wavelink.Search:
+        """Single Lavalink round-trip, populating the caches on success"""
+        result = await wavelink.Pool.fetch_tracks(identifier)
+        self.lavalink_requests += 1
+
+        # Remember when stream info was fetched so stale tracks can be re-resolved
+        resolved_at = time.time()
+        for track in (result.tracks if isinstance(result, wavelink.Playlist) else result or []):
+            setattr(track, 'resolved_at', resolved_at)
+
+        if self._is_cacheable(result):
+            self.cache.set(key, result)
+            self._persist(key, result)
+
+        return result
+
+    async def warm_from_store(self, limit: int) -> int:
+        """Preload the most played persisted entries into the in-memory cache"""
+        if not self.store:
+            return 0
+
+        entries: List[Tuple[str, Dict[str, Any], float]] = await self.store.load_popular(limit)
+        warmed = 0
+        # Least popular first so the most played entries end up most recently used
+        for key, payload, resolved_at in reversed(entries):
+            try:
+                track = wavelink.Playable(payload)
+                # Rows are written when Lavalink resolved them - keep that age for the prefetcher
+                setattr(track, 'resolved_at', resolved_at)
+                self.cache.set(key, [track])
+                warmed += 1
+            except (KeyError, TypeError) as e:
+                logger.warning(f"Skipping invalid persisted track for '{key}': {e}")
+
+        self.warmed_entries += warmed
+        logger.info(f"🔥 Warmed track cache with {warmed} persisted entries")
+        return warmed
+
+    def _persist(self, key: str, result: Any):
+        """Record single-track resolutions in the durable store (playlists stay in memory only)"""
+        if not self.store or isinstance(result, wavelink.Playlist) or not result:
+            return
+        payload = getattr(result[0], 'raw_data', None)
+        if payload:
+            self.store.record(key, payload)
+
+    def flush(self) -> int:
+        """Clear cached results"""
+        removed = self.cache.clear()
+        logger.info(f"🗑️ Track cache flushed ({removed} entries)")
+        return removed
+
+    @staticmethod
+    def _is_cacheable(result: Any) -> bool:
+        """Only cache non-empty results that aren't live streams"""
+        if not result:
+            return False
+        tracks = result.tracks if isinstance(result, wavelink.Playlist) else result
+        return not all(getattr(track, 'is_stream', False) for track in tracks)
+
+    @staticmethod
+    def _clone(result: Any) -> Any:
+        """Copy cached tracks so per-request attributes (requester etc.) don't leak between guilds"""
+        if isinstance(result, wavelink.Playlist):
+            playlist = copy.copy(result)
+            playlist.tracks = [copy.copy(track) for track in result.tracks]
+            return playlist
+        return [copy.copy(track) for track in result]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get resolver statistics"""
+        stats = self.cache.get_stats()
+        stats['lavalink_requests'] = self.lavalink_requests
+        stats['warmed_entries'] = self.warmed_entries
+        stats['coalescing'] = self.flights.get_stats()
+        if self.store:
+            stats['store'] = self.store.get_stats()
+        return stats
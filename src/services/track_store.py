@@ -0,0 +1,177 @@
+"""Durable query -> track cache stored in SQLite"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from services.database import Database
+from utils.track_codec import TrackDecodeError, payload_from_encoded
+
+logger = logging.getLogger('discord_bot')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS track_cache (
+    query_key TEXT PRIMARY KEY,
+    encoded TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    play_count INTEGER NOT NULL DEFAULT 0,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_track_cache_popular ON track_cache (play_count DESC, last_used DESC);
+"""
+
+UPSERT_SQL = """
+INSERT INTO track_cache (query_key, encoded, payload, play_count, last_used)
+VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(query_key) DO UPDATE SET
+    encoded = excluded.encoded,
+    payload = excluded.payload,
+    play_count = track_cache.play_count + excluded.play_count,
+    last_used = excluded.last_used
+"""
+
+
+class TrackStore:
+    """Buffers resolved tracks in memory and flushes them to SQLite in batches"""
+    
+    def __init__(self, database: Database, flush_interval: float = 30, max_rows: int = 5000):
+        self.database = database
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        
+        # query_key -> [encoded, payload_json, play_increment, last_used]
+        self._pending: Dict[str, list] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        
+        # Statistics
+        self.rows_written = 0
+        self.flush_errors = 0
+        self.rows_decoded = 0
+    
+    async def setup(self):
+        """Create schema and start background flushing"""
+        await self.database.ensure_schema(SCHEMA)
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    @property
+    def active(self) -> bool:
+        """Whether setup() succeeded - without it nothing buffered would ever be written"""
+        return self._flush_task is not None and self.database.is_connected
+    
+    def record(self, query_key: str, payload: Dict[str, Any]):
+        """Remember that query resolved to track payload (non-blocking, skipped without a database)"""
+        encoded = payload.get('encoded')
+        if not encoded or not self.active:
+            return
+        
+        entry = self._pending.get(query_key)
+        if entry and entry[0] == encoded:
+            entry[2] += 1
+            entry[3] = time.time()
+        else:
+            increment = entry[2] + 1 if entry else 1
+            self._pending[query_key] = [encoded, json.dumps(payload), increment, time.time()]
+    
+    async def load_popular(self, limit: int) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Load most-played entries as (query_key, track payload, time it was last resolved)"""
+        if not self.database.connection or limit <= 0:
+            return []
+        
+        async with self.database.connection.execute(
+            "SELECT query_key, encoded, payload, last_used FROM track_cache ORDER BY play_count DESC, last_used DESC LIMIT ?",
+            (limit,)
+        ) as cursor:
+            rows = await cursor.fetchall()
+        
+        entries = []
+        for query_key, encoded, payload, last_used in rows:
+            try:
+                data = json.loads(payload)
+                if not isinstance(data, dict) or 'info' not in data:
+                    raise ValueError("missing track info")
+            except (TypeError, ValueError):
+                # Payload JSON is damaged - the encoded track alone is enough to rebuild it
+                try:
+                    data = payload_from_encoded(encoded)
+                    self.rows_decoded += 1
+                except TrackDecodeError as e:
+                    logger.warning(f"Skipping corrupted track cache row {query_key}: {e}")
+                    continue
+            entries.append((query_key, data, last_used))
+        return entries
+    
+    async def flush(self) -> int:
+        """Write buffered entries in one transaction"""
+        if not self._pending or not self.database.connection:
+            return 0
+        
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            rows = [(key, *values) for key, values in pending.items()]
+            
+            try:
+                await self.database.connection.executemany(UPSERT_SQL, rows)
+                await self._prune()
+                await self.database.connection.commit()
+            except Exception as e:
+                # Put entries back so the next flush retries them (dropping the half-done
+                # transaction, or the retry would count those plays twice)
+                self.flush_errors += 1
+                try:
+                    await self.database.connection.rollback()
+                except Exception:
+                    pass
+                for key, values in pending.items():
+                    newer = self._pending.get(key)
+                    if newer is None:
+                        self._pending[key] = values
+                    else:
+                        # Recorded during the flush - keep its track data, add up the plays
+                        newer[2] += values[2]
+                logger.error(f"Track store flush failed: {e}")
+                return 0
+            
+            self.rows_written += len(rows)
+            return len(rows)
+    
+    async def _prune(self):
+        """Keep the table bounded by dropping least popular rows"""
+        if self.max_rows <= 0:
+            return
+        await self.database.connection.execute(
+            """DELETE FROM track_cache WHERE query_key IN (
+                SELECT query_key FROM track_cache
+                ORDER BY play_count DESC, last_used DESC
+                LIMIT -1 OFFSET ?
+            )""",
+            (self.max_rows,)
+        )
+    
+    async def _flush_loop(self):
+        """Periodically flush buffered entries"""
+        try:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                await self.flush()
+        except asyncio.CancelledError:
+            pass
+    
+    async def close(self):
+        """Stop background task and flush what's left"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            self._flush_task = None
+        await self.flush()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        return {
+            'pending': len(self._pending),
+            'rows_written': self.rows_written,
+            'flush_errors': self.flush_errors,
+            'rows_decoded': self.rows_decoded
+        }
@@ -0,0 +1,82 @@
+"""Offline /play autocomplete from tracks previously played"""
+
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from utils.metrics import LatencyStats
+from utils.prefix_index import PrefixEntry, PrefixIndex
+
+# Discord limits for autocomplete choices
+MAX_CHOICES = 25
+MAX_CHOICE_LENGTH = 100
+
+
+class TrackSuggestions:
+    """Per-guild and global prefix indexes over played tracks - never touches the network"""
+
+    def __init__(self, guild_size: int = 200, global_size: int = 2000, max_guilds: int = 500):
+        self.guild_size = guild_size
+        self.max_guilds = max_guilds
+        self.global_index = PrefixIndex(max_entries=global_size)
+        self._guilds: "OrderedDict[int, PrefixIndex]" = OrderedDict()
+
+        # Statistics
+        self.indexed = 0
+        self.lookups = LatencyStats()
+
+    def record(self, guild_id: int, track: Any):
+        """Index a track that just started playing"""
+        title = getattr(track, 'title', None)
+        if not title:
+            return
+
+        author = getattr(track, 'author', '') or ''
+        uri = getattr(track, 'uri', None)
+        # Choice values are capped by Discord - fall back to a text search for long URIs
+        value = uri if uri and len(uri) <= MAX_CHOICE_LENGTH else f"{title} {author}".strip()[:MAX_CHOICE_LENGTH]
+        key = getattr(track, 'identifier', None) or value
+
+        guild_index = self._guilds.get(guild_id)
+        if guild_index is None:
+            guild_index = self._guilds[guild_id] = PrefixIndex(max_entries=self.guild_size)
+            while len(self._guilds) > self.max_guilds:
+                self._guilds.popitem(last=False)
+        else:
+            self._guilds.move_to_end(guild_id)
+
+        guild_index.add(key, title, author, value)
+        self.global_index.add(key, title, author, value)
+        self.indexed += 1
+
+    def suggest(self, guild_id: int, prefix: str, limit: int = MAX_CHOICES) -> List[PrefixEntry]:
+        """Guild history first, then global history to fill the remaining slots"""
+        with self.lookups.timer():
+            results: List[PrefixEntry] = []
+            seen = set()
+
+            guild_index = self._guilds.get(guild_id)
+            sources = [guild_index, self.global_index] if guild_index else [self.global_index]
+            for index in sources:
+                for entry in index.search(prefix, limit):
+                    if entry.key not in seen:
+                        seen.add(entry.key)
+                        results.append(entry)
+                if len(results) >= limit:
+                    break
+
+            return results[:limit]
+
+    def forget_guild(self, guild_id: int):
+        """Drop a guild's index (e.g. when the bot leaves it)"""
+        self._guilds.pop(guild_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index statistics"""
+        return {
+            'guilds': len(self._guilds),
+            'global_entries': len(self.global_index),
+            'global_terms': self.global_index.term_count,
+            'guild_entries': sum(len(index) for index in self._guilds.values()),
+            'indexed': self.indexed,
+            'lookup': self.lookups.get_stats()
+        }
@@ -4,6 +4,8 @@ import discord
 from datetime import timedelta
 import re
 
+from utils.render import PROGRESS_BAR, BarTable
+
 
 def format_duration(milliseconds):
     """Format duration from milliseconds to readable format"""
@@ -22,14 +24,11 @@ def format_duration(milliseconds):
 
 def format_progress_bar(current_ms, total_ms, length=20):
     """Create a progress bar for track position"""
+    bars = PROGRESS_BAR if length == PROGRESS_BAR.length else BarTable(length)
     if not total_ms or total_ms <= 0:
-        return "▱" * length
-    
-    progress = min(current_ms / total_ms, 1.0)
-    filled_length = int(progress * length)
+        return bars[0]
     
-    bar = "▰" * filled_length + "▱" * (length - filled_length)
-    return bar
+    return bars.ratio(min(current_ms / total_ms, 1.0))
 
 
 def truncate_string(text, max_length):
@@ -0,0 +1,69 @@
+"""Lightweight in-process metrics helpers"""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+
+class LatencyStats:
+    """Running latency statistics with a sliding window for percentiles"""
+    
+    def __init__(self, window: int = 200):
+        self.count = 0
+        self.total = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.last: Optional[float] = None
+        self._recent: Deque[float] = deque(maxlen=window)
+    
+    def record(self, seconds: float):
+        """Record single measurement in seconds"""
+        self.count += 1
+        self.total += seconds
+        self.last = seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        self._recent.append(seconds)
+    
+    def timer(self) -> 'LatencyTimer':
+        """Context manager measuring the wrapped block"""
+        return LatencyTimer(self)
+    
+    def percentile(self, pct: float) -> Optional[float]:
+        """Percentile over the recent window"""
+        if not self._recent:
+            return None
+        ordered = sorted(self._recent)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get statistics in milliseconds"""
+        def ms(value: Optional[float]) -> Optional[float]:
+            return round(value * 1000, 2) if value is not None else None
+        
+        return {
+            'count': self.count,
+            'avg_ms': ms(self.total / self.count) if self.count else None,
+            'min_ms': ms(self.min),
+            'max_ms': ms(self.max),
+            'last_ms': ms(self.last),
+            'p50_ms': ms(self.percentile(50)),
+            'p95_ms': ms(self.percentile(95))
+        }
+
+
+class LatencyTimer:
+    """Times a block and records it into LatencyStats"""
+    
+    def __init__(self, stats: LatencyStats):
+        self.stats = stats
+        self.started = 0.0
+    
+    def __enter__(self) -> 'LatencyTimer':
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stats.record(time.perf_counter() - self.started)
+        return False
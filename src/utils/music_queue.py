@@ -0,0 +1,1115 @@
+"""Queue extensions shared by the music cogs
+
+MusicQueue keeps compact TrackRecord entries instead of full
+wavelink.Playable objects and only builds a Playable when a track leaves
+the queue. Measured with tracemalloc on CPython 3.11 (10,000 YouTube
+tracks, ~300 character encoded string, shared requester):
+
+    wavelink.Playable in a wavelink.Queue   ~3.1 KB per entry
+    TrackRecord in a MusicQueue             ~0.6 KB per entry
+
+so a 10,000 track queue costs roughly 6 MB instead of 31 MB. Most of the
+remaining cost is the encoded string itself, which is what Lavalink needs
+to play the track.
+"""
+
+import copy
+import itertools
+import random
+import sys
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import wavelink
+
+from utils.track_codec import TrackDecodeError, decode_track, is_supported, playable_from_encoded
+
+
+def requester_key(track: Any) -> Any:
+    """Stable grouping key for whoever queued a track"""
+    requester = getattr(track, 'requester', None)
+    return getattr(requester, 'id', requester)
+
+
+def fair_order(tracks: Sequence[Any], rng: random.Random = random) -> List[Any]:
+    """Shuffle so requesters take turns - each round picks one track from every requester
+
+    Every requester's own tracks are shuffled and the requester order is
+    re-rolled each round, so the result is still random but nobody's
+    tracks end up clumped at the end. O(n).
+    """
+    lanes = _group_by_requester(tracks)
+    for lane in lanes.values():
+        rng.shuffle(lane)
+
+    ordered: List[Any] = []
+    active = list(lanes.values())
+    while active:
+        rng.shuffle(active)
+        for lane in active:
+            ordered.append(lane.pop())
+        active = [lane for lane in active if lane]
+    return ordered
+
+
+def round_robin(lanes: Iterable[List[Any]]) -> List[Any]:
+    """Interleave lanes in order: first item of every lane, then every second item..."""
+    lanes = [lane for lane in lanes if lane]
+    ordered: List[Any] = []
+    for index in range(max((len(lane) for lane in lanes), default=0)):
+        ordered.extend(lane[index] for lane in lanes if index < len(lane))
+    return ordered
+
+
+def _group_by_requester(tracks: Iterable[Any]) -> Dict[Any, List[Any]]:
+    lanes: Dict[Any, List[Any]] = {}
+    for track in tracks:
+        lanes.setdefault(requester_key(track), []).append(track)
+    return lanes
+
+
+class TrackRecord:
+    """Queued track - just enough to render it and to rebuild the Playable later"""
+
+    __slots__ = ('encoded', 'title', 'author', 'length', 'requester', 'resolved_at', 'track', 'seq')
+
+    def __init__(self, encoded: str, title: str, author: str, length: int,
+                 requester: Any = None, resolved_at: float = 0.0, track: Optional[wavelink.Playable] = None):
+        self.encoded = encoded
+        self.title = title
+        self.author = sys.intern(author) if author else ''  # same artists repeat a lot in big queues
+        self.length = length
+        self.requester = requester
+        self.resolved_at = resolved_at
+        self.track = track  # only kept when the encoded format can't be decoded locally
+        self.seq = 0.0      # queue order key, assigned by MusicQueue
+
+    @classmethod
+    def from_playable(cls, track: wavelink.Playable) -> 'TrackRecord':
+        """Compact a Playable (keeps requester and resolve time)"""
+        encoded = track.encoded
+        return cls(
+            encoded,
+            track.title,
+            track.author,
+            track.length,
+            requester=getattr(track, 'requester', None),
+            resolved_at=getattr(track, 'resolved_at', 0.0),
+            track=None if is_supported(encoded) else track
+        )
+
+    def to_playable(self) -> wavelink.Playable:
+        """Rebuild a Playable ready for player.play"""
+        track = self.track or playable_from_encoded(self.encoded)
+        if self.requester is not None:
+            setattr(track, 'requester', self.requester)
+        if self.resolved_at:
+            setattr(track, 'resolved_at', self.resolved_at)
+        return track
+
+    def _info(self) -> Dict[str, Any]:
+        return self.track.raw_data['info'] if self.track else decode_track(self.encoded)
+
+    @property
+    def uri(self) -> Optional[str]:
+        return self._info().get('uri')
+
+    @property
+    def identifier(self) -> str:
+        return self._info()['identifier']
+
+    @property
+    def is_stream(self) -> bool:
+        return self._info()['isStream']
+
+    def __eq__(self, other: object) -> bool:
+        encoded = getattr(other, 'encoded', None)
+        return encoded is not None and encoded == self.encoded
+
+    __hash__ = object.__hash__
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class BlockList:
+    """List split into blocks with a Fenwick tree over block sizes
+
+    - append / popleft: O(1) amortized
+    - positional get / set / insert / pop: O(log n) to find the block plus
+      a bounded in-block shift
+
+    Popping from the front only advances a head offset; the first block is
+    dropped once it's fully consumed, so tracks leaving the queue never
+    shift the rest of it.
+
+    With a weight function every block also keeps its weight sum (updated
+    in place, so a rebuild never re-weighs items) and a second Fenwick
+    tree runs over those sums: total_weight is O(1) and weight_before(index)
+    (a prefix sum, e.g. "starts in") is O(log n) plus a bounded in-block sum.
+    """
+
+    LOAD = 128  # blocks are split once they reach twice this size
+
+    def __init__(self, items: Iterable[Any] = (), weight: Optional[Callable[[Any], int]] = None):
+        self._blocks: List[List[Any]] = []
+        self._tree: List[int] = [0]  # 1-based Fenwick tree of block lengths
+        self._head = 0               # consumed slots at the start of the first block
+        self._len = 0
+        self._top = 0                # highest power of two <= number of blocks
+        self._weight = weight
+        self._wsums: List[int] = []   # weight sum of every block
+        self._wtree: List[int] = [0]  # same shape as _tree, over _wsums
+        self._wtotal = 0
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        for number, block in enumerate(self._blocks):
+            yield from (itertools.islice(block, self._head, None) if number == 0 else block)
+
+    def __reversed__(self) -> Iterator[Any]:
+        for number in range(len(self._blocks) - 1, -1, -1):
+            block = self._blocks[number]
+            stop = self._head if number == 0 else 0
+            for offset in range(len(block) - 1, stop - 1, -1):
+                yield block[offset]
+
+    def __getitem__(self, index: int) -> Any:
+        number, offset = self._locate(index)
+        return self._blocks[number][offset]
+
+    def slice(self, start: int, stop: int) -> List[Any]:
+        """Items [start, stop) in O(log n + page) - no walk from the head"""
+        start, stop = max(0, start), min(self._len, stop)
+        if start >= stop:
+            return []
+
+        number, offset = self._locate(start)
+        items: List[Any] = []
+        needed = stop - start
+        while needed:
+            chunk = self._blocks[number][offset:offset + needed]
+            items.extend(chunk)
+            needed -= len(chunk)
+            number, offset = number + 1, 0
+        return items
+
+    def __setitem__(self, index: int, value: Any):
+        number, offset = self._locate(index)
+        block = self._blocks[number]
+        if self._weight:
+            self._add_weight(number + 1, self._weight(value) - self._weight(block[offset]))
+        block[offset] = value
+
+    def append(self, item: Any):
+        if self._blocks and len(self._blocks[-1]) < self.LOAD:
+            self._blocks[-1].append(item)
+            self._add(len(self._blocks), 1)  # last node - touches a single tree slot
+            if self._weight:
+                self._add_weight(len(self._blocks), self._weight(item))
+        else:
+            self._blocks.append([item])
+            self._grow()
+        self._len += 1
+
+    def extend(self, items: Iterable[Any]):
+        for item in items:
+            self.append(item)
+
+    def popleft(self) -> Any:
+        if not self._len:
+            raise IndexError("pop from empty queue")
+        block = self._blocks[0]
+        item = block[self._head]
+        block[self._head] = None
+        self._head += 1
+        self._len -= 1
+        if self._head == len(block):
+            del self._blocks[0]
+            if self._weight:
+                del self._wsums[0]
+            self._head = 0
+            self._rebuild()
+        elif self._weight:
+            self._add_weight(1, -self._weight(item))
+        return item
+
+    def insert(self, index: int, item: Any):
+        index = max(0, min(self._len, index + self._len if index < 0 else index))
+        if index == self._len:
+            return self.append(item)
+        if index == 0 and self._head:
+            # Reuse a consumed slot in front of the queue
+            self._head -= 1
+            self._blocks[0][self._head] = item
+            self._len += 1
+            if self._weight:
+                self._add_weight(1, self._weight(item))
+            return
+
+        number, offset = self._locate(index)
+        block = self._blocks[number]
+        block.insert(offset, item)
+        self._len += 1
+        if len(block) >= 2 * self.LOAD:
+            if self._weight:
+                self._wsums[number] += self._weight(item)
+            if number == 0 and self._head:
+                del block[:self._head]
+                self._head = 0
+            if len(block) > self.LOAD:
+                self._blocks[number:number + 1] = [block[:self.LOAD], block[self.LOAD:]]
+                if self._weight:
+                    # Only the split block is re-weighed
+                    first = sum(map(self._weight, block[:self.LOAD]))
+                    self._wsums[number:number + 1] = [first, self._wsums[number] - first]
+            self._rebuild()
+        else:
+            self._add(number + 1, 1)
+            if self._weight:
+                self._add_weight(number + 1, self._weight(item))
+
+    def pop(self, index: int = 0) -> Any:
+        if index == 0 or index == -self._len:
+            return self.popleft()
+
+        number, offset = self._locate(index)
+        block = self._blocks[number]
+        item = block.pop(offset)
+        self._len -= 1
+        if len(block) == (self._head if number == 0 else 0):
+            del self._blocks[number]
+            if self._weight:
+                del self._wsums[number]
+            if number == 0:
+                self._head = 0
+            self._rebuild()
+        else:
+            self._add(number + 1, -1)
+            if self._weight:
+                self._add_weight(number + 1, -self._weight(item))
+        return item
+
+    def clear(self):
+        self._blocks.clear()
+        self._wsums.clear()
+        self._head = 0
+        self._len = 0
+        self._rebuild()
+
+    def replace(self, items: Iterable[Any]):
+        """Swap in a new ordering (shuffle, bulk removal) in one O(n) pass"""
+        items = list(items)
+        self._blocks = [items[i:i + self.LOAD] for i in range(0, len(items), self.LOAD)]
+        if self._weight:
+            self._wsums = [sum(map(self._weight, block)) for block in self._blocks]
+        self._head = 0
+        self._len = len(items)
+        self._rebuild()
+
+    @property
+    def total_weight(self) -> int:
+        """Sum of all item weights - O(1)"""
+        return self._wtotal
+
+    def weight_before(self, index: int) -> int:
+        """Sum of weights of the items in front of index"""
+        if not self._weight:
+            raise TypeError("BlockList has no weight function")
+        if index < 0:
+            index += self._len
+        if index >= self._len:
+            return self._wtotal
+        if index <= 0:
+            return 0
+
+        number, offset = self._locate(index)
+        total = 0
+        node = number
+        while node:
+            total += self._wtree[node]
+            node -= node & -node
+        start = self._head if number == 0 else 0
+        weight = self._weight
+        return total + sum(weight(item) for item in itertools.islice(self._blocks[number], start, offset))
+
+    def _locate(self, index: int):
+        """Map queue position to (block number, offset) by descending the Fenwick tree"""
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("queue index out of range")
+
+        remaining = index + self._head
+        node = 0
+        step = self._top
+        while step:
+            nxt = node + step
+            if nxt < len(self._tree) and self._tree[nxt] <= remaining:
+                node = nxt
+                remaining -= self._tree[nxt]
+            step >>= 1
+        return node, remaining
+
+    def _add(self, node: int, delta: int):
+        while node < len(self._tree):
+            self._tree[node] += delta
+            node += node & -node
+
+    def _add_weight(self, node: int, delta: int):
+        self._wsums[node - 1] += delta
+        self._wtotal += delta
+        while node < len(self._wtree):
+            self._wtree[node] += delta
+            node += node & -node
+
+    def _grow(self):
+        """Add the Fenwick node(s) for a freshly appended block"""
+        node = len(self._blocks)
+        value = len(self._blocks[-1])
+        first = self._weight(self._blocks[-1][0]) if self._weight else 0
+        weight = first
+        child = node - 1
+        lowest = node - (node & -node)
+        while child > lowest:
+            value += self._tree[child]
+            if self._weight:
+                weight += self._wtree[child]
+            child -= child & -child
+        self._tree.append(value)
+        if self._weight:
+            self._wsums.append(first)
+            self._wtotal += first
+            self._wtree.append(weight)
+        if node >= self._top * 2 or not self._top:
+            self._top = 1 << (node.bit_length() - 1)
+
+    @staticmethod
+    def _fenwick(values: List[int]) -> List[int]:
+        tree = [0] + values
+        count = len(values)
+        for node in range(1, count + 1):
+            parent = node + (node & -node)
+            if parent <= count:
+                tree[parent] += tree[node]
+        return tree
+
+    def _rebuild(self):
+        count = len(self._blocks)
+        self._tree = self._fenwick([len(block) for block in self._blocks])
+        self._top = 1 << (count.bit_length() - 1) if count else 0
+        if self._weight:
+            # Block sums are kept current - only the tree over them is rebuilt, O(blocks)
+            self._wtree = self._fenwick(self._wsums)
+            self._wtotal = sum(self._wsums)
+
+
+QueueItem = Union[wavelink.Playable, TrackRecord]
+
+
+def record_identifier(record: TrackRecord) -> str:
+    """Source identifier (e.g. YouTube video id) - the key for duplicate detection"""
+    try:
+        return record.identifier
+    except TrackDecodeError:
+        return record.encoded
+
+# Streams have no end (lavaplayer reports Long.MAX_VALUE), so each one weighs
+# one unit of STREAM_WEIGHT: a weight sum then splits into
+# (streams, milliseconds) with divmod and stays exact in plain ints
+STREAM_WEIGHT = 1 << 40  # ~35 years in ms - far above any real track
+
+
+def record_weight(record: Optional[TrackRecord]) -> int:
+    """Duration weight of a queue entry for BlockList aggregates"""
+    if record is None:
+        return 0
+    length = record.length or 0
+    return STREAM_WEIGHT if length >= STREAM_WEIGHT else max(0, length)
+
+
+class QueueJournal:
+    """Receives queue changes (e.g. for persistence) - default does nothing"""
+
+    def added(self, record: TrackRecord):
+        pass
+
+    def removed(self, record: TrackRecord):
+        pass
+
+    def reset(self, records: List[TrackRecord]):
+        pass
+
+
+class PlaybackHistory:
+    """Fixed-capacity ring of recently played tracks (oldest -> newest)
+
+    Stands in for wavelink's history queue: Player.play() calls put() for
+    every started track. Entries are compact TrackRecords, a push is O(1)
+    and overwrites the oldest entry once the ring is full. An optional
+    HistoryBudget additionally caps the entries of all guilds together.
+    """
+
+    def __init__(self, capacity: int = 100, budget: Optional['HistoryBudget'] = None):
+        self.capacity = max(1, capacity)
+        self.budget = budget
+        self._items: List[Optional[TrackRecord]] = [None] * self.capacity
+        self._stamps: List[int] = [0] * self.capacity
+        self._start = 0
+        self._len = 0
+        self.pushed = 0  # tracks ever put() - marks loop_all cycles
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __bool__(self) -> bool:
+        return bool(self._len)
+
+    def _slot(self, index: int) -> int:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("history index out of range")
+        return (self._start + index) % self.capacity
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            return list(self)[index]
+        return self._items[self._slot(index)]
+
+    def __iter__(self) -> Iterator[TrackRecord]:
+        for index in range(self._len):
+            yield self._items[(self._start + index) % self.capacity]
+
+    def __reversed__(self) -> Iterator[TrackRecord]:
+        for index in range(self._len - 1, -1, -1):
+            yield self._items[(self._start + index) % self.capacity]
+
+    @property
+    def is_empty(self) -> bool:
+        return not self._len
+
+    @property
+    def count(self) -> int:
+        return self._len
+
+    def put(self, item: Union[QueueItem, List[QueueItem]], /, *, atomic: bool = True) -> int:
+        """Record played track(s)"""
+        items = item if isinstance(item, (list, tuple)) else [item]
+        for track in items:
+            self._push(track if isinstance(track, TrackRecord) else TrackRecord.from_playable(track))
+        return len(items)
+
+    def _push(self, record: TrackRecord):
+        if self._len == self.capacity:
+            self.drop_oldest()
+        stamp = self.budget.next_stamp() if self.budget else self.pushed
+        slot = (self._start + self._len) % self.capacity
+        self._items[slot] = record
+        self._stamps[slot] = stamp
+        self._len += 1
+        self.pushed += 1
+        if self.budget:
+            self.budget.pushed(self, stamp)
+
+    @property
+    def oldest_stamp(self) -> Optional[int]:
+        return self._stamps[self._start] if self._len else None
+
+    def drop_oldest(self) -> Optional[TrackRecord]:
+        if not self._len:
+            return None
+        record = self._items[self._start]
+        self._items[self._start] = None
+        self._start = (self._start + 1) % self.capacity
+        self._len -= 1
+        if self.budget:
+            self.budget.released(1)
+        return record
+
+    def pop(self) -> TrackRecord:
+        """Remove and return the newest entry (used by !previous)"""
+        slot = self._slot(-1)
+        record = self._items[slot]
+        self._items[slot] = None
+        self._len -= 1
+        if self.budget:
+            self.budget.released(1)
+        return record
+
+    def since(self, pushed: int) -> List[TrackRecord]:
+        """Entries put() after the counter was at `pushed` (as many as the ring still holds)"""
+        count = min(self._len, max(0, self.pushed - pushed))
+        return [self[index] for index in range(self._len - count, self._len)]
+
+    def recent(self, start: int = 0, count: int = 10) -> List[TrackRecord]:
+        """Newest-first page"""
+        stop = min(self._len, start + count)
+        return [self[-1 - index] for index in range(start, stop)]
+
+    def clear(self):
+        if self.budget and self._len:
+            self.budget.released(self._len)
+        self._items = [None] * self.capacity
+        self._start = 0
+        self._len = 0
+
+
+class HistoryBudget:
+    """Hands out per-guild history rings and enforces a global entry cap
+
+    Every push is stamped and queued in order; once the total goes over
+    global_size the globally oldest entry - always the oldest entry of
+    some ring - is dropped. Queue entries whose record a ring already
+    evicted on its own are skipped (and compacted away periodically).
+    """
+
+    def __init__(self, guild_size: int = 100, global_size: int = 20000):
+        self.guild_size = guild_size
+        self.global_size = global_size
+        self._rings: Dict[int, PlaybackHistory] = {}
+        self._order: Deque[Tuple[PlaybackHistory, int]] = deque()
+        self._stamp = 0
+        self.total = 0
+
+        # Statistics
+        self.evicted = 0
+
+    def ring_for(self, guild_id: int) -> PlaybackHistory:
+        """Get the guild's history ring (shared by every player of that guild)"""
+        ring = self._rings.get(guild_id)
+        if ring is None:
+            ring = self._rings[guild_id] = PlaybackHistory(self.guild_size, budget=self)
+        return ring
+
+    def get(self, guild_id: int) -> Optional[PlaybackHistory]:
+        """Existing ring of a guild, if it ever played anything"""
+        return self._rings.get(guild_id)
+
+    def next_stamp(self) -> int:
+        self._stamp += 1
+        return self._stamp
+
+    def pushed(self, ring: PlaybackHistory, stamp: int):
+        self._order.append((ring, stamp))
+        self.total += 1
+        while self.total > self.global_size and self._order:
+            oldest, oldest_stamp = self._order.popleft()
+            if oldest.oldest_stamp == oldest_stamp:
+                oldest.drop_oldest()
+                self.evicted += 1
+        if len(self._order) > 2 * self.global_size + 64:
+            self._compact()
+
+    def released(self, count: int):
+        self.total -= count
+
+    def _compact(self):
+        """Drop order entries whose records are already gone"""
+        live = {id(ring): set(ring._stamps[ring._slot(i)] for i in range(len(ring))) for ring in self._rings.values()}
+        self._order = deque(
+            (ring, stamp) for ring, stamp in self._order if stamp in live.get(id(ring), ())
+        )
+
+    def forget_guild(self, guild_id: int):
+        ring = self._rings.pop(guild_id, None)
+        if ring:
+            ring.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get history statistics"""
+        return {
+            'guilds': len(self._rings),
+            'entries': self.total,
+            'guild_size': self.guild_size,
+            'global_size': self.global_size,
+            'evicted_global': self.evicted
+        }
+
+
+class MusicQueue(wavelink.Queue):
+    """wavelink.Queue storing compact TrackRecords in a BlockList
+
+    Iteration, indexing and peek() return TrackRecords (title, author,
+    length, uri, requester). get() and get_at() return real Playables.
+    Every record carries a sortable seq so a journal can mirror single
+    appends/removals instead of rewriting the whole queue.
+
+    With fair mode on, the queue is kept as a round-robin interleave of
+    per-requester lanes: _lanes maps requester -> queued track count in
+    rotation order. A new track is inserted straight at its slot (round =
+    its position in the requester's lane), so the next track is always
+    the queue head and get() stays O(1) - the player never rescans.
+    Deleting from the middle moves that requester's later tracks up a
+    round. Changes that bypass the turn slots (put_at, swapping or
+    replacing across requesters) deal the lanes out again.
+    """
+
+    def __init__(self, *, history: bool = True, history_ring: Optional[PlaybackHistory] = None):
+        super().__init__(history=False)
+        # Bounded ring instead of wavelink's ever-growing history queue
+        self._history = (history_ring or PlaybackHistory()) if history else None
+        self._cycle_mark = self._history.pushed if self._history else 0
+        self._records = BlockList(weight=record_weight)
+        self._next_seq = 0.0
+        self._fair = False
+        self._lanes: Dict[Any, int] = {}
+        self._by_identifier: Dict[str, List[TrackRecord]] = {}
+        self._duplicates = 0  # entries beyond the first copy of each identifier
+        self._version = 0  # bumped on every change, lets renderers cache pages
+        self.journal: QueueJournal = QueueJournal()
+
+    @classmethod
+    def for_player(cls, player: wavelink.Player) -> 'MusicQueue':
+        """Queue using the bot's shared per-guild history ring (bot.history_budget) when there is one"""
+        budget = getattr(player.client, 'history_budget', None)
+        guild = getattr(player.channel, 'guild', None)
+        return cls(history_ring=budget.ring_for(guild.id) if budget and guild else None)
+
+    @staticmethod
+    def _to_record(item: Any) -> TrackRecord:
+        if isinstance(item, TrackRecord):
+            return item
+        if isinstance(item, wavelink.Playable):
+            return TrackRecord.from_playable(item)
+        raise TypeError("This queue is restricted to Playable objects.")
+
+    def _append(self, record: TrackRecord):
+        record.seq = self._next_seq
+        self._next_seq += 1.0
+        self._records.append(record)
+        self._index_add(record)
+        self._version += 1
+        self.journal.added(record)
+
+    def _insert(self, index: int, record: TrackRecord):
+        """Insert before index with a seq between its neighbours"""
+        if index >= len(self._records):
+            self._append(record)
+            return
+
+        after = self._records[index].seq
+        before = self._records[index - 1].seq if index else after - 2.0
+        record.seq = (before + after) / 2
+        self._records.insert(index, record)
+        self._index_add(record)
+        self._version += 1
+        if before < record.seq < after:
+            self.journal.added(record)
+        else:
+            # Ran out of float precision between neighbours - renumber everything
+            self._replace(list(self._records), recount=False)
+
+    def _enqueue(self, record: TrackRecord) -> int:
+        """Add to the back - or to the requester's next free turn in fair mode - returns the index"""
+        if not self._fair:
+            self._append(record)
+            return len(self._records) - 1
+
+        key = requester_key(record)
+        turn = self._lanes.get(key, 0)
+        index = self._slot(key, turn)
+        self._insert(index, record)
+        self._lanes[key] = turn + 1
+        return index
+
+    def _slot(self, key: Any, turn: int) -> int:
+        """Index of a requester's track in the given round of the fair rotation"""
+        # Rounds before ours hold min(count, turn) tracks of every requester, then
+        # our round holds the requesters ahead of us in the rotation
+        index, ahead = 0, True
+        for other, count in self._lanes.items():
+            if other == key:
+                ahead = False
+            index += min(count, turn) + (ahead and count > turn)
+        return index
+
+    def _turn(self, key: Any, index: int) -> int:
+        """Round of the requester's track at index - inverse of _slot()"""
+        low, high = 0, self._lanes[key] - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self._slot(key, middle) < index:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _close_turn(self, key: Any, turn: int, count: int):
+        """Move the requester's tracks after a removed one up a round each
+
+        Only that lane shifts - other requesters keep their slots, so this
+        costs O(rounds left in the lane) moves instead of dealing every
+        lane out again.
+        """
+        for later in range(turn + 1, count):
+            # The removed track sat before it, so it is one slot further up
+            source, target = self._slot(key, later) - 1, self._slot(key, later - 1)
+            if source != target:
+                moved = self._records.pop(source)
+                self._index_remove(moved)
+                self.journal.removed(moved)
+                self._insert(target, moved)
+
+    def _count_lane(self, record: TrackRecord, delta: int, rotate: bool = False):
+        """Keep fair-mode lane counts in step with the records"""
+        if not self._fair:
+            return
+        key = requester_key(record)
+        count = (self._lanes.pop(key, 0) if rotate else self._lanes.get(key, 0)) + delta
+        if count > 0:
+            self._lanes[key] = count  # re-inserting moves the requester to the back of the rotation
+        else:
+            self._lanes.pop(key, None)
+
+    def _pop(self, index: int) -> TrackRecord:
+        if index < 0:
+            index += len(self._records)
+        key = requester_key(self._records[index])
+        if self._fair and index:
+            # From the middle it leaves a hole in that requester's later turns
+            count = self._lanes[key]
+            turn = self._turn(key, index)
+        record = self._records.pop(index)
+        self._index_remove(record)
+        self._version += 1
+        # Taking the head means that requester had their turn
+        self._count_lane(record, -1, rotate=index == 0)
+        self.journal.removed(record)
+        if self._fair and index:
+            self._close_turn(key, turn, count)
+        return record
+
+    def _rebalance(self):
+        """Re-interleave fair lanes after a change that bypassed the turn slots"""
+        if self._fair:
+            self._replace(list(self._records))
+
+    def _replace(self, records: List[TrackRecord], recount: bool = True):
+        """Bulk reorder - renumbers seqs and tells the journal to start over"""
+        if self._fair and recount:
+            # Dropping tracks leaves holes in the rotation - deal the lanes out again
+            # (requesters keep the order they first appear in, so the head stays put)
+            lanes = _group_by_requester(records)
+            records = round_robin(lanes.values())
+            self._lanes = {key: len(lane) for key, lane in lanes.items()}
+        if len(records) != len(self._records):
+            # Bulk removal (reorders keep the same records, so the index stays valid)
+            if records:
+                kept = set(map(id, records))
+                for record in self._records:
+                    if id(record) not in kept:
+                        self._index_remove(record)
+            else:
+                self._by_identifier.clear()
+                self._duplicates = 0
+        for seq, record in enumerate(records):
+            record.seq = float(seq)
+        self._next_seq = float(len(records))
+        self._records.replace(records)
+        self._version += 1
+        self.journal.reset(records)
+
+    # -- duplicate index ---------------------------------------------------
+
+    def _index_add(self, record: TrackRecord):
+        key = record_identifier(record)
+        entries = self._by_identifier.get(key)
+        if entries is None:
+            self._by_identifier[key] = [record]
+        else:
+            entries.append(record)
+            self._duplicates += 1
+
+    def _index_remove(self, record: TrackRecord):
+        key = record_identifier(record)
+        entries = self._by_identifier.get(key)
+        if not entries:
+            return
+        for position, entry in enumerate(entries):
+            if entry is record:
+                del entries[position]
+                break
+        else:
+            return
+        if entries:
+            self._duplicates -= 1
+        else:
+            del self._by_identifier[key]
+
+    def count_identifier(self, identifier: str) -> int:
+        """How many times a track is queued - O(1)"""
+        return len(self._by_identifier.get(identifier, ()))
+
+    @property
+    def duplicate_count(self) -> int:
+        """Queued entries that repeat an earlier one"""
+        return self._duplicates
+
+    def dedupe(self, drop: Optional[str] = None) -> int:
+        """Keep only the first queued copy of every track (and none of `drop`) in one pass"""
+        extra = self._by_identifier.get(drop, ()) if drop else ()
+        if not self._duplicates and not extra:
+            return 0
+
+        removed = set(map(id, extra))
+        for entries in self._by_identifier.values():
+            if len(entries) > 1:
+                # seq follows queue order, so the smallest one is the earliest copy
+                first = min(entries, key=lambda record: record.seq)
+                removed.update(id(record) for record in entries if record is not first)
+
+        kept = [record for record in self._records if id(record) not in removed]
+        self._replace(kept)
+        return len(removed)
+
+    # -- fair scheduling ---------------------------------------------------
+
+    @property
+    def fair(self) -> bool:
+        """Whether requesters take turns"""
+        return self._fair
+
+    @fair.setter
+    def fair(self, enabled: bool):
+        enabled = bool(enabled)
+        if enabled == self._fair:
+            return
+        self._fair = enabled
+        if enabled:
+            # Keep everyone's own order, rotate requesters by who queued first
+            self._replace(round_robin(_group_by_requester(self._records).values()))
+        else:
+            self._lanes.clear()
+
+    # -- duration aggregates -----------------------------------------------
+
+    @property
+    def version(self) -> int:
+        """Changes whenever the queue's contents or order change"""
+        return self._version
+
+    @property
+    def total_duration(self) -> int:
+        """Milliseconds of all queued finite tracks - O(1)"""
+        return self._records.total_weight % STREAM_WEIGHT
+
+    @property
+    def stream_count(self) -> int:
+        """Queued live streams (not part of total_duration)"""
+        return self._records.total_weight // STREAM_WEIGHT
+
+    def starts_in(self, index: int) -> Optional[int]:
+        """Milliseconds from the queue head starting until entry `index` starts
+
+        None when a live stream is queued in front of it. O(log n).
+        """
+        before = self._records.weight_before(index)
+        return None if before >= STREAM_WEIGHT else before
+
+    def requester_counts(self) -> Dict[Any, int]:
+        """Queued tracks per requester key (rotation order in fair mode)"""
+        if self._fair:
+            return dict(self._lanes)
+        return {key: len(lane) for key, lane in _group_by_requester(self._records).items()}
+
+    # -- container protocol ------------------------------------------------
+
+    def __bool__(self) -> bool:
+        return bool(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[TrackRecord]:
+        return iter(self._records)
+
+    def __reversed__(self) -> Iterator[TrackRecord]:
+        return reversed(self._records)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._records))
+            if step == 1:
+                return self._records.slice(start, stop)
+            if step > 0:
+                return list(itertools.islice(self._records, start, stop, step))
+            return list(self._records)[index]
+        return self._records[index]
+
+    def __setitem__(self, index: int, value: QueueItem):
+        record = self._to_record(value)
+        old = self._records[index]
+        record.seq = old.seq
+        self._records[index] = record
+        self._index_remove(old)
+        self._index_add(record)
+        self._version += 1
+        self.journal.added(record)  # same seq - replaces the old entry
+        if requester_key(record) != requester_key(old):
+            # The slot was another requester's turn - lanes change, deal them out again
+            self._rebalance()
+        self._wakeup_next()
+
+    def __delitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            records = list(self._records)
+            del records[index]
+            self._replace(records)
+        else:
+            self._pop(index)
+
+    def __contains__(self, item: object) -> bool:
+        return any(record == item for record in self._records)
+
+    # -- wavelink.Queue API ------------------------------------------------
+
+    def get(self) -> wavelink.Playable:
+        if self.mode is wavelink.QueueMode.loop and self._loaded:
+            return self._loaded
+
+        if self.mode is wavelink.QueueMode.loop_all and not self and self.history is not None:
+            # Replay what was played since the last cycle (history is shared per guild, so no clear())
+            for record in self.history.since(self._cycle_mark):
+                self._enqueue(copy.copy(record))
+            self._cycle_mark = self.history.pushed
+
+        if not self:
+            raise wavelink.QueueEmpty("There are no items currently in this queue.")
+
+        track = self._pop(0).to_playable()
+        self._loaded = track
+        return track
+
+    def get_at(self, index: int, /) -> wavelink.Playable:
+        if not self:
+            raise wavelink.QueueEmpty("There are no items currently in this queue.")
+        track = self._pop(index).to_playable()
+        self._loaded = track
+        return track
+
+    def put_at(self, index: int, value: QueueItem, /):
+        record = self._to_record(value)
+        size = len(self._records)
+        # An explicit position wins over the requester's turn - in fair mode the
+        # lanes are dealt out again around it (put_at(0, ...) stays at the head)
+        self._insert(max(0, min(size, index + size if index < 0 else index)), record)
+        self._count_lane(record, 1)
+        self._rebalance()
+        self._wakeup_next()
+
+    def put(self, item: Union[QueueItem, List[QueueItem], wavelink.Playlist], /, *, atomic: bool = True) -> int:
+        items = item if isinstance(item, (list, tuple, wavelink.Playlist)) else [item]
+        records = []
+        for track in items:
+            try:
+                records.append(self._to_record(track))
+            except TypeError:
+                if atomic:
+                    raise
+
+        for record in records:
+            self._enqueue(record)
+        self._wakeup_next()
+        return len(records)
+
+    def enqueue(self, item: QueueItem) -> int:
+        """put() a single track and return the position it landed at (fair mode may not append)"""
+        index = self._enqueue(self._to_record(item))
+        self._wakeup_next()
+        return index
+
+    async def put_wait(self, item: Union[QueueItem, List[QueueItem], wavelink.Playlist], /, *, atomic: bool = True) -> int:
+        # Appends are synchronous here, so there is nothing to interleave with
+        return self.put(item, atomic=atomic)
+
+    def delete(self, index: int, /):
+        self._pop(index)
+
+    def peek(self, index: int = 0, /) -> TrackRecord:
+        if not self:
+            raise wavelink.QueueEmpty("There are no items currently in this queue.")
+        return self._records[index]
+
+    def swap(self, first: int, second: int, /):
+        a, b = self._records[first], self._records[second]
+        a.seq, b.seq = b.seq, a.seq
+        self._records[first], self._records[second] = b, a
+        self._version += 1
+        self.journal.added(a)
+        self.journal.added(b)
+        if requester_key(a) != requester_key(b):
+            self._rebalance()
+
+    def index(self, item: object, /) -> int:
+        for position, record in enumerate(self._records):
+            if record == item:
+                return position
+        raise ValueError("Track not in queue")
+
+    def remove(self, item: object, /, count: Optional[int] = 1) -> int:
+        limit = None if count is None else max(1, count)
+        matches = []
+        for position, record in enumerate(self._records):
+            if limit is not None and len(matches) >= limit:
+                break
+            if record == item:
+                matches.append(position)
+        # Back to front - a removal only moves tracks after it
+        for position in reversed(matches):
+            self._pop(position)
+        return len(matches)
+
+    def shuffle(self, *, fair: bool = False) -> int:
+        """Reorder the queue in one pass without awaiting - returns number of tracks"""
+        records = list(self._records)
+        if self._fair:
+            # Shuffle inside every lane and the rotation, but keep taking turns
+            lanes = list(_group_by_requester(records).values())
+            for lane in lanes:
+                random.shuffle(lane)
+            random.shuffle(lanes)
+            records = round_robin(lanes)
+        elif fair:
+            records = fair_order(records)
+        else:
+            random.shuffle(records)  # Fisher-Yates
+        self._replace(records)
+        return len(records)
+
+    def clear(self):
+        self._replace([])
+
+    def reset(self):
+        """Clear the queue, waiters, mode and loaded track - but not the history
+
+        The history ring is shared by the guild (and counted by its
+        HistoryBudget), so !previous and !history keep working after a reset.
+        """
+        self.clear()
+        for waiter in self._waiters:
+            waiter.cancel()
+        self._waiters.clear()
+        self._mode = wavelink.QueueMode.normal
+        self._loaded = None
+        # A later loop_all cycle starts from here, not from tracks played before the reset
+        self._cycle_mark = self._history.pushed if self._history else 0
+
+    def copy(self) -> 'MusicQueue':
+        clone = MusicQueue(history=self.history is not None, history_ring=self.history)
+        clone.put([copy.copy(record) for record in self._records])
+        if self._fair:
+            clone._fair = True
+            clone._lanes = dict(self._lanes)
+        return clone
+
+
+def shuffle_queue(queue: wavelink.Queue, *, fair: bool = False) -> int:
+    """Shuffle any player queue atomically (no await between clear and refill)"""
+    if isinstance(queue, MusicQueue):
+        return queue.shuffle(fair=fair)
+    queue.shuffle()
+    return len(queue)
@@ -0,0 +1,105 @@
+"""Bounded in-memory prefix index for fast title/author lookups"""
+
+import bisect
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+
+def normalize_text(text: str) -> str:
+    """Casefold and strip accents so 'Żółć' matches 'zolc'"""
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.replace('ł', 'l').split())
+
+
+class PrefixEntry:
+    """Single indexed track"""
+
+    __slots__ = ('key', 'label', 'value', 'plays', 'terms')
+
+    def __init__(self, key: str, label: str, value: str, terms: Tuple[str, ...]):
+        self.key = key
+        self.label = label
+        self.value = value
+        self.plays = 0
+        self.terms = terms
+
+
+class PrefixIndex:
+    """Sorted array of search terms with LRU-bounded entries
+
+    Every entry is indexed under its full title, its author and the word
+    suffixes of its title, so "gonna give" finds "Never Gonna Give You Up".
+    """
+
+    def __init__(self, max_entries: int = 500, max_words: int = 6):
+        self.max_entries = max(1, max_entries)
+        self.max_words = max_words
+        self._terms: List[str] = []         # sorted search terms
+        self._owners: List[str] = []        # entry key for each term (parallel to _terms)
+        self._entries: "OrderedDict[str, PrefixEntry]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def term_count(self) -> int:
+        return len(self._terms)
+
+    def add(self, key: str, title: str, author: str, value: str):
+        """Index (or refresh) an entry - O(log n) search plus list insert"""
+        entry = self._entries.get(key)
+        if entry is None:
+            label = f"{title} — {author}" if author else title
+            entry = PrefixEntry(key, label, value, self._build_terms(title, author))
+            self._entries[key] = entry
+            for term in entry.terms:
+                index = bisect.bisect_left(self._terms, term)
+                self._terms.insert(index, term)
+                self._owners.insert(index, key)
+
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+        else:
+            self._entries.move_to_end(key)
+
+        entry.plays += 1
+
+    def search(self, prefix: str, limit: int = 25, max_scan: int = 250) -> List[PrefixEntry]:
+        """Entries having a term starting with prefix, most played first"""
+        prefix = normalize_text(prefix)
+        if not prefix:
+            # No input yet - suggest most recently played
+            return list(reversed(self._entries.values()))[:limit]
+
+        found: Dict[str, PrefixEntry] = {}
+        index = bisect.bisect_left(self._terms, prefix)
+        end = min(len(self._terms), index + max_scan)
+
+        while index < end and self._terms[index].startswith(prefix):
+            owner = self._owners[index]
+            if owner not in found:
+                found[owner] = self._entries[owner]
+            index += 1
+
+        return sorted(found.values(), key=lambda entry: entry.plays, reverse=True)[:limit]
+
+    def _build_terms(self, title: str, author: str) -> Tuple[str, ...]:
+        words = normalize_text(title).split()
+        terms = {' '.join(words[i:]) for i in range(min(len(words), self.max_words))}
+        if author:
+            terms.add(normalize_text(author))
+        terms.discard('')
+        return tuple(sorted(terms))
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key)
+        for term in entry.terms:
+            index = bisect.bisect_left(self._terms, term)
+            while index < len(self._terms) and self._terms[index] == term:
+                if self._owners[index] == key:
+                    del self._terms[index]
+                    del self._owners[index]
+                    break
+                index += 1
@@ -0,0 +1,128 @@
+"""Embed render layer: compiled templates, memoized static embeds and bar lookup tables"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import discord
+
+from utils.metrics import LatencyStats, LatencyTimer
+
+
+class BarTable:
+    """Every bar string of one length, built once and looked up by filled cells"""
+
+    def __init__(self, length: int, filled: str = '▰', empty: str = '▱'):
+        self.length = length
+        self._bars = tuple(filled * cells + empty * (length - cells) for cells in range(length + 1))
+
+    def __getitem__(self, cells: int) -> str:
+        return self._bars[max(0, min(self.length, cells))]
+
+    def ratio(self, ratio: float) -> str:
+        """Bar for a 0..1 fraction (cells are rounded down)"""
+        return self[int(ratio * self.length)]
+
+
+PROGRESS_BAR = BarTable(20)
+VOLUME_BAR = BarTable(10)
+
+
+class EmbedTemplate:
+    """Embed whose static parts are laid out once; render() only fills field values
+
+    Title, colour, footer and the field names/inline flags are fixed at
+    construction, so a render is one dict assembly and Embed.from_dict
+    instead of a chain of add_field/set_footer calls.
+    """
+
+    def __init__(self, *, title: Optional[str] = None, color: Optional[int] = None,
+                 fields: Sequence[Tuple[str, bool]] = (), footer_text: Optional[str] = None,
+                 footer_icon: Optional[str] = None):
+        base: Dict[str, Any] = {'type': 'rich'}
+        if title is not None:
+            base['title'] = title
+        if color is not None:
+            base['color'] = color
+        if footer_text is not None:
+            base['footer'] = {'text': footer_text}
+            if footer_icon:
+                base['footer']['icon_url'] = footer_icon
+        self._base = base
+        self._fields = tuple(fields)
+
+    def render(self, values: Sequence[str], *, description: Optional[str] = None,
+               extra_fields: Iterable[Tuple[str, str, bool]] = (), thumbnail: Optional[str] = None,
+               timestamp: Optional[datetime] = None) -> discord.Embed:
+        """Embed with the template's fields set to `values` (in field order)"""
+        payload = dict(self._base)
+        fields = [{'name': name, 'value': value, 'inline': inline} for (name, inline), value in zip(self._fields, values)]
+        fields.extend({'name': name, 'value': value, 'inline': inline} for name, value, inline in extra_fields)
+        payload['fields'] = fields
+        if description is not None:
+            payload['description'] = description
+        if thumbnail:
+            payload['thumbnail'] = {'url': thumbnail}
+
+        embed = discord.Embed.from_dict(payload)
+        if timestamp is not None:
+            embed.timestamp = timestamp
+        return embed
+
+
+class EmbedRenderer:
+    """Shared cache of static embeds and templates, with per-embed render timings
+
+    Keys should include whatever the cached embed depends on (prefix,
+    avatar URL, ...) so a change simply produces a new entry.
+    """
+
+    def __init__(self):
+        self._static: Dict[Hashable, discord.Embed] = {}
+        self._templates: Dict[Hashable, EmbedTemplate] = {}
+        self._timings: Dict[str, LatencyStats] = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+    def static(self, key: Hashable, build: Callable[[], discord.Embed]) -> discord.Embed:
+        """Embed built once per key - shared, so copy() it before changing anything"""
+        embed = self._static.get(key)
+        if embed is None:
+            self.misses += 1
+            embed = self._static[key] = build()
+        else:
+            self.hits += 1
+        return embed
+
+    def template(self, key: Hashable, build: Callable[[], EmbedTemplate]) -> EmbedTemplate:
+        """Template compiled once per key"""
+        template = self._templates.get(key)
+        if template is None:
+            self.misses += 1
+            template = self._templates[key] = build()
+        else:
+            self.hits += 1
+        return template
+
+    def timer(self, name: str) -> LatencyTimer:
+        """Time one render of `name` (reported in get_stats)"""
+        stats = self._timings.get(name)
+        if stats is None:
+            stats = self._timings[name] = LatencyStats()
+        return stats.timer()
+
+    def invalidate(self):
+        """Drop every cached embed and template"""
+        self._static.clear()
+        self._templates.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get render statistics"""
+        return {
+            'static_embeds': len(self._static),
+            'templates': len(self._templates),
+            'hits': self.hits,
+            'misses': self.misses,
+            'render': {name: stats.get_stats() for name, stats in self._timings.items()}
+        }
@@ -0,0 +1,79 @@
+"""Request coalescing - concurrent identical calls share one in-flight future"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Run at most one coroutine per key; concurrent callers await the same result"""
+    
+    def __init__(self):
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        
+        # Statistics
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.max_waiters = 0
+        self.abandoned = 0
+        self._waiters: Dict[str, int] = {}
+    
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+    
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Return result of factory(), sharing it with concurrent callers of the same key"""
+        self.calls += 1
+        
+        task = self._in_flight.get(key)
+        if task is None or self._dying(task):
+            # Never join a lookup that is being cancelled - the caller would get CancelledError
+            self.executions += 1
+            task = asyncio.ensure_future(factory())
+            self._in_flight[key] = task
+            self._waiters[key] = 1
+            task.add_done_callback(lambda done, key=key: self._forget(key, done))
+        else:
+            self.coalesced += 1
+            self._waiters[key] += 1
+            self.max_waiters = max(self.max_waiters, self._waiters[key])
+        
+        # Shield so one cancelled caller doesn't cancel the lookup for everyone else
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._release(key, task)
+    
+    def _release(self, key: str, task: asyncio.Task):
+        """Caller left - cancel the lookup once nobody is waiting for it anymore"""
+        if self._in_flight.get(key) is not task or task.done():
+            return
+        self._waiters[key] -= 1
+        if self._waiters[key] <= 0:
+            # Unregister before cancelling so new callers start a fresh lookup
+            self._forget(key, task)
+            task.cancel()
+            self.abandoned += 1
+    
+    @staticmethod
+    def _dying(task: asyncio.Future) -> bool:
+        cancelling = getattr(task, 'cancelling', None)
+        return task.cancelled() or bool(cancelling and cancelling())
+    
+    def _forget(self, key: str, task: asyncio.Future):
+        # A newer flight may own the key by the time an old one finishes
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+            self._waiters.pop(key, None)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Get coalescing statistics"""
+        return {
+            'calls': self.calls,
+            'executions': self.executions,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._in_flight),
+            'max_waiters': self.max_waiters,
+            'abandoned': self.abandoned
+        }
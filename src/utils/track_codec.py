@@ -0,0 +1,148 @@
+"""Pure-Python decoder for Lavalink encoded track strings
+
+Lavalink (v3/v4) encodes tracks with lavaplayer's MessageOutput format:
+
+    int     header         (flags << 30) | message size
+    byte    version        only when the TRACK_INFO_VERSIONED flag is set
+    utf     title
+    utf     author
+    long    length         milliseconds
+    utf     identifier
+    bool    isStream
+    utf?    uri            version >= 2 (bool "present" + utf)
+    utf?    artworkUrl     version >= 3
+    utf?    isrc           version >= 3
+    utf     sourceName
+    ...     source specific data (skipped)
+    long    position       last 8 bytes of the message
+
+Strings are Java "modified UTF-8" with an unsigned short length prefix.
+"""
+
+import base64
+import binascii
+import struct
+from typing import Any, Dict, Optional
+
+import wavelink
+
+TRACK_INFO_VERSIONED = 1
+
+
+class TrackDecodeError(ValueError):
+    """Encoded track string is malformed or uses an unknown format"""
+
+
+class _Reader:
+    """Big-endian reader over the decoded message body"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+        self.offset = 0
+
+    def read(self, size: int) -> bytes:
+        end = self.offset + size
+        if end > len(self.data):
+            raise TrackDecodeError("Unexpected end of track data")
+        chunk = self.data[self.offset:end]
+        self.offset = end
+        return chunk
+
+    def read_byte(self) -> int:
+        return self.read(1)[0]
+
+    def read_bool(self) -> bool:
+        return self.read_byte() != 0
+
+    def read_long(self) -> int:
+        return struct.unpack('>q', self.read(8))[0]
+
+    def read_utf(self) -> str:
+        size = struct.unpack('>H', self.read(2))[0]
+        return _decode_modified_utf8(self.read(size))
+
+    def read_nullable_utf(self) -> Optional[str]:
+        return self.read_utf() if self.read_bool() else None
+
+
+def _decode_modified_utf8(raw: bytes) -> str:
+    """Java modified UTF-8: NUL is 0xC0 0x80, astral chars are surrogate pairs"""
+    try:
+        text = raw.replace(b'\xc0\x80', b'\x00').decode('utf-8', 'surrogatepass')
+        return text.encode('utf-16', 'surrogatepass').decode('utf-16')
+    except UnicodeError as e:
+        raise TrackDecodeError(f"Invalid string in track data: {e}") from e
+
+
+def decode_track(encoded: str) -> Dict[str, Any]:
+    """Decode an encoded track into a Lavalink-style track info dict"""
+    try:
+        raw = base64.b64decode(encoded, validate=True)
+    except (binascii.Error, ValueError, TypeError) as e:
+        raise TrackDecodeError(f"Invalid base64 track: {e}") from e
+
+    if len(raw) < 4:
+        raise TrackDecodeError("Track data too short")
+
+    header = struct.unpack('>I', raw[:4])[0]
+    flags = header >> 30
+    size = header & 0x3FFFFFFF
+    body = raw[4:4 + size]
+    if len(body) != size or size < 8:
+        raise TrackDecodeError("Track message size mismatch")
+
+    reader = _Reader(body)
+    version = reader.read_byte() if flags & TRACK_INFO_VERSIONED else 1
+    if version > 3:
+        raise TrackDecodeError(f"Unsupported track version {version}")
+
+    title = reader.read_utf()
+    author = reader.read_utf()
+    length = reader.read_long()
+    identifier = reader.read_utf()
+    is_stream = reader.read_bool()
+    uri = reader.read_nullable_utf() if version >= 2 else None
+    artwork_url = reader.read_nullable_utf() if version >= 3 else None
+    isrc = reader.read_nullable_utf() if version >= 3 else None
+    source_name = reader.read_utf()
+
+    # Source specific fields come next - position is always the trailing long
+    if reader.offset > size - 8:
+        raise TrackDecodeError("Track data missing position")
+    position = struct.unpack('>q', body[-8:])[0]
+
+    return {
+        'identifier': identifier,
+        'isSeekable': not is_stream,
+        'author': author,
+        'length': length,
+        'isStream': is_stream,
+        'position': position,
+        'title': title,
+        'uri': uri,
+        'artworkUrl': artwork_url,
+        'isrc': isrc,
+        'sourceName': source_name
+    }
+
+
+def is_supported(encoded: str) -> bool:
+    """Cheap header check - whether decode_track understands this track version"""
+    try:
+        raw = base64.b64decode(encoded[:8], validate=True)
+    except (binascii.Error, ValueError, TypeError):
+        return False
+    if len(raw) < 5:
+        return False
+    flags = raw[0] >> 6
+    return not flags & TRACK_INFO_VERSIONED or raw[4] <= 3
+
+
+def payload_from_encoded(encoded: str) -> Dict[str, Any]:
+    """Build a REST-style track payload without asking Lavalink to decode it"""
+    return {'encoded': encoded, 'info': decode_track(encoded), 'pluginInfo': {}, 'userData': {}}
+
+
+def playable_from_encoded(encoded: str) -> wavelink.Playable:
+    """Decode straight into a Playable that can be passed to player.play"""
+    return wavelink.Playable(payload_from_encoded(encoded))
@@ -3,9 +3,10 @@
 import discord
 from discord.ext import commands
 import wavelink
-import random
 from typing import Optional
 
+from utils.music_queue import shuffle_queue
+
 class MusicControlsView(discord.ui.View):
     """Interactive music control buttons"""
     
@@ -115,18 +116,15 @@ class MusicControlsView(discord.ui.View):
                 return
                 
             if hasattr(self.player, 'queue') and self.player.queue:
-                tracks_list = list(self.player.queue)
-                if len(tracks_list) < 2:
+                if len(self.player.queue) < 2:
                     await interaction.response.send_message("❌ Need at least 2 tracks to shuffle!", ephemeral=True)
                     return
                     
-                random.shuffle(tracks_list)
-                
-                self.player.queue.clear()
-                for track in tracks_list:
-                    await self.player.queue.put_wait(track)
-                
+                shuffle_queue(self.player.queue)
                 await interaction.response.send_message("🔀 Queue shuffled!", ephemeral=True)
+                
+                if hasattr(self.player, 'update_persistent_panel'):
+                    await self.player.update_persistent_panel()
             else:
                 await interaction.response.send_message("❌ Queue is empty!", ephemeral=True)
         except Exception as e:
@@ -183,7 +181,7 @@ class MusicControlsView(discord.ui.View):
                 
             if hasattr(self.player, 'queue') and self.player.queue:
                 queue_list = []
-                for i, track in enumerate(list(self.player.queue)[:10], 1):
+                for i, track in enumerate(self.player.queue[:10], 1):
                     title = getattr(track, 'title', 'Unknown Track')
                     queue_list.append(f"{i}. {title}")
                 
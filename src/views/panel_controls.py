@@ -0,0 +1,98 @@
+"""Now-playing panel buttons shared by every guild's panel"""
+
+from typing import Any, Optional
+
+import discord
+import wavelink
+
+
+class PanelControlsView(discord.ui.View):
+    """Persistent panel controls, registered once with bot.add_view
+
+    The view keeps no player or message: every click looks up the player
+    of the guild it came from, so a single instance serves all panels and
+    buttons on panels sent before a restart keep working.
+    """
+
+    def __init__(self):
+        super().__init__(timeout=None)
+
+    @staticmethod
+    def get_player(interaction: discord.Interaction) -> Optional[wavelink.Player]:
+        """The clicking guild's player, if music is active there"""
+        guild = interaction.client.get_guild(interaction.guild_id) if interaction.guild_id else None
+        player = guild.voice_client if guild else None
+        return player if isinstance(player, wavelink.Player) else None
+
+    @staticmethod
+    def get_cog(interaction: discord.Interaction) -> Any:
+        """The loaded music cog"""
+        return interaction.client.get_cog('MusicCommands')
+
+    @classmethod
+    def get_ui(cls, interaction: discord.Interaction) -> Any:
+        """EnhancedMusicUI of the loaded music cog"""
+        return getattr(cls.get_cog(interaction), 'ui_handler', None)
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        if self.get_player(interaction) is None or self.get_ui(interaction) is None:
+            await interaction.response.send_message("❌ No active music player", ephemeral=True)
+            return False
+        return True
+
+    @discord.ui.button(emoji="⏯️", style=discord.ButtonStyle.primary, custom_id="play_pause")
+    async def play_pause(self, interaction: discord.Interaction, button: discord.ui.Button):
+        player, ui = self.get_player(interaction), self.get_ui(interaction)
+        try:
+            if player.paused:
+                await player.pause(False)  # Resume
+                await interaction.response.send_message("▶️ Resumed playback", ephemeral=True)
+            else:
+                await player.pause(True)  # Pause
+                await interaction.response.send_message("⏸️ Paused playback", ephemeral=True)
+            queue_store = getattr(ui.bot, 'queue_store', None)
+            if queue_store:
+                queue_store.save_state(player)
+            await ui.refresh_panel(player)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @discord.ui.button(emoji="⏭️", style=discord.ButtonStyle.secondary, custom_id="skip")
+    async def skip_track(self, interaction: discord.Interaction, button: discord.ui.Button):
+        player = self.get_player(interaction)
+        try:
+            if not player.queue:
+                await interaction.response.send_message("❌ No tracks in queue to skip to", ephemeral=True)
+                return
+
+            await player.skip()
+            await interaction.response.send_message("⏭️ Skipped to next track", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @discord.ui.button(emoji="⏹️", style=discord.ButtonStyle.danger, custom_id="stop")
+    async def stop_playback(self, interaction: discord.Interaction, button: discord.ui.Button):
+        player = self.get_player(interaction)
+        try:
+            # Same teardown as !stop (playlist loader, prefetcher, saved session, panel)
+            await self.get_cog(interaction).stop_player(player)
+            await interaction.response.send_message("⏹️ Stopped playback and disconnected", ephemeral=True)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @discord.ui.button(emoji="🔀", style=discord.ButtonStyle.secondary, custom_id="shuffle")
+    async def shuffle_queue(self, interaction: discord.Interaction, button: discord.ui.Button):
+        player, ui = self.get_player(interaction), self.get_ui(interaction)
+        try:
+            if len(player.queue) < 2:
+                await interaction.response.send_message("❌ Need at least 2 tracks to shuffle", ephemeral=True)
+                return
+
+            await interaction.response.send_message("🔀 Queue shuffled", ephemeral=True)
+            await ui.shuffle(player)
+        except Exception as e:
+            await interaction.response.send_message(f"❌ Error: {str(e)}", ephemeral=True)
+
+    @discord.ui.button(emoji="📋", style=discord.ButtonStyle.secondary, custom_id="queue")
+    async def show_queue(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.get_ui(interaction).show_queue_embed(interaction, self.get_player(interaction))
@@ -0,0 +1,76 @@
+"""Paginated queue browser buttons"""
+
+from typing import Any, Optional
+
+import discord
+import wavelink
+
+
+class JumpToPageModal(discord.ui.Modal, title="Jump to page"):
+    """Asks for a page number and shows that page in the browser"""
+
+    page = discord.ui.TextInput(label="Page", placeholder="1", max_length=6)
+
+    def __init__(self, browser: 'QueueBrowserView'):
+        super().__init__()
+        self.browser = browser
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            page = int(self.page.value) - 1
+        except ValueError:
+            await interaction.response.send_message("❌ Enter a page number", ephemeral=True)
+            return
+        await self.browser.show(interaction, page)
+
+
+class QueueBrowserView(discord.ui.View):
+    """Previous/next/jump over the queue
+
+    Pages are rendered by EnhancedMusicUI from queue slices and cached per
+    queue version, so flipping through a long queue costs O(page) per click.
+    """
+
+    def __init__(self, ui: Any, player: wavelink.Player, page: int = 0, timeout: float = 180):
+        super().__init__(timeout=timeout)
+        self.ui = ui
+        self.player = player
+        self.page = page
+        self.message: Optional[discord.Message] = None
+        self._sync_buttons()
+
+    def _sync_buttons(self):
+        pages = self.ui.queue_page_count(self.player)
+        self.previous_page.disabled = self.page <= 0
+        self.next_page.disabled = self.page >= pages - 1
+        self.jump.disabled = pages <= 1
+
+    async def show(self, interaction: discord.Interaction, page: int):
+        """Edit the browser message to show `page` (clamped to the queue's current size)"""
+        pages = self.ui.queue_page_count(self.player)
+        self.page = max(0, min(page, pages - 1))
+        self._sync_buttons()
+        await interaction.response.edit_message(embed=self.ui.render_queue_page(self.player, self.page), view=self)
+
+    async def on_timeout(self):
+        """Disable the buttons once nobody browses any more"""
+        for item in self.children:
+            if isinstance(item, discord.ui.Button):
+                item.disabled = True
+        if self.message is not None:
+            try:
+                await self.message.edit(view=self)
+            except discord.HTTPException:
+                pass
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page - 1)
+
+    @discord.ui.button(emoji="🔢", label="Jump", style=discord.ButtonStyle.secondary)
+    async def jump(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await interaction.response.send_modal(JumpToPageModal(self))
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self.show(interaction, self.page + 1)
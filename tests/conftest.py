@@ -0,0 +1,51 @@
+"""Make the bot's modules importable the way bot.py sees them (src/ on the path), plus shared helpers"""
+
+import base64
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+
+def _utf(text):
+    # Java modified UTF-8: NUL as two bytes, astral characters as surrogate pairs
+    data = bytearray()
+    for char in text:
+        code = ord(char)
+        if code == 0:
+            data += b'\xc0\x80'
+        elif code > 0xFFFF:
+            code -= 0x10000
+            for surrogate in (0xD800 + (code >> 10), 0xDC00 + (code & 0x3FF)):
+                data += chr(surrogate).encode('utf-8', 'surrogatepass')
+        else:
+            data += char.encode('utf-8')
+    return struct.pack('>H', len(data)) + bytes(data)
+
+
+def _nullable(text):
+    return b'\x00' if text is None else b'\x01' + _utf(text)
+
+
+def encode_lavalink_track(title='Song', author='Artist', length=215000, identifier='dQw4w9WgXcQ', is_stream=False,
+           uri='https://youtu.be/dQw4w9WgXcQ', artwork=None, isrc=None, source='youtube', version=3, position=0):
+    """Minimal lavaplayer MessageOutput encoder (the inverse of decode_track)"""
+    body = bytes([version]) if version > 1 else b''
+    body += _utf(title) + _utf(author) + struct.pack('>q', length) + _utf(identifier) + bytes([is_stream])
+    if version >= 2:
+        body += _nullable(uri)
+    if version >= 3:
+        body += _nullable(artwork) + _nullable(isrc)
+    body += _utf(source) + struct.pack('>q', position)
+    flags = 1 if version > 1 else 0
+    return base64.b64encode(struct.pack('>I', (flags << 30) | len(body)) + body).decode()
+
+
+@pytest.fixture
+def encode_track():
+    """Build Lavalink encoded track strings without a Lavalink server"""
+    return encode_lavalink_track
+
@@ -0,0 +1,67 @@
+"""BlockList against a plain list"""
+
+import random
+
+import pytest
+
+from utils.music_queue import BlockList
+
+
+class SmallBlocks(BlockList):
+    LOAD = 4  # many blocks, splits and block drops from a few dozen items
+
+
+def check(blocks, reference):
+    assert len(blocks) == len(reference)
+    assert list(blocks) == reference
+    assert list(reversed(blocks)) == reference[::-1]
+    assert blocks.total_weight == sum(reference)
+    for index in range(len(reference) + 1):
+        assert blocks.weight_before(index) == sum(reference[:index])
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_matches_list_under_random_operations(seed):
+    rng = random.Random(seed)
+    blocks, reference = SmallBlocks(weight=lambda item: item), []
+    for _ in range(300):
+        value = rng.randint(0, 1000)
+        action = rng.random()
+        if action < 0.3:
+            blocks.append(value)
+            reference.append(value)
+        elif action < 0.45 and reference:
+            assert blocks.popleft() == reference.pop(0)
+        elif action < 0.65:
+            index = rng.randint(-len(reference) - 2, len(reference) + 2)
+            blocks.insert(index, value)
+            reference.insert(max(0, min(len(reference), index + len(reference) if index < 0 else index)), value)
+        elif action < 0.8 and reference:
+            index = rng.randrange(-len(reference), len(reference))
+            assert blocks.pop(index) == reference.pop(index)
+        elif action < 0.92 and reference:
+            index = rng.randrange(len(reference))
+            blocks[index] = value
+            reference[index] = value
+        elif action < 0.97:
+            rng.shuffle(reference)
+            blocks.replace(reference)
+        else:
+            start = rng.randint(-2, len(reference) + 2)
+            stop = start + rng.randint(0, 10)
+            assert blocks.slice(start, stop) == reference[max(0, start):max(0, stop)]
+        check(blocks, reference)
+
+
+def test_indexing_and_errors():
+    blocks = SmallBlocks(range(10))
+    assert blocks[0] == 0 and blocks[-1] == 9 and blocks[5] == 5
+    with pytest.raises(IndexError):
+        blocks[10]
+    with pytest.raises(TypeError):
+        blocks.weight_before(1)
+
+    blocks.clear()
+    assert len(blocks) == 0 and list(blocks) == []
+    with pytest.raises(IndexError):
+        blocks.popleft()
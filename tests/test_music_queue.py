@@ -0,0 +1,155 @@
+"""MusicQueue fair lanes, ETA and duplicates"""
+
+import random
+from types import SimpleNamespace
+
+import wavelink
+
+from utils.music_queue import STREAM_WEIGHT, MusicQueue, PlaybackHistory, TrackRecord, _group_by_requester, round_robin
+
+USERS = [SimpleNamespace(id=user_id) for user_id in range(4)]
+
+
+def make_record(name, user, length=1000):
+    # Not a real Lavalink track - only the encoded string is used as the duplicate key
+    return TrackRecord(f'fake:{name}', name, 'artist', length, requester=user)
+
+
+def assert_interleaved(queue):
+    """The queue is the round robin of its lanes and _lanes counts them in rotation order"""
+    records = list(queue)
+    lanes = _group_by_requester(records)
+    assert list(queue._lanes) == list(lanes)
+    assert queue._lanes == {key: len(lane) for key, lane in lanes.items()}
+    assert records == round_robin(lanes.values())
+
+
+def test_fair_put_takes_turns():
+    queue = MusicQueue(history=False)
+    queue.fair = True
+    for name in ('a1', 'a2', 'a3'):
+        queue.put(make_record(name, USERS[0]))
+    for name in ('b1', 'b2'):
+        queue.put(make_record(name, USERS[1]))
+    queue.put(make_record('c1', USERS[2]))
+
+    assert [record.title for record in queue] == ['a1', 'b1', 'c1', 'a2', 'b2', 'a3']
+    assert_interleaved(queue)
+
+
+def test_fair_dedupe_keeps_turns():
+    rng = random.Random(16)
+    for _ in range(200):
+        queue = MusicQueue(history=False)
+        queue.fair = True
+        for _ in range(rng.randint(2, 20)):
+            queue.put(make_record(f't{rng.randint(0, 5)}', rng.choice(USERS)))
+        queue.dedupe()
+        assert_interleaved(queue)
+
+        queue.put(make_record('new', rng.choice(USERS)))
+        assert_interleaved(queue)
+
+
+def test_fair_invariant_holds_after_every_mutation():
+    rng = random.Random(13)
+    for _ in range(200):
+        queue = MusicQueue(history=False)
+        queue.fair = True
+        for step in range(40):
+            size = len(queue)
+            record = make_record(f't{step}', rng.choice(USERS))
+            action = rng.choice(('put', 'put', 'put', 'head', 'delete', 'remove', 'put_at', 'setitem', 'swap'))
+            if action == 'put' or not size:
+                queue.put(record)
+            elif action == 'head':
+                queue.delete(0)
+            elif action == 'delete':
+                queue.delete(rng.randrange(-size, size))
+            elif action == 'remove':
+                queue.remove(queue[rng.randrange(size)], count=rng.choice((1, None)))
+            elif action == 'put_at':
+                queue.put_at(rng.randrange(size + 1), record)
+            elif action == 'setitem':
+                queue[rng.randrange(size)] = record
+            else:
+                queue.swap(rng.randrange(size), rng.randrange(size))
+            assert_interleaved(queue)
+
+
+def test_fair_delete_moves_only_that_lane():
+    queue = MusicQueue(history=False)
+    queue.fair = True
+    for name, user in (('a1', 0), ('a2', 0), ('a3', 0), ('b1', 1), ('b2', 1), ('b3', 1), ('c1', 2)):
+        queue.put(make_record(name, USERS[user]))
+    seqs = {record.title: record.seq for record in queue}
+    queue.delete(3)  # a2
+
+    assert [record.title for record in queue] == ['a1', 'b1', 'c1', 'a3', 'b2', 'b3']
+    assert_interleaved(queue)
+    # Only a3 took a new slot - the other lanes kept theirs
+    assert all(record.seq == seqs[record.title] for record in queue if record.title != 'a3')
+
+
+def test_fair_put_at_head_stays_at_head():
+    queue = MusicQueue(history=False)
+    queue.fair = True
+    for name, user in (('a1', 0), ('a2', 0), ('b1', 1), ('b2', 1)):
+        queue.put(make_record(name, USERS[user]))
+    queue.put_at(0, make_record('b0', USERS[1]))
+
+    assert queue.peek().title == 'b0'
+    assert_interleaved(queue)
+
+
+def test_starts_in_and_total_duration():
+    queue = MusicQueue(history=False)
+    for name, length in (('a', 1000), ('b', 2000), ('live', STREAM_WEIGHT), ('c', 4000)):
+        queue.put(make_record(name, USERS[0], length))
+
+    assert [queue.starts_in(index) for index in range(4)] == [0, 1000, 3000, None]
+    assert queue.total_duration == 7000
+    assert queue.stream_count == 1
+
+    queue.delete(0)
+    queue.put_at(0, make_record('d', USERS[1], 500))
+    assert [queue.starts_in(index) for index in range(3)] == [0, 500, 2500]
+    assert queue.total_duration == 6500
+
+
+def test_dedupe_keeps_first_copy():
+    queue = MusicQueue(history=False)
+    for name in ('a', 'b', 'a', 'c', 'b', 'a'):
+        queue.put(make_record(name, USERS[0]))
+    assert queue.count_identifier('fake:a') == 3
+
+    assert queue.dedupe() == 3
+    assert [record.title for record in queue] == ['a', 'b', 'c']
+    assert queue.count_identifier('fake:a') == 1
+    assert queue.dedupe() == 0
+    assert queue.dedupe(drop='fake:b') == 1
+    assert [record.title for record in queue] == ['a', 'c']
+
+
+def test_get_rebuilds_playable(encode_track):
+    queue = MusicQueue(history=False)
+    queue.put(TrackRecord(encode_track(title='First'), 'First', 'Artist', 215000, requester=USERS[0]))
+    queue.put(TrackRecord(encode_track(title='Second'), 'Second', 'Artist', 215000))
+
+    track = queue.get()
+    assert track.title == 'First' and track.requester is USERS[0]
+    assert [record.title for record in queue] == ['Second']
+
+
+def test_reset_keeps_shared_history():
+    history = PlaybackHistory()
+    queue = MusicQueue(history_ring=history)
+    history.put(make_record('played', USERS[0]))
+    queue.put(make_record('queued', USERS[0]))
+    queue.mode = wavelink.QueueMode.loop_all
+
+    queue.reset()
+
+    assert len(queue) == 0
+    assert queue.mode is wavelink.QueueMode.normal
+    assert [record.title for record in history] == ['played']
@@ -0,0 +1,100 @@
+"""PanelScheduler debounce, budget and digests"""
+
+import asyncio
+
+import pytest
+
+from services.panel_scheduler import PanelScheduler, panel_digest
+
+
+def test_panel_digest_ignores_key_order():
+    assert panel_digest({'a': 1, 'b': [1, 2]}) == panel_digest({'b': [1, 2], 'a': 1})
+    assert panel_digest({'a': 1}) != panel_digest({'a': 2})
+
+
+@pytest.mark.asyncio
+async def test_expedite_coalesces_changes_into_one_refresh():
+    scheduler = PanelScheduler(interval=60, debounce=0.02)
+    calls = []
+
+    async def refresh():
+        calls.append(1)
+        return False  # panel went away - stop scheduling it
+
+    assert scheduler.expedite(1, refresh)
+    assert not scheduler.expedite(1, refresh)
+    assert not scheduler.expedite(1, refresh)
+    await asyncio.sleep(0.1)
+    await scheduler.close()
+
+    assert len(calls) == 1
+    assert scheduler.coalesced == 2
+    assert scheduler.refreshes == 1
+    assert 1 not in scheduler
+
+
+@pytest.mark.asyncio
+async def test_kept_panel_is_rescheduled_and_removed_panel_is_not_run():
+    scheduler = PanelScheduler(interval=60, debounce=0.01)
+    calls = []
+
+    async def refresh(key):
+        calls.append(key)
+        return True
+
+    scheduler.expedite(1, lambda: refresh(1))
+    scheduler.expedite(2, lambda: refresh(2))
+    scheduler.remove(2)
+    await asyncio.sleep(0.05)
+    stats = scheduler.get_stats()
+    await scheduler.close()
+
+    assert calls == [1]
+    assert stats['panels'] == 1 and stats['queue_depth'] == 0
+
+
+async def run_burst(sent):
+    """Expedite eight panels under a 5/s budget; returns (scheduler, refreshed at once, refreshed in total)"""
+    scheduler = PanelScheduler(interval=60, edits_per_second=5, debounce=0)
+    calls = []
+
+    async def refresh(key):
+        calls.append(key)
+        scheduler.record_edit(sent=sent)  # unchanged renders hand their edits back
+        scheduler.record_edit(sent=sent)  # ...but only the one they took
+        return False
+
+    for key in range(8):
+        scheduler.expedite(key, lambda key=key: refresh(key))
+    await asyncio.sleep(0.05)
+    burst = len(calls)
+    await asyncio.sleep(0.3)
+    await scheduler.close()
+    return scheduler, burst, len(calls)
+
+
+@pytest.mark.asyncio
+async def test_edit_budget_throttles():
+    scheduler, burst, done = await run_burst(sent=True)
+
+    assert burst == 5  # a second's worth goes out at once, the rest waits for tokens
+    assert scheduler.throttled >= 1
+    assert done < 8
+
+
+@pytest.mark.asyncio
+async def test_skipped_renders_refund_their_edit():
+    scheduler, burst, done = await run_burst(sent=False)
+
+    assert burst == 5
+    assert done == 8
+    assert scheduler.skipped == 16
+
+
+def test_skipped_edit_outside_the_scheduler_is_not_refunded():
+    scheduler = PanelScheduler(edits_per_second=5)
+    scheduler._budget = 0.0
+    scheduler.record_edit(sent=False)
+
+    assert scheduler.skipped == 1
+    assert scheduler._budget == 0.0
@@ -0,0 +1,60 @@
+"""TrackPrefetcher staleness, look-ahead and hit counting"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from services.prefetcher import TrackPrefetcher
+from utils.music_queue import MusicQueue, TrackRecord
+
+
+def test_only_old_stamped_tracks_are_stale():
+    prefetcher = TrackPrefetcher(resolver=None, stale_after=60)
+    uri = 'https://youtu.be/dQw4w9WgXcQ'
+
+    assert prefetcher.is_stale(SimpleNamespace(uri=uri, resolved_at=time.time() - 120))
+    assert not prefetcher.is_stale(SimpleNamespace(uri=uri, resolved_at=time.time()))
+    # Restored and warmed entries without a stamp don't cost a refresh per transition
+    assert not prefetcher.is_stale(SimpleNamespace(uri=uri, resolved_at=0.0))
+    assert not prefetcher.is_stale(SimpleNamespace(uri=uri))
+    assert not prefetcher.is_stale(SimpleNamespace(uri=None, resolved_at=1.0))
+
+
+def test_track_start_counts_prepared_head_as_hit():
+    prefetcher = TrackPrefetcher(resolver=None)
+    head = SimpleNamespace(encoded='QUFB')
+
+    prefetcher._prepared[1] = head
+    prefetcher.mark_track_end(1)
+    prefetcher.mark_track_start(1, SimpleNamespace(encoded='QUFB'))
+    prefetcher._prepared[1] = head
+    prefetcher.mark_track_end(1)
+    prefetcher.mark_track_start(1, SimpleNamespace(encoded='QkJC'))
+    # A first track (no transition) is neither
+    prefetcher.mark_track_start(1, SimpleNamespace(encoded='QUFB'))
+
+    stats = prefetcher.get_stats()
+    assert (stats['hits'], stats['misses']) == (1, 1)
+    assert stats['track_gap']['count'] == 2
+
+
+@pytest.mark.asyncio
+async def test_head_is_checked_again_before_the_track_ends(encode_track):
+    prefetcher = TrackPrefetcher(resolver=None, lead=0)
+    queue = MusicQueue(history=False)
+    queue.put(TrackRecord(encode_track(title='A'), 'A', 'Artist', 1000))
+    player = SimpleNamespace(guild=SimpleNamespace(id=1), queue=queue, position=0,
+                             current=SimpleNamespace(length=50, is_stream=False))
+
+    prefetcher.schedule(player)
+    await asyncio.sleep(0)
+    assert prefetcher._prepared[1].title == 'A'
+
+    queue.put_at(0, TrackRecord(encode_track(title='B'), 'B', 'Artist', 1000))
+    player.position = 50  # reached the end by the time the sleep is over
+    await asyncio.sleep(0.1)
+
+    assert prefetcher._prepared[1].title == 'B'
+    assert prefetcher.prepared == 2
@@ -0,0 +1,21 @@
+"""QueueStore without a database"""
+
+from types import SimpleNamespace
+
+from services.database import Database
+from services.queue_store import QueueStore
+from utils.music_queue import MusicQueue, QueueJournal, TrackRecord
+
+
+def test_nothing_is_buffered_without_a_database(tmp_path):
+    store = QueueStore(Database(str(tmp_path / 'bot.db')))  # setup() never ran
+    queue = MusicQueue(history=False)
+    player = SimpleNamespace(guild=SimpleNamespace(id=1), queue=queue)
+
+    store.attach(player, text_channel_id=2)
+    queue.put(TrackRecord('QUFB', 'Song', 'Artist', 1000))
+    store.forget(1)
+
+    assert not store.active
+    assert type(queue.journal) is QueueJournal
+    assert not store._pending and not store._states and not store._players
@@ -0,0 +1,81 @@
+"""SingleFlight coalescing and cancellation"""
+
+import asyncio
+
+import pytest
+
+from utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_execution():
+    flights = SingleFlight()
+    calls = 0
+
+    async def lookup():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return 'result'
+
+    results = await asyncio.gather(*(flights.do('key', lookup) for _ in range(5)))
+
+    assert results == ['result'] * 5
+    assert calls == 1
+    assert flights.coalesced == 4
+    assert flights.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_one_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0.02)
+        return 'result'
+
+    first = asyncio.ensure_future(flights.do('key', lookup))
+    second = asyncio.ensure_future(flights.do('key', lookup))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == 'result'
+    assert first.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_caller_after_abandoned_flight_starts_a_new_one():
+    flights = SingleFlight()
+    started = 0
+
+    async def lookup():
+        nonlocal started
+        started += 1
+        await asyncio.sleep(0.02)
+        return started
+
+    loser = asyncio.ensure_future(flights.do('key', lookup))
+    await asyncio.sleep(0)
+    loser.cancel()
+    await asyncio.sleep(0)  # last waiter left -> lookup cancelled, its done-callback not run yet
+    result = await flights.do('key', lookup)
+
+    assert loser.cancelled()
+    assert result == 2
+    assert flights.executions == 2
+    assert flights.abandoned == 1
+    assert flights.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_caller_and_clear_the_key():
+    flights = SingleFlight()
+
+    async def lookup():
+        await asyncio.sleep(0)
+        raise ValueError('boom')
+
+    results = await asyncio.gather(flights.do('key', lookup), flights.do('key', lookup), return_exceptions=True)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert flights.in_flight == 0
@@ -0,0 +1,41 @@
+"""TrackCache LRU and TTL"""
+
+from utils.track_cache import TrackCache
+
+
+def test_lru_eviction_keeps_recently_used():
+    cache = TrackCache(max_size=2, ttl=60)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    assert cache.get('a') == 1  # 'b' is now least recently used
+    cache.set('c', 3)
+
+    assert 'b' not in cache
+    assert cache.get('a') == 1 and cache.get('c') == 3
+    assert cache.evictions == 1
+
+
+def test_expired_entries_miss():
+    cache = TrackCache(max_size=10, ttl=60)
+    cache.set('old', 1, ttl=-1)
+    cache.set('gone', 2, ttl=-1)
+    cache.set('fresh', 3)
+
+    assert 'old' not in cache
+    assert cache.get('old') is None
+    assert cache.prune_expired() == 1
+    assert cache.expirations == 2
+    assert len(cache) == 1
+
+
+def test_stats_and_invalidation():
+    cache = TrackCache(max_size=10, ttl=60)
+    cache.set('a', 1)
+    cache.get('a')
+    cache.get('missing')
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+    assert cache.invalidate('a') and not cache.invalidate('a')
+    cache.set('b', 2)
+    assert cache.clear() == 1 and len(cache) == 0
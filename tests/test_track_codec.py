@@ -0,0 +1,73 @@
+"""Lavalink track decoding and TrackRecord round trips"""
+
+import base64
+
+import pytest
+
+from utils.music_queue import TrackRecord
+from utils.track_codec import TrackDecodeError, decode_track, is_supported, playable_from_encoded
+
+
+def test_decode_round_trip_v3(encode_track):
+    info = decode_track(encode_track(artwork='https://i.ytimg.com/a.jpg', isrc='GBARL9300135', position=42))
+    assert info == {
+        'identifier': 'dQw4w9WgXcQ',
+        'isSeekable': True,
+        'author': 'Artist',
+        'length': 215000,
+        'isStream': False,
+        'position': 42,
+        'title': 'Song',
+        'uri': 'https://youtu.be/dQw4w9WgXcQ',
+        'artworkUrl': 'https://i.ytimg.com/a.jpg',
+        'isrc': 'GBARL9300135',
+        'sourceName': 'youtube'
+    }
+
+
+def test_decode_older_versions_and_streams(encode_track):
+    info = decode_track(encode_track(version=1, is_stream=True))
+    assert info['uri'] is None and info['artworkUrl'] is None
+    assert info['isStream'] and not info['isSeekable']
+    assert decode_track(encode_track(version=2))['uri'] == 'https://youtu.be/dQw4w9WgXcQ'
+
+
+def test_decode_modified_utf8(encode_track):
+    title = 'nul\x00 ünï 🎵'
+    assert decode_track(encode_track(title=title))['title'] == title
+
+
+@pytest.mark.parametrize('encoded', ['not base64!', base64.b64encode(b'\x00\x00').decode()])
+def test_decode_rejects_malformed(encoded):
+    with pytest.raises(TrackDecodeError):
+        decode_track(encoded)
+
+
+def test_decode_rejects_truncated(encode_track):
+    raw = base64.b64decode(encode_track())
+    with pytest.raises(TrackDecodeError):
+        decode_track(base64.b64encode(raw[:-8]).decode())
+
+
+def test_is_supported_checks_version(encode_track):
+    assert is_supported(encode_track())
+    assert not is_supported(encode_track(version=4))
+    assert not is_supported('???')
+
+
+def test_track_record_round_trip(encode_track):
+    requester = object()
+    playable = playable_from_encoded(encode_track(title='Song', length=1234))
+    playable.requester = requester
+    playable.resolved_at = 10.0
+
+    record = TrackRecord.from_playable(playable)
+    assert record.track is None  # decodable locally, so the Playable isn't kept
+    assert (record.title, record.author, record.length) == ('Song', 'Artist', 1234)
+    assert record.identifier == 'dQw4w9WgXcQ' and record.uri == 'https://youtu.be/dQw4w9WgXcQ'
+    assert record == playable
+
+    rebuilt = record.to_playable()
+    assert rebuilt.encoded == playable.encoded
+    assert rebuilt.title == 'Song' and rebuilt.length == 1234
+    assert rebuilt.requester is requester and rebuilt.resolved_at == 10.0
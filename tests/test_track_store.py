@@ -0,0 +1,51 @@
+"""TrackStore buffering and flush retry"""
+
+import pytest
+
+from services.database import Database
+from services.track_store import TrackStore
+
+
+class FailingConnection:
+    """Accepts the schema, then fails the write after letting the store record more plays mid-flush"""
+
+    def __init__(self, store):
+        self.store = store
+        self.rolled_back = False
+
+    async def executescript(self, script):
+        pass
+
+    async def commit(self):
+        pass
+
+    async def executemany(self, sql, rows):
+        self.store.record('song', {'encoded': 'QUFB'})
+        raise RuntimeError("disk full")
+
+    async def rollback(self):
+        self.rolled_back = True
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_plays_recorded_meanwhile(tmp_path):
+    store = TrackStore(Database(str(tmp_path / 'bot.db')))
+    connection = store.database.connection = FailingConnection(store)
+    await store.setup()
+    for _ in range(3):
+        store.record('song', {'encoded': 'QUFB'})
+    written = await store.flush()
+    store._flush_task.cancel()
+
+    assert written == 0
+    assert connection.rolled_back
+    assert store.flush_errors == 1
+    assert store._pending['song'][2] == 4
+
+
+def test_nothing_is_buffered_without_a_database(tmp_path):
+    store = TrackStore(Database(str(tmp_path / 'bot.db')))  # setup() never ran
+    store.record('song', {'encoded': 'QUFB'})
+
+    assert not store.active
+    assert not store._pending